@@ -7,6 +7,9 @@ from routes.main import main_bp
 from routes.upload import upload_bp
 from routes.viewer import viewer_bp
 from routes.editor import editor_bp
+from commands import register_commands
+from services.metrics import init_app as init_metrics
+from services.profiler import init_profiler
 
 
 def create_app():
@@ -22,6 +25,15 @@ def create_app():
     app.register_blueprint(viewer_bp)
     app.register_blueprint(editor_bp)
     
+    # Instrumentation des routes (/metrics)
+    init_metrics(app)
+    
+    # Profilage des requêtes lentes ou échantillonnées (désactivé par défaut)
+    init_profiler(app)
+    
+    # Commandes CLI
+    register_commands(app)
+    
     # Erreurs globales
     @app.errorhandler(404)
     def not_found(e):
@@ -0,0 +1,109 @@
+"""Benchmark de la conversion PDF -> images : pages/s et pic mémoire selon le type de document
+
+    python benchmarks/bench_conversion.py
+    python benchmarks/bench_conversion.py --kinds text image mixed --pages 10 200 2000 --output conversion.json
+
+Chaque conversion tourne dans un processus neuf : le pic mémoire mesuré est le sien.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+from common import PDF_KINDS, make_pdf, write_results
+
+
+def worker(pdf_path, output_dir):
+    """Conversion unique (processus enfant) : mesures imprimées en JSON"""
+    from services.pdf_processor import convert_pdf_to_images
+    from services.upload_trace import process_peak_rss_mb, disk_usage
+    
+    # Processus enfant neuf : son pic est celui de cette conversion
+    baseline = process_peak_rss_mb()
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    result = convert_pdf_to_images(pdf_path, output_dir)
+    wall = time.perf_counter() - start
+    if not result["success"]:
+        raise SystemExit(result["error"])
+    
+    print(json.dumps({
+        "wall_ms": round(wall * 1000, 1),
+        "cpu_ms": round((time.process_time() - cpu_start) * 1000, 1),
+        "pages_per_second": round(result["pages_count"] / wall, 2),
+        "peak_rss_mb": process_peak_rss_mb(),
+        "rss_growth_mb": round(process_peak_rss_mb() - baseline, 1),
+        "output_bytes": disk_usage(output_dir)
+    }))
+
+
+def convert_once(pdf_path, tmp_dir):
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as output_dir:
+        os.makedirs(os.path.join(output_dir, 'pages'))
+        completed = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', pdf_path, output_dir],
+                                   capture_output=True, text=True, check=True)
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run(kinds, pages_grid, repeat, cache_dir):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for kind in kinds:
+            for pages_count in pages_grid:
+                # PDF généré une fois par (type, pages) ; réutilisé d'une exécution à l'autre avec --cache
+                pdf_path = os.path.join(cache_dir or tmp_dir, f"{kind}-{pages_count}.pdf")
+                if not os.path.exists(pdf_path):
+                    make_pdf(pdf_path, kind, pages_count)
+                
+                runs = [convert_once(pdf_path, tmp_dir) for _ in range(repeat)]
+                best = max(runs, key=lambda r: r["pages_per_second"])
+                rows.append({
+                    "kind": kind,
+                    "pages": pages_count,
+                    "pdf_bytes": os.path.getsize(pdf_path),
+                    **best,
+                    # Le pic mémoire retenu est le plus haut observé, pas celui de la meilleure exécution
+                    "peak_rss_mb": max(r["peak_rss_mb"] for r in runs),
+                    "rss_growth_mb": max(r["rss_growth_mb"] for r in runs)
+                })
+    return rows
+
+
+def print_table(rows):
+    header = f"{'type':>6} {'pages':>6} {'pdf':>9} {'pages/s':>9} {'durée':>10} {'pic RSS':>9} {'+RSS':>8} {'sortie':>9}"
+    print(header)
+    print('-' * len(header))
+    for r in rows:
+        print(f"{r['kind']:>6} {r['pages']:>6} {r['pdf_bytes'] / 1024:>7.0f}KB {r['pages_per_second']:>9.1f} "
+              f"{r['wall_ms']:>8.0f}ms {r['peak_rss_mb']:>7.1f}MB {r['rss_growth_mb']:>6.1f}MB "
+              f"{r['output_bytes'] / 1024:>7.0f}KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--kinds', nargs='+', choices=PDF_KINDS, default=list(PDF_KINDS))
+    parser.add_argument('--pages', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--cache', help="Dossier où conserver les PDF synthétiques entre deux exécutions")
+    parser.add_argument('--output', help="Fichier de résultats JSON ('-' : sortie standard)")
+    parser.add_argument('--worker', nargs=2, metavar=('PDF', 'DOSSIER'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.worker:
+        return worker(*args.worker)
+    if args.cache:
+        os.makedirs(args.cache, exist_ok=True)
+    
+    rows = run(args.kinds, args.pages, args.repeat, args.cache)
+    if args.output != '-':
+        print_table(rows)
+    if args.output:
+        write_results(args.output, 'conversion', rows, {k: v for k, v in vars(args).items() if k != 'worker'})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Micro-benchmark du générateur : coût selon le nombre de pages et de hotspots
+
+    python benchmarks/bench_generator.py
+    python benchmarks/bench_generator.py --pages 50 500 2000 --hotspots 0 1000 10000 --output generator.json
+"""
+
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+
+from common import write_results
+from services.flipbook_generator import FlipbookGenerator
+from services.upload_trace import disk_usage
+
+
+def make_generator(pages_count, hotspots_count, seed=0):
+    """Flipbook synthétique : pages A4, hotspots répartis au hasard"""
+    rng = random.Random(seed)
+    pages = [{"number": i, "width": 992, "height": 1403, "pdf_width": 595.0, "pdf_height": 842.0}
+             for i in range(1, pages_count + 1)]
+    hotspots = [{
+        "id": f"h{i}",
+        "page": rng.randint(1, pages_count),
+        "x": rng.uniform(0, 90), "y": rng.uniform(0, 90), "width": 10, "height": 5,
+        "type": "url" if i % 2 else "page",
+        "target": f"https://example.com/produit/{i}" if i % 2 else str(rng.randint(1, pages_count)),
+        "label": f"Lien {i}"
+    } for i in range(hotspots_count)]
+    return FlipbookGenerator("bench", pages_count, hotspots=hotspots, pages=pages)
+
+
+def best_of(fn, repeat):
+    """Meilleur temps (ms) sur repeat exécutions"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def run(pages_grid, hotspots_grid, repeat):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = os.path.join(tmp_dir, 'viewer.html')
+        for pages_count in pages_grid:
+            for hotspots_count in hotspots_grid:
+                generator = make_generator(pages_count, hotspots_count)
+                manifest = generator.build_manifest()
+                index = manifest["HOTSPOTS"]
+                
+                # Recherche des hotspots de chaque page : parcours de la liste complète vs index par page
+                scan = lambda: [[h for h in generator.hotspots if h["page"] == n] for n in range(1, pages_count + 1)]
+                lookup = lambda: [index.get(str(n), []) for n in range(1, pages_count + 1)]
+                
+                rows.append({
+                    "pages": pages_count,
+                    "hotspots": hotspots_count,
+                    "manifest_ms": best_of(lambda: json.dumps(generator.build_manifest()), repeat),
+                    "manifest_kb": len(json.dumps(manifest)) / 1024,
+                    "generate_ms": best_of(lambda: generator.generate(output_path, use_cache=False), repeat),
+                    # viewer.html, sw.js, precache.json et leurs variantes précompressées
+                    "output_kb": disk_usage(tmp_dir) / 1024,
+                    "scan_ms": best_of(scan, repeat),
+                    "index_ms": best_of(lookup, repeat)
+                })
+    return rows
+
+
+def print_table(rows):
+    header = (f"{'pages':>7} {'hotspots':>9} {'manifeste':>11} {'taille':>9} {'generate':>10} {'sortie':>9} "
+              f"{'parcours':>10} {'index':>8}")
+    print(header)
+    print('-' * len(header))
+    for r in rows:
+        print(f"{r['pages']:>7} {r['hotspots']:>9} {r['manifest_ms']:>9.2f}ms {r['manifest_kb']:>7.1f}KB "
+              f"{r['generate_ms']:>8.2f}ms {r['output_kb']:>7.1f}KB {r['scan_ms']:>8.2f}ms {r['index_ms']:>6.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, nargs='+', default=[20, 200, 1000])
+    parser.add_argument('--hotspots', type=int, nargs='+', default=[0, 500, 5000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="Fichier de résultats JSON ('-' : sortie standard)")
+    args = parser.parse_args()
+    
+    rows = run(args.pages, args.hotspots, args.repeat)
+    if args.output != '-':
+        print_table(rows)
+    if args.output:
+        write_results(args.output, 'generator', rows, vars(args))
+
+
+if __name__ == '__main__':
+    main()
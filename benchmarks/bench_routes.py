@@ -0,0 +1,120 @@
+"""Benchmark des routes du viewer et de l'éditeur via le client de test Flask (latence par requête)
+
+    python benchmarks/bench_routes.py
+    python benchmarks/bench_routes.py --pages 20 500 --hotspots 200 --requests 100 --output routes.json
+
+Mesure le traitement Flask seul (sans réseau ni serveur WSGI) : comparer des exécutions entre elles.
+"""
+
+import io
+import os
+import shutil
+import argparse
+import tempfile
+
+from common import make_pdf, measure, sandbox, write_results
+
+
+def routes(flipbook_id, etag, hotspot_id):
+    """(nom, méthode, url, options de requête) de chaque route mesurée"""
+    view = f"/view/{flipbook_id}"
+    api = f"/api/flipbook/{flipbook_id}"
+    hotspot = {"page": 1, "x": 10, "y": 10, "width": 20, "height": 10, "type": "url", "target": "https://example.com"}
+    return [
+        ("viewer", 'GET', view, {}),
+        ("viewer_gzip", 'GET', view, {"headers": {"Accept-Encoding": "gzip"}}),
+        ("service_worker", 'GET', f"{view}/sw.js", {}),
+        ("precache", 'GET', f"{view}/precache.json", {}),
+        ("manifest", 'GET', f"/flipbook/{flipbook_id}/manifest.json", {}),
+        ("manifest_304", 'GET', f"/flipbook/{flipbook_id}/manifest.json", {"headers": {"If-None-Match": etag}}),
+        ("page_image", 'GET', f"{view}/pages/page_1.jpg", {}),
+        ("info", 'GET', f"/flipbook/{flipbook_id}/info", {}),
+        ("version", 'GET', f"/flipbook/{flipbook_id}/version", {}),
+        ("editor", 'GET', f"/editor/{flipbook_id}", {}),
+        ("api_flipbook", 'GET', api, {}),
+        ("api_pages", 'GET', f"{api}/pages", {}),
+        ("api_hotspots", 'GET', f"{api}/hotspots", {}),
+        ("api_add_hotspot", 'POST', f"{api}/hotspots", {"json": hotspot}),
+        ("api_update_hotspot", 'PATCH', f"{api}/hotspots/{hotspot_id}", {"json": {"label": "Modifié"}}),
+        ("api_batch_10", 'POST', f"{api}/hotspots/batch",
+         {"json": {"operations": [{"op": "update", "id": hotspot_id, "hotspot": {"x": i}} for i in range(10)]}})
+    ]
+
+
+def upload(client, pdf_path):
+    with open(pdf_path, 'rb') as f:
+        response = client.post('/upload', data={'file': (io.BytesIO(f.read()), 'bench.pdf')},
+                               content_type='multipart/form-data')
+    data = response.get_json()
+    if not data or not data.get("success"):
+        raise SystemExit(f"Upload impossible : {data}")
+    return data["flipbook_id"]
+
+
+def run(pages_grid, hotspots_count, requests_count):
+    tmp_dir = tempfile.mkdtemp(prefix='bench-routes-')
+    try:
+        # Bac à sable avant l'import de l'application
+        sandbox(tmp_dir)
+        from app import app
+        client = app.test_client()
+        
+        rows = []
+        for pages_count in pages_grid:
+            pdf_path = make_pdf(os.path.join(tmp_dir, f"mixed-{pages_count}.pdf"), 'mixed', pages_count)
+            upload_timing = measure(lambda: upload(client, pdf_path), repeat=1, warmup=0)
+            flipbook_id = upload(client, pdf_path)
+            
+            # Hotspots répartis sur les pages, ajoutés en un lot
+            batch = [{"op": "create", "hotspot": {"page": 1 + i % pages_count, "x": 5, "y": 5, "width": 10,
+                                                  "height": 5, "type": "page", "target": "1"}}
+                     for i in range(hotspots_count)]
+            hotspot_id = None
+            if batch:
+                created = client.post(f"/api/flipbook/{flipbook_id}/hotspots/batch", json={"operations": batch})
+                hotspot_id = created.get_json()["results"][0]["hotspot"]["id"]
+            etag = client.get(f"/flipbook/{flipbook_id}/manifest.json").headers.get('ETag', '')
+            
+            measured = {}
+            for name, method, url, options in routes(flipbook_id, etag, hotspot_id):
+                if hotspot_id is None and name in ('api_update_hotspot', 'api_batch_10'):
+                    continue
+                response = client.open(url, method=method, **options)
+                measured[name] = {
+                    "status": response.status_code,
+                    "bytes": len(response.get_data()),
+                    **measure(lambda: client.open(url, method=method, **options), requests_count)
+                }
+            rows.append({"pages": pages_count, "hotspots": hotspots_count, "upload": upload_timing, "routes": measured})
+        return rows
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def print_table(rows):
+    for row in rows:
+        print(f"\n{row['pages']} pages, {row['hotspots']} hotspots — upload {row['upload']['median_ms']:.0f}ms")
+        header = f"{'route':>20} {'statut':>7} {'octets':>9} {'médiane':>10} {'p90':>10}"
+        print(header)
+        print('-' * len(header))
+        for name, r in row["routes"].items():
+            print(f"{name:>20} {r['status']:>7} {r['bytes']:>9} {r['median_ms']:>8.2f}ms {r['p90_ms']:>8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, nargs='+', default=[20, 200])
+    parser.add_argument('--hotspots', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=50, help="Requêtes mesurées par route")
+    parser.add_argument('--output', help="Fichier de résultats JSON ('-' : sortie standard)")
+    args = parser.parse_args()
+    
+    rows = run(args.pages, args.hotspots, args.requests)
+    if args.output != '-':
+        print_table(rows)
+    if args.output:
+        write_results(args.output, 'routes', rows, vars(args))
+
+
+if __name__ == '__main__':
+    main()
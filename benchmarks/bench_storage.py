@@ -0,0 +1,114 @@
+"""Benchmark du StorageManager : coût des opérations sur les métadonnées selon la taille de la bibliothèque
+
+    python benchmarks/bench_storage.py
+    python benchmarks/bench_storage.py --library 10 1000 10000 --hotspots 50 --output storage.json
+"""
+
+import os
+import json
+import random
+import shutil
+import argparse
+import tempfile
+
+from common import measure, sandbox, write_results
+
+
+def fill_library(storage, metadata_file, size, hotspots_per_flipbook, seed=0):
+    """Bibliothèque synthétique de size flipbooks, écrite en une fois"""
+    rng = random.Random(seed)
+    flipbooks = {}
+    for i in range(size):
+        flipbook_id = f"bench-{i:06d}"
+        pages_count = rng.randint(4, 200)
+        os.makedirs(storage.get_flipbook_path(flipbook_id), exist_ok=True)
+        flipbooks[flipbook_id] = {
+            "id": flipbook_id,
+            "title": f"Catalogue {i}",
+            "pages_count": pages_count,
+            "created_at": "2024-01-01T00:00:00",
+            "url": f"/view/{flipbook_id}",
+            "pdf_size_bytes": rng.randint(100_000, 30_000_000),
+            "viewer_version": "1",
+            "hotspots": [{
+                "id": f"h{j}", "page": rng.randint(1, pages_count), "x": 10.0, "y": 20.0, "width": 15.0,
+                "height": 5.0, "type": "url", "target": f"https://example.com/{i}/{j}", "label": ""
+            } for j in range(hotspots_per_flipbook)]
+        }
+    with open(metadata_file, 'w', encoding='utf-8') as f:
+        json.dump({"flipbooks": flipbooks}, f)
+    return list(flipbooks)
+
+
+def run(library_sizes, hotspots_per_flipbook, repeat):
+    # Bac à sable avant tout import des services : la vraie bibliothèque n'est jamais touchée
+    tmp_dir = tempfile.mkdtemp(prefix='bench-storage-')
+    try:
+        sandbox(tmp_dir)
+        return _run(library_sizes, hotspots_per_flipbook, repeat)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _run(library_sizes, hotspots_per_flipbook, repeat):
+    import config
+    from services.storage_manager import storage
+    
+    rows = []
+    for size in library_sizes:
+        ids = fill_library(storage, config.METADATA_FILE, size, hotspots_per_flipbook)
+        target = ids[len(ids) // 2]
+        counter = iter(range(10 ** 9))
+        
+        def save_new():
+            flipbook_id = f"new-{next(counter)}"
+            storage.save_flipbook_metadata(flipbook_id, {"title": "Nouveau", "pages_count": 10})
+        
+        def add_hotspot(flipbook):
+            flipbook["hotspots"].append({"id": "added", "page": 1})
+        
+        rows.append({
+            "library": size,
+            "metadata_kb": round(os.path.getsize(config.METADATA_FILE) / 1024, 1),
+            "operations": {
+                "get_flipbook_metadata": measure(lambda: storage.get_flipbook_metadata(target), repeat),
+                "flipbook_exists": measure(lambda: storage.flipbook_exists(target), repeat),
+                "get_all_flipbooks": measure(storage.get_all_flipbooks, repeat),
+                "get_stats": measure(storage.get_stats, repeat),
+                "update_flipbook_metadata": measure(
+                    lambda: storage.update_flipbook_metadata(target, {"title": "Renommé"}), repeat),
+                "modify_flipbook_metadata": measure(
+                    lambda: storage.modify_flipbook_metadata(target, add_hotspot), repeat),
+                "save_flipbook_metadata": measure(save_new, repeat)
+            }
+        })
+    return rows
+
+
+def print_table(rows):
+    operations = list(rows[0]["operations"]) if rows else []
+    header = f"{'opération':>26}" + ''.join(f"{r['library']:>11}" for r in rows)
+    print(header)
+    print('-' * len(header))
+    print(f"{'flipbooks.json':>26}" + ''.join(f"{r['metadata_kb']:>9.0f}KB" for r in rows))
+    for operation in operations:
+        print(f"{operation:>26}" + ''.join(f"{r['operations'][operation]['median_ms']:>9.2f}ms" for r in rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--library', type=int, nargs='+', default=[10, 100, 1000, 5000])
+    parser.add_argument('--hotspots', type=int, default=20, help="Hotspots par flipbook")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="Fichier de résultats JSON ('-' : sortie standard)")
+    args = parser.parse_args()
+    
+    rows = run(args.library, args.hotspots, args.repeat)
+    if args.output != '-':
+        print_table(rows)
+    if args.output:
+        write_results(args.output, 'storage', rows, vars(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""Outils communs des benchmarks : bac à sable, PDF synthétiques, mesures et résultats JSON"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import platform
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Formats de page (points PDF) utilisés par les documents « mixed »
+PAGE_SIZES = [(595, 842), (612, 792), (842, 595), (420, 595), (842, 1191)]
+PDF_KINDS = ('text', 'image', 'mixed')
+
+
+def sandbox(directory):
+    """Redirige uploads, flipbooks et métadonnées vers directory ; à appeler avant d'importer app ou services"""
+    import config
+    if 'services.storage_manager' in sys.modules:
+        raise RuntimeError("sandbox() doit être appelé avant l'import des services")
+    config.UPLOAD_FOLDER = config.Config.UPLOAD_FOLDER = os.path.join(directory, 'uploads')
+    config.FLIPBOOK_FOLDER = os.path.join(directory, 'flipbooks')
+    config.DATA_FOLDER = os.path.join(directory, 'data')
+    config.METADATA_FILE = os.path.join(config.DATA_FOLDER, 'flipbooks.json')
+    config.PROFILE_FOLDER = os.path.join(config.DATA_FOLDER, 'profiles')
+    config.UPLOAD_TRACE_LOG = False
+    config.init_directories()
+
+
+def make_pdf(path, kind, pages_count, seed=0):
+    """PDF synthétique reproductible : text (pages de texte), image (photos pleine page) ou mixed (formats variés)"""
+    import fitz
+    rng = random.Random(seed)
+    words = ["catalogue", "produit", "prix", "référence", "collection", "saison", "remise", "livraison",
+             "qualité", "matière", "dimensions", "garantie", "nouveauté", "couleur", "stock"]
+    images = [_noise_image(rng, 800, 600) for _ in range(4)] if kind != 'text' else []
+    
+    doc = fitz.open()
+    for i in range(pages_count):
+        width, height = PAGE_SIZES[i % len(PAGE_SIZES)] if kind == 'mixed' else PAGE_SIZES[0]
+        page = doc.new_page(width=width, height=height)
+        page.insert_text((40, 60), f"Page {i + 1}", fontsize=28)
+        
+        if kind in ('text', 'mixed'):
+            text = ' '.join(rng.choice(words) for _ in range(450 if kind == 'text' else 120))
+            top = 90 if kind == 'text' else height / 2
+            page.insert_textbox(fitz.Rect(40, top, width - 40, height - 40), text, fontsize=9)
+        if kind in ('image', 'mixed'):
+            bottom = height - 40 if kind == 'image' else height / 2 - 10
+            page.insert_image(fitz.Rect(40, 90, width - 40, bottom), stream=images[i % len(images)])
+    
+    doc.set_metadata({"title": f"Benchmark {kind} {pages_count}p"})
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+    return path
+
+
+def _noise_image(rng, width, height):
+    """Image JPEG peu compressible (dégradé bruité), comme une photo"""
+    from PIL import Image
+    base = Image.linear_gradient('L').resize((width, height)).convert('RGB')
+    noise = Image.frombytes('RGB', (width, height), rng.randbytes(width * height * 3))
+    buffer = io.BytesIO()
+    Image.blend(base, noise, 0.35).save(buffer, format='JPEG', quality=85)
+    return buffer.getvalue()
+
+
+def measure(fn, repeat=5, warmup=1):
+    """Durées (ms) de repeat exécutions : min, médiane, p90"""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return summarize(timings)
+
+
+def summarize(timings):
+    ordered = sorted(timings)
+    return {
+        "min_ms": round(ordered[0], 3),
+        "median_ms": round(statistics.median(ordered), 3),
+        "p90_ms": round(ordered[max(0, -(-9 * len(ordered) // 10) - 1)], 3),
+        "runs": len(ordered)
+    }
+
+
+def environment():
+    """Contexte de la mesure, pour ne comparer que des exécutions comparables"""
+    import fitz
+    import PIL
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "pymupdf": fitz.VersionBind,
+        "pillow": PIL.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count()
+    }
+
+
+def write_results(path, suite, results, params):
+    """Écrit {"suite", "environment", "params", "results"} ; path '-' pour la sortie standard"""
+    payload = json.dumps({
+        "suite": suite,
+        "environment": environment(),
+        "params": params,
+        "results": results
+    }, indent=2, ensure_ascii=False)
+    if path == '-':
+        print(payload)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(payload + '\n')
@@ -0,0 +1,100 @@
+"""Compare deux résultats de benchmark (JSON) et signale les régressions
+
+    python benchmarks/compare.py avant.json apres.json
+    python benchmarks/compare.py resultats/avant resultats/apres --threshold 15
+
+Code de sortie 1 si une mesure se dégrade au-delà du seuil (utilisable en CI).
+"""
+
+import os
+import sys
+import json
+import argparse
+
+# Champs qui identifient une ligne de résultats (un cas de mesure)
+ROW_KEYS = ('kind', 'library', 'pages', 'hotspots', 'concurrency')
+HIGHER_IS_BETTER = ('pages_per_second', 'throughput_rps', 'saturation_concurrency')
+LOWER_IS_BETTER = ('_ms', '_mb', '_kb', '_bytes', 'bytes', 'error_rate')
+# Statistiques trop bruitées pour conclure : seule la médiane d'une série est comparée
+IGNORED = ('min_ms', 'p90_ms', 'runs', 'status')
+
+
+def flatten(value, prefix=''):
+    """{chemin: valeur} des mesures numériques d'un résultat"""
+    metrics = {}
+    if isinstance(value, list):
+        for index, row in enumerate(value):
+            label = ','.join(f"{key}={row[key]}" for key in ROW_KEYS if isinstance(row, dict) and key in row)
+            metrics.update(flatten(row, f"{prefix}[{label or index}]"))
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            if key in IGNORED or key in ROW_KEYS:
+                continue
+            metrics.update(flatten(item, f"{prefix}.{key}" if prefix else key))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        metrics[prefix] = value
+    return metrics
+
+
+def direction(path):
+    """1 si une hausse est une amélioration, -1 si c'est une dégradation, 0 si la mesure n'est pas comparée"""
+    name = path.rsplit('.', 1)[-1]
+    if name.endswith(HIGHER_IS_BETTER):
+        return 1
+    if name.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def load(path):
+    """Résultats par suite, depuis un fichier ou un dossier de fichiers JSON"""
+    files = [os.path.join(path, f) for f in sorted(os.listdir(path)) if f.endswith('.json')] \
+        if os.path.isdir(path) else [path]
+    suites = {}
+    for file_path in files:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        suites[data["suite"]] = data
+    return suites
+
+
+def compare(before, after, threshold):
+    """Lignes (suite, mesure, avant, après, écart %, régression)"""
+    rows = []
+    for suite in sorted(set(before) & set(after)):
+        old, new = flatten(before[suite]["results"]), flatten(after[suite]["results"])
+        for path in sorted(set(old) & set(new)):
+            sign = direction(path)
+            if not sign or not old[path]:
+                continue
+            change = (new[path] - old[path]) / abs(old[path]) * 100
+            rows.append((suite, path, old[path], new[path], change, -sign * change > threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=10.0, help="Dégradation tolérée (%%)")
+    parser.add_argument('--all', action='store_true', help="Afficher aussi les mesures stables")
+    args = parser.parse_args()
+    
+    before, after = load(args.before), load(args.after)
+    for suite in sorted(set(before) & set(after)):
+        commits = before[suite]["environment"].get("commit"), after[suite]["environment"].get("commit")
+        print(f"{suite} : {commits[0]} -> {commits[1]}")
+    
+    rows = compare(before, after, args.threshold)
+    regressions = [r for r in rows if r[5]]
+    for suite, path, old, new, change, regression in rows:
+        if args.all or regression or abs(change) > args.threshold:
+            marker = 'RÉGRESSION' if regression else 'amélioration' if abs(change) > args.threshold else ''
+            print(f"{suite:>10} {path:<60} {old:>12.2f} {new:>12.2f} {change:>+8.1f}% {marker}")
+    
+    print(f"\n{len(rows)} mesures comparées, {len(regressions)} régression(s) au-delà de {args.threshold:g} %")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""Test de charge : rejoue des sessions de lecture réalistes contre une instance locale, à concurrence croissante
+
+    flask --app app run                                      # ou gunicorn -w 4 app:app
+    python benchmarks/loadtest.py --url http://localhost:5000 --seed 10
+    python benchmarks/loadtest.py --reuse --concurrency 1 4 16 64 --duration 60 --output charge.json
+
+Chaque utilisateur virtuel enchaîne des sessions : lecteur (viewer puis pages dans l'ordre, avec temps de
+lecture), éditeur (ajout, modification, suppression de hotspot) ou upload d'un petit PDF.
+"""
+
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import http.client
+from urllib.parse import urlsplit
+from collections import defaultdict
+
+from common import make_pdf, summarize, write_results
+
+STATE_FILE = os.path.join(tempfile.gettempdir(), 'flipbook-loadtest.json')
+
+
+class Client:
+    """Connexion HTTP persistante d'un utilisateur virtuel ; chaque requête est enregistrée sous un nom de route"""
+    
+    def __init__(self, base_url, recorder, timeout=30):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.recorder = recorder
+        self.timeout = timeout
+        self.connection = None
+    
+    def request(self, route, method, path, body=None, headers=None):
+        headers = {"Accept-Encoding": "gzip", **(headers or {})}
+        start = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            # Connexion à rouvrir : le serveur l'a fermée ou n'a pas répondu à temps
+            if self.connection is not None:
+                self.connection.close()
+            self.connection = None
+            data, status = b'', None
+        self.recorder.record(route, (time.perf_counter() - start) * 1000, status)
+        return status, data
+    
+    def json(self, route, method, path, payload=None):
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        status, data = self.request(route, method, path, body, {"Content-Type": "application/json"} if body else None)
+        try:
+            return status, json.loads(data) if data else None
+        except ValueError:
+            return status, None
+    
+    def upload(self, route, pdf_bytes, filename='loadtest.pdf'):
+        boundary = f"----flipbook{random.getrandbits(64):x}"
+        body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+                f"Content-Type: application/pdf\r\n\r\n").encode('utf-8') + pdf_bytes + f"\r\n--{boundary}--\r\n".encode()
+        status, data = self.request(route, 'POST', '/upload', body,
+                                    {"Content-Type": f"multipart/form-data; boundary={boundary}"})
+        try:
+            return status, json.loads(data) if data else None
+        except ValueError:
+            return status, None
+    
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+
+class Recorder:
+    """Latences et statuts par route, partagés entre les utilisateurs virtuels"""
+    
+    def __init__(self):
+        self._samples = defaultdict(list)
+        self._errors = defaultdict(int)
+        self._lock = threading.Lock()
+    
+    def record(self, route, latency_ms, status):
+        with self._lock:
+            self._samples[route].append(latency_ms)
+            # 304 : revalidation réussie ; 503 (zoom occupé) compte comme erreur, c'est un refus de service
+            if status is None or status >= 400:
+                self._errors[route] += 1
+    
+    def report(self, duration):
+        with self._lock:
+            samples = {route: list(values) for route, values in self._samples.items()}
+            errors = dict(self._errors)
+        total = sum(len(values) for values in samples.values())
+        return {
+            "requests": total,
+            "throughput_rps": round(total / duration, 2),
+            "error_rate": round(sum(errors.values()) / total, 4) if total else 0,
+            "latency": summarize([v for values in samples.values() for v in values]) if total else None,
+            "routes": {route: {
+                "requests": len(values),
+                "errors": errors.get(route, 0),
+                **_percentiles(values)
+            } for route, values in sorted(samples.items())}
+        }
+
+
+def _percentiles(values):
+    ordered = sorted(values)
+    return {f"p{p}_ms": round(ordered[max(0, -(-p * len(ordered) // 100) - 1)], 2) for p in (50, 90, 99)}
+
+
+def reader_session(client, rng, flipbook, args):
+    """Ouvre le viewer puis lit les pages dans l'ordre, avec un temps de lecture par page"""
+    flipbook_id, pages_count = flipbook["id"], flipbook["pages_count"]
+    client.request('view', 'GET', f"/view/{flipbook_id}")
+    client.request('manifest', 'GET', f"/flipbook/{flipbook_id}/manifest.json")
+    # La plupart des lecteurs s'arrêtent avant la fin
+    last_page = min(pages_count, max(1, int(rng.expovariate(1 / max(1, pages_count / 3)))))
+    for page in range(1, last_page + 1):
+        client.request('page', 'GET', f"/view/{flipbook_id}/pages/page_{page}.jpg")
+        if rng.random() < args.zoom_ratio:
+            client.request('zoom', 'GET', f"/view/{flipbook_id}/zoom/180/page_{page}.jpg")
+        think(rng, args.think)
+
+
+def editor_session(client, rng, flipbook, args):
+    """Ajoute, déplace puis supprime un hotspot"""
+    api = f"/api/flipbook/{flipbook['id']}/hotspots"
+    client.json('api_hotspots', 'GET', api)
+    status, data = client.json('api_add_hotspot', 'POST', api, {
+        "page": rng.randint(1, flipbook["pages_count"]), "x": rng.uniform(0, 80), "y": rng.uniform(0, 80),
+        "width": 10, "height": 5, "type": "url", "target": "https://example.com", "label": "charge"
+    })
+    if status != 200 or not data:
+        return
+    hotspot_id = data["hotspot"]["id"]
+    think(rng, args.think)
+    client.json('api_update_hotspot', 'PATCH', f"{api}/{hotspot_id}", {"x": rng.uniform(0, 80)})
+    think(rng, args.think)
+    client.json('api_delete_hotspot', 'DELETE', f"{api}/{hotspot_id}")
+
+
+def upload_session(client, rng, pdf_bytes, args):
+    status, data = client.upload('upload', pdf_bytes)
+    if status == 200 and data and data.get("success"):
+        client.json('upload_status', 'GET', f"/upload/status/{data['flipbook_id']}")
+
+
+def think(rng, mean):
+    if mean > 0:
+        time.sleep(rng.expovariate(1 / mean))
+
+
+def run_step(args, flipbooks, upload_pdf, concurrency):
+    """concurrency utilisateurs virtuels pendant args.duration secondes"""
+    recorder = Recorder()
+    deadline = time.monotonic() + args.duration
+    sessions = defaultdict(int)
+    sessions_lock = threading.Lock()
+    
+    def virtual_user(index):
+        rng = random.Random(args.random_seed * 1000 + index)
+        client = Client(args.url, recorder)
+        try:
+            while time.monotonic() < deadline:
+                draw = rng.random()
+                if draw < args.upload_ratio:
+                    kind = 'upload'
+                    upload_session(client, rng, upload_pdf, args)
+                elif draw < args.upload_ratio + args.edit_ratio:
+                    kind = 'editor'
+                    editor_session(client, rng, rng.choice(flipbooks), args)
+                else:
+                    kind = 'reader'
+                    reader_session(client, rng, rng.choice(flipbooks), args)
+                with sessions_lock:
+                    sessions[kind] += 1
+        finally:
+            client.close()
+    
+    threads = [threading.Thread(target=virtual_user, args=(i,), daemon=True) for i in range(concurrency)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Les sessions en cours à l'échéance se terminent : la durée réelle peut dépasser args.duration
+    elapsed = time.monotonic() - start
+    return {"concurrency": concurrency, "duration_s": round(elapsed, 1), "sessions": dict(sessions),
+            **recorder.report(elapsed)}
+
+
+def seed(args, tmp_dir):
+    """Uploade args.seed flipbooks synthétiques et mémorise leurs identifiants"""
+    client = Client(args.url, Recorder(), timeout=600)
+    flipbooks = []
+    kinds = ('text', 'mixed', 'image')
+    for i in range(args.seed):
+        pages_count = args.pages[i % len(args.pages)]
+        pdf_path = make_pdf(os.path.join(tmp_dir, f"seed-{i}.pdf"), kinds[i % len(kinds)], pages_count, seed=i)
+        with open(pdf_path, 'rb') as f:
+            status, data = client.upload('seed', f.read(), os.path.basename(pdf_path))
+        if status != 200 or not data or not data.get("success"):
+            raise SystemExit(f"Upload {i + 1}/{args.seed} impossible ({status}) : {data}")
+        flipbooks.append({"id": data["flipbook_id"], "pages_count": data["pages_count"]})
+        print(f"  flipbook {i + 1}/{args.seed} : {data['pages_count']} pages", flush=True)
+    client.close()
+    
+    with open(args.state, 'w', encoding='utf-8') as f:
+        json.dump({"url": args.url, "flipbooks": flipbooks}, f, indent=2)
+    return flipbooks
+
+
+def saturation(steps, gain=1.1):
+    """Première concurrence dont le débit ne progresse plus d'au moins 10 % (ou dont les erreurs dépassent 1 %)"""
+    for previous, step in zip(steps, steps[1:]):
+        if step["throughput_rps"] < previous["throughput_rps"] * gain or step["error_rate"] > 0.01:
+            return step["concurrency"]
+    return None
+
+
+def print_step(step):
+    latency = step["latency"] or {}
+    print(f"\nconcurrence {step['concurrency']} : {step['requests']} requêtes, {step['throughput_rps']} req/s, "
+          f"erreurs {step['error_rate'] * 100:.2f} %, médiane {latency.get('median_ms', 0):.1f}ms, "
+          f"p90 {latency.get('p90_ms', 0):.1f}ms — sessions {step['sessions']}")
+    for route, r in step["routes"].items():
+        print(f"  {route:>20} {r['requests']:>7} req {r['errors']:>5} err "
+              f"{r['p50_ms']:>9.1f} {r['p90_ms']:>9.1f} {r['p99_ms']:>9.1f} ms (p50 p90 p99)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--seed', type=int, default=10, help="Flipbooks à créer avant le test")
+    parser.add_argument('--pages', type=int, nargs='+', default=[12, 40, 120], help="Tailles des flipbooks créés")
+    parser.add_argument('--reuse', action='store_true', help="Réutiliser les flipbooks créés au lancement précédent")
+    parser.add_argument('--state', default=STATE_FILE, help="Fichier des flipbooks créés")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--duration', type=float, default=30, help="Durée de chaque palier (secondes)")
+    parser.add_argument('--think', type=float, default=1.0, help="Temps de lecture moyen par page (secondes)")
+    parser.add_argument('--edit-ratio', type=float, default=0.1, help="Part des sessions d'édition")
+    parser.add_argument('--upload-ratio', type=float, default=0.02, help="Part des sessions d'upload")
+    parser.add_argument('--zoom-ratio', type=float, default=0.02, help="Probabilité de zoom HD par page lue")
+    parser.add_argument('--random-seed', type=int, default=0)
+    parser.add_argument('--output', help="Fichier de résultats JSON ('-' : sortie standard)")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.reuse and os.path.exists(args.state):
+            with open(args.state, 'r', encoding='utf-8') as f:
+                flipbooks = json.load(f)["flipbooks"]
+            print(f"{len(flipbooks)} flipbooks réutilisés ({args.state})")
+        else:
+            print(f"Création de {args.seed} flipbooks sur {args.url}")
+            flipbooks = seed(args, tmp_dir)
+        with open(make_pdf(os.path.join(tmp_dir, 'upload.pdf'), 'mixed', 4), 'rb') as f:
+            upload_pdf = f.read()
+        
+        steps = []
+        for concurrency in args.concurrency:
+            steps.append(run_step(args, flipbooks, upload_pdf, concurrency))
+            if args.output != '-':
+                print_step(steps[-1])
+    
+    saturated = saturation(steps)
+    if args.output != '-':
+        print(f"\nSaturation probable à partir de {saturated} utilisateurs" if saturated
+              else "\nPas de saturation observée sur ces paliers")
+    if args.output:
+        write_results(args.output, 'loadtest', {"saturation_concurrency": saturated, "steps": steps}, vars(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Lance toute la suite de benchmarks et écrit un fichier JSON par suite
+
+    python benchmarks/run_all.py --output resultats/avant
+    python benchmarks/run_all.py --output resultats/apres --compare resultats/avant
+    python benchmarks/run_all.py --full --output resultats/complet    # jusqu'à 2000 pages
+
+Chaque suite tourne dans son propre processus (bac à sable et mémoire indépendants).
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# suite -> arguments (rapide, complet)
+SUITES = {
+    "conversion": (["--pages", "10", "100"], ["--pages", "10", "200", "2000", "--repeat", "1", "--cache", ".cache"]),
+    "generator": (["--pages", "20", "200", "1000"], ["--pages", "20", "200", "2000", "--hotspots", "0", "1000", "10000"]),
+    "storage": (["--library", "10", "100", "1000"], ["--library", "10", "100", "1000", "5000"]),
+    "routes": (["--pages", "20"], ["--pages", "20", "200", "--hotspots", "500", "--requests", "100"])
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', required=True, help="Dossier des résultats JSON")
+    parser.add_argument('--suites', nargs='+', choices=list(SUITES), default=list(SUITES))
+    parser.add_argument('--full', action='store_true', help="Grilles complètes (long)")
+    parser.add_argument('--compare', help="Dossier de résultats de référence")
+    args = parser.parse_args()
+    
+    os.makedirs(args.output, exist_ok=True)
+    for suite in args.suites:
+        print(f"== {suite}", flush=True)
+        output = os.path.join(os.path.abspath(args.output), f"{suite}.json")
+        subprocess.run([sys.executable, os.path.join(HERE, f"bench_{suite}.py"), *SUITES[suite][args.full],
+                        '--output', output], cwd=HERE, check=True)
+    
+    if args.compare:
+        return subprocess.run([sys.executable, os.path.join(HERE, 'compare.py'), args.compare, args.output]).returncode
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
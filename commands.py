@@ -0,0 +1,66 @@
+"""Commandes CLI Flask (flask --app app <commande>)"""
+
+import os
+import click
+from services.static_exporter import export_flipbook, export_library
+from services.vendor_assets import vendor_assets, vendor_dependencies, VENDOR_ASSETS, VENDOR_INTEGRITY
+
+
+@click.command('export')
+@click.argument('output_dir')
+@click.option('--id', 'flipbook_ids', multiple=True, help="Flipbook à exporter (répétable, défaut : tous)")
+@click.option('--zip', 'as_zip', is_flag=True, help="Une archive zip par flipbook")
+@click.option('--allow-cdn', is_flag=True, help="Exporter sans dépendances vendorisées (chargées depuis le CDN)")
+def export_command(output_dir, flipbook_ids, as_zip, allow_cdn):
+    """Exporte les flipbooks en bundles statiques (CDN / hors ligne)"""
+    if flipbook_ids:
+        results = {}
+        for flipbook_id in flipbook_ids:
+            target = os.path.join(output_dir, f"{flipbook_id}.zip" if as_zip else flipbook_id)
+            results[flipbook_id] = export_flipbook(flipbook_id, target, as_zip, allow_cdn)
+    else:
+        results = export_library(output_dir, as_zip, allow_cdn)
+    
+    failures = 0
+    for flipbook_id, result in results.items():
+        if result["success"]:
+            click.echo(f"OK      {flipbook_id} -> {result['path']} ({result['files_count']} fichiers)")
+        else:
+            failures += 1
+            click.echo(f"ERREUR  {flipbook_id} : {result['error']}", err=True)
+    
+    click.echo(f"{len(results) - failures}/{len(results)} flipbook(s) exporté(s)")
+    if failures:
+        raise SystemExit(1)
+
+
+@click.command('vendor')
+@click.option('--from', 'source_dir', help="Dossier contenant les fichiers déjà téléchargés (installation hors ligne)")
+@click.option('--check', is_flag=True, help="Vérifie seulement que les copies locales et les empreintes figées sont présentes")
+def vendor_command(source_dir, check):
+    """Auto-héberge les dépendances tierces du viewer (static/vendor, noms empreintés)"""
+    if check:
+        missing, unpinned = vendor_assets.missing(), [name for name in VENDOR_ASSETS if not VENDOR_INTEGRITY.get(name)]
+        for name in VENDOR_ASSETS:
+            status = 'ERREUR ' if name in missing or name in unpinned else 'OK     '
+            click.echo(f"{status} {name} : {'copie locale absente' if name in missing else 'vendorisé'}, "
+                       f"{'empreinte non figée' if name in unpinned else 'empreinte figée'}")
+        if missing or unpinned:
+            raise SystemExit(1)
+        return
+    
+    result = vendor_dependencies(source_dir)
+    if not result["success"]:
+        click.echo(f"ERREUR  {result['error']}", err=True)
+        raise SystemExit(1)
+    
+    for name, entry in result["files"].items():
+        click.echo(f"OK      {name} -> {entry['file']} ({entry['integrity']})")
+        if not VENDOR_INTEGRITY.get(name):
+            click.echo(f"        empreinte à figer dans VENDOR_INTEGRITY : \"{name}\": \"{entry['integrity']}\"")
+
+
+def register_commands(app):
+    """Enregistre les commandes CLI sur l'application"""
+    app.cli.add_command(export_command)
+    app.cli.add_command(vendor_command)
@@ -8,6 +8,9 @@ UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
 FLIPBOOK_FOLDER = os.path.join(BASE_DIR, 'flipbooks')
 DATA_FOLDER = os.path.join(BASE_DIR, 'data')
 METADATA_FILE = os.path.join(DATA_FOLDER, 'flipbooks.json')
+VENDOR_FOLDER = os.path.join(BASE_DIR, 'static', 'vendor')  # Dépendances tierces du viewer (empreintées)
+PROFILE_FOLDER = os.path.join(DATA_FOLDER, 'profiles')  # Profils des requêtes (dossier tournant)
+TELEMETRY_FOLDER = os.path.join(DATA_FOLDER, 'telemetry')  # Mesures envoyées par les viewers (un journal par processus)
 
 # Limites upload
 MAX_FILE_SIZE = 30 * 1024 * 1024  # 30 MB
@@ -18,9 +21,66 @@ PDF_DPI = 120
 MAX_IMAGE_WIDTH = 1200
 IMAGE_QUALITY = 75
 IMAGE_FORMAT = 'JPEG'
+PLACEHOLDER_WIDTH = 16  # Aperçu flou inline (LQIP), en pixels
+PLACEHOLDER_QUALITY = 40
+IMPORT_PDF_LINKS = True  # Liens du PDF (URL, renvois de page) importés comme hotspots à la conversion
 ALLOWED_EXTENSIONS = {'pdf'}
 ALLOWED_MIME_TYPES = ['application/pdf']
 
+# Viewer
+VIEWER_VERSION = '12'  # Version du runtime partagé (static/viewer), à incrémenter à chaque modification
+VIEWER_ASSETS_MAX_AGE = 365 * 24 * 3600  # Cache navigateur du runtime versionné
+VIEWER_PREFETCH_PAGES = 3  # Pages préchargées dans le sens de lecture
+VIEWER_IMAGE_CONCURRENCY = 3  # Téléchargements d'images simultanés (mode magazine)
+VIEWER_MAX_DPR = 2  # Plafond de devicePixelRatio pour le canvas du tour de page
+VIEWER_OFFSCREEN_CANVAS = False  # Rendu du tour de page dans un worker (OffscreenCanvas)
+VIEWER_PLACEHOLDER_WINDOW = 6  # Pages dont l'aperçu est inliné dans le viewer
+VIEWER_PRECOMPRESS = True  # Variantes .gz (et .br si le module brotli est installé) des fichiers générés
+
+# Régénération différée des viewers (demandes fusionnées)
+REGENERATION_DEBOUNCE = 1.0  # Délai de calme avant d'exécuter une régénération (secondes)
+REGENERATION_MAX_DELAY = 10.0  # Attente maximale depuis la première demande, même sous un flux continu
+
+# Zoom haute définition (rendu à la demande depuis le PDF)
+ZOOM_HIRES_THRESHOLD = 1.25  # Zoom à partir duquel le viewer demande une page plus nette
+ZOOM_DPI_BUCKETS = (180, 240, 300)  # Seules résolutions rendues (et mises en cache)
+ZOOM_MAX_PIXELS = 12_000_000  # Plafond de pixels d'un rendu, quelle que soit la page
+ZOOM_RENDER_CONCURRENCY = 2  # Rendus simultanés par processus
+ZOOM_RENDER_TIMEOUT = 10  # Attente maximale d'un créneau de rendu (secondes), sinon 503
+
+# Éditeur
+HOTSPOT_BATCH_MAX = 1000  # Opérations par requête de l'API de hotspots par lot
+
+# Trace des uploads (durée, CPU, octets écrits, mémoire par étape)
+UPLOAD_TRACE_HISTORY = 200  # Derniers uploads retenus pour les percentiles (/upload/stats)
+UPLOAD_TRACE_LOG = True  # Une ligne JSON par upload sur stderr
+UPLOAD_TRACE_RSS_INTERVAL = 0.05  # Intervalle des relevés de mémoire résidente pendant une étape (secondes)
+
+# Métriques Prometheus (/metrics, nécessite prometheus_client)
+METRICS_ENABLED = True
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)  # Routes, métadonnées (secondes)
+METRICS_STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)  # Étapes d'upload, régénérations
+
+# Profilage des requêtes (échantillonneur de piles, FLIPBOOK_PROFILER=1 pour l'activer)
+PROFILER_ENABLED = os.environ.get('FLIPBOOK_PROFILER') == '1'
+PROFILER_SAMPLE_RATE = 0.01  # Part des requêtes profilées quelle que soit leur durée
+PROFILER_SLOW_THRESHOLD = 1.0  # Requêtes toujours profilées au-delà de cette durée (secondes)
+PROFILER_INTERVAL = 0.005  # Intervalle entre deux relevés de pile (secondes)
+PROFILER_MAX_FILES = 200  # Profils conservés, les plus anciens sont supprimés
+
+# Télémétrie des viewers (mesures de performance côté lecteur, envoyées par sendBeacon)
+TELEMETRY_ENABLED = True
+TELEMETRY_SAMPLE_RATE = 1.0  # Part des sessions de lecture mesurées
+TELEMETRY_BATCH_SIZE = 20  # Mesures regroupées par envoi côté viewer
+TELEMETRY_BATCH_INTERVAL = 15  # Envoi au plus tard après ce délai (secondes)
+TELEMETRY_MAX_EVENTS = 200  # Mesures acceptées par envoi, le reste est ignoré
+TELEMETRY_MAX_BODY = 32 * 1024  # Taille maximale d'un envoi (octets)
+TELEMETRY_FLUSH_EVENTS = 500  # Écriture du journal dès ce nombre de mesures en attente
+TELEMETRY_FLUSH_INTERVAL = 10  # ... ou au plus tard après ce délai (secondes)
+TELEMETRY_LOG_MAX_BYTES = 50 * 1024 * 1024  # Au-delà, le journal du processus est renommé en .1
+TELEMETRY_WINDOW = 500  # Dernières valeurs conservées par flipbook, mode et mesure pour les percentiles
+TELEMETRY_MAX_SERIES = 5000  # Séries (flipbook, mode, mesure) conservées en mémoire, les plus anciennes sont abandonnées
+
 # Messages
 MESSAGES = {
     'no_file': 'Aucun fichier sélectionné',
@@ -37,6 +97,7 @@ class Config:
     UPLOAD_FOLDER = UPLOAD_FOLDER
     MAX_CONTENT_LENGTH = MAX_FILE_SIZE
     JSON_SORT_KEYS = False
+    PROFILER_ENABLED = PROFILER_ENABLED
 
 
 class DevelopmentConfig(Config):
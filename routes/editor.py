@@ -1,10 +1,80 @@
 """Route de l'éditeur de flipbook"""
 
+import uuid
 from flask import Blueprint, render_template, abort, request, jsonify
 from services.storage_manager import storage
+from services.telemetry import get_telemetry_summary
+from config import HOTSPOT_BATCH_MAX
 
 editor_bp = Blueprint('editor', __name__)
 
+HOTSPOT_REQUIRED = ['page', 'x', 'y', 'width', 'height', 'type']
+HOTSPOT_EDITABLE = ['x', 'y', 'width', 'height', 'type', 'target', 'label']
+HOTSPOT_TYPES = ('url', 'page')
+# Position et taille en pourcentage de la page
+HOTSPOT_GEOMETRY = ('x', 'y', 'width', 'height')
+
+
+def build_hotspot(data):
+    """Nouveau hotspot à partir des champs reçus (identifiant généré)"""
+    return {
+        'id': str(uuid.uuid4())[:8],
+        'page': data['page'],
+        'x': data['x'],
+        'y': data['y'],
+        'width': data['width'],
+        'height': data['height'],
+        'type': data['type'],  # 'url' ou 'page'
+        'target': data.get('target', ''),
+        'label': data.get('label', '')
+    }
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_hotspot_fields(data, pages_count):
+    """Message d'erreur du premier champ invalide parmi ceux fournis, ou None"""
+    if 'page' in data and (not isinstance(data['page'], int) or isinstance(data['page'], bool)
+                           or not 1 <= data['page'] <= pages_count):
+        return f"page : entier de 1 à {pages_count} attendu"
+    for key in HOTSPOT_GEOMETRY:
+        if key in data and (not is_number(data[key]) or not 0 <= data[key] <= 100):
+            return f"{key} : nombre de 0 à 100 attendu"
+    if 'type' in data and data['type'] not in HOTSPOT_TYPES:
+        return "type : 'url' ou 'page' attendu"
+    for key in ('target', 'label'):
+        if key in data and not isinstance(data[key], str) and not is_number(data[key]):
+            return f"{key} : texte attendu"
+    return None
+
+
+def validate_hotspot_operation(operation, known_ids, pages_count):
+    """Message d'erreur d'une opération du lot, ou None si elle est applicable"""
+    if not isinstance(operation, dict):
+        return "Opération invalide"
+    
+    op = operation.get('op')
+    if op == 'create':
+        data = operation.get('hotspot')
+        if not isinstance(data, dict) or not all(k in data for k in HOTSPOT_REQUIRED):
+            return "Champs manquants"
+        return validate_hotspot_fields(data, pages_count)
+    
+    if op in ('update', 'delete'):
+        if operation.get('id') not in known_ids:
+            return "Hotspot introuvable"
+        if op == 'update':
+            data = operation.get('hotspot')
+            if not isinstance(data, dict):
+                return "Données invalides"
+            # Seuls les champs modifiables sont appliqués : ce sont eux qui sont vérifiés
+            return validate_hotspot_fields({k: data[k] for k in HOTSPOT_EDITABLE if k in data}, pages_count)
+        return None
+    
+    return "Opération inconnue"
+
 
 @editor_bp.route('/editor')
 def editor_home():
@@ -49,30 +119,11 @@ def api_update_flipbook(flipbook_id):
     if not data:
         return jsonify({"success": False, "error": "Données invalides"}), 400
     
-    # Champs modifiables
+    # Champs modifiables (le viewer les lit dans son manifeste, sans régénération)
     allowed_fields = ['title', 'mode', 'background_color', 'background_image', 'logo']
     
-    # Vérifier si on doit régénérer le viewer
-    regenerate_fields = ['mode', 'background_color']
-    should_regenerate = any(field in data for field in regenerate_fields)
-    
     success = storage.update_flipbook_metadata(flipbook_id, data, allowed_fields)
     
-    if success and should_regenerate:
-        # Régénérer le viewer avec les nouveaux paramètres
-        from services.flipbook_generator import generate_viewer
-        
-        metadata = storage.get_flipbook_metadata(flipbook_id)
-        flipbook_path = storage.get_flipbook_path(flipbook_id)
-        
-        generate_viewer(
-            flipbook_id,
-            metadata.get('pages_count', 0),
-            flipbook_path,
-            mode=metadata.get('mode', 'default'),
-            background_color=metadata.get('background_color', '#0f0f0f')
-        )
-    
     if success:
         flipbook = storage.get_flipbook_metadata(flipbook_id)
         return jsonify({"success": True, "flipbook": flipbook})
@@ -102,13 +153,17 @@ def api_get_pages(flipbook_id):
     
     metadata = storage.get_flipbook_metadata(flipbook_id)
     pages_count = metadata.get('pages_count', 0)
+    pages_info = {p["number"]: p for p in storage.ensure_pages_info(flipbook_id, pages_count)}
     
     pages = []
     for i in range(1, pages_count + 1):
-        pages.append({
+        page = {
             "number": i,
             "url": f"/view/{flipbook_id}/pages/page_{i}.jpg"
-        })
+        }
+        # Dimensions rendues (px), format PDF (points) et rotation
+        page.update({k: v for k, v in pages_info.get(i, {}).items() if k != "number"})
+        pages.append(page)
     
     return jsonify({
         "success": True,
@@ -139,33 +194,19 @@ def api_add_hotspot(flipbook_id):
     if not data:
         return jsonify({"success": False, "error": "Données invalides"}), 400
     
-    required = ['page', 'x', 'y', 'width', 'height', 'type']
-    if not all(k in data for k in required):
+    if not all(k in data for k in HOTSPOT_REQUIRED):
         return jsonify({"success": False, "error": "Champs manquants"}), 400
     
     metadata = storage.get_flipbook_metadata(flipbook_id)
+    error = validate_hotspot_fields(data, metadata.get('pages_count', 0))
+    if error:
+        return jsonify({"success": False, "error": error}), 400
     hotspots = metadata.get('hotspots', [])
     
-    # Générer un ID unique
-    import uuid
-    hotspot = {
-        'id': str(uuid.uuid4())[:8],
-        'page': data['page'],
-        'x': data['x'],
-        'y': data['y'],
-        'width': data['width'],
-        'height': data['height'],
-        'type': data['type'],  # 'url' ou 'page'
-        'target': data.get('target', ''),
-        'label': data.get('label', '')
-    }
-    
+    hotspot = build_hotspot(data)
     hotspots.append(hotspot)
     storage.update_flipbook_metadata(flipbook_id, {'hotspots': hotspots})
     
-    # Régénérer le viewer
-    regenerate_viewer_with_hotspots(flipbook_id)
-    
     return jsonify({"success": True, "hotspot": hotspot})
 
 
@@ -181,9 +222,6 @@ def api_delete_hotspot(flipbook_id, hotspot_id):
     hotspots = [h for h in hotspots if h.get('id') != hotspot_id]
     storage.update_flipbook_metadata(flipbook_id, {'hotspots': hotspots})
     
-    # Régénérer le viewer
-    regenerate_viewer_with_hotspots(flipbook_id)
-    
     return jsonify({"success": True})
 
 
@@ -198,35 +236,95 @@ def api_update_hotspot(flipbook_id, hotspot_id):
         return jsonify({"success": False, "error": "Données invalides"}), 400
     
     metadata = storage.get_flipbook_metadata(flipbook_id)
+    error = validate_hotspot_fields({k: data[k] for k in HOTSPOT_EDITABLE if k in data}, metadata.get('pages_count', 0))
+    if error:
+        return jsonify({"success": False, "error": error}), 400
     hotspots = metadata.get('hotspots', [])
     
     for h in hotspots:
         if h.get('id') == hotspot_id:
-            for key in ['x', 'y', 'width', 'height', 'type', 'target', 'label']:
+            for key in HOTSPOT_EDITABLE:
                 if key in data:
                     h[key] = data[key]
             break
     
     storage.update_flipbook_metadata(flipbook_id, {'hotspots': hotspots})
     
-    # Régénérer le viewer
-    regenerate_viewer_with_hotspots(flipbook_id)
-    
     return jsonify({"success": True})
 
 
-def regenerate_viewer_with_hotspots(flipbook_id):
-    """Régénère le viewer avec les hotspots"""
-    from services.flipbook_generator import generate_viewer
+@editor_bp.route('/api/flipbook/<flipbook_id>/hotspots/batch', methods=['POST'])
+def api_batch_hotspots(flipbook_id):
+    """API: Créer, modifier et supprimer des hotspots par lot (tout ou rien, une seule écriture)"""
+    if not storage.flipbook_exists(flipbook_id):
+        return jsonify({"success": False, "error": "Flipbook introuvable"}), 404
     
-    metadata = storage.get_flipbook_metadata(flipbook_id)
-    flipbook_path = storage.get_flipbook_path(flipbook_id)
-    
-    generate_viewer(
-        flipbook_id,
-        metadata.get('pages_count', 0),
-        flipbook_path,
-        mode=metadata.get('mode', 'default'),
-        background_color=metadata.get('background_color', '#0f0f0f'),
-        hotspots=metadata.get('hotspots', [])
-    )
+    data = request.get_json(silent=True) or {}
+    operations = data.get('operations')
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"success": False, "error": "Données invalides"}), 400
+    if len(operations) > HOTSPOT_BATCH_MAX:
+        return jsonify({"success": False, "error": f"{HOTSPOT_BATCH_MAX} opérations maximum par lot"}), 400
+    
+    results = []
+    
+    def apply(flipbook):
+        hotspots = flipbook.get('hotspots', [])
+        by_id = {h.get('id'): h for h in hotspots}
+        
+        # Validation complète avant toute modification
+        errors = []
+        known_ids = set(by_id)
+        for index, operation in enumerate(operations):
+            error = validate_hotspot_operation(operation, known_ids, flipbook.get('pages_count', 0))
+            if error:
+                errors.append({"index": index, "success": False, "error": error})
+            elif operation['op'] == 'delete':
+                known_ids.discard(operation['id'])
+        if errors:
+            results.extend(errors)
+            raise ValueError("Lot rejeté")
+        
+        deleted = set()
+        for operation in operations:
+            op = operation['op']
+            if op == 'create':
+                hotspot = build_hotspot(operation['hotspot'])
+                hotspots.append(hotspot)
+                results.append({"op": op, "success": True, "hotspot": hotspot})
+            elif op == 'update':
+                hotspot = by_id[operation['id']]
+                for key in HOTSPOT_EDITABLE:
+                    if key in operation['hotspot']:
+                        hotspot[key] = operation['hotspot'][key]
+                results.append({"op": op, "id": operation['id'], "success": True, "hotspot": hotspot})
+            else:
+                deleted.add(operation['id'])
+                results.append({"op": op, "id": operation['id'], "success": True})
+        
+        flipbook['hotspots'] = [h for h in hotspots if h.get('id') not in deleted]
+    
+    try:
+        success = storage.modify_flipbook_metadata(flipbook_id, apply)
+    except ValueError:
+        return jsonify({"success": False, "error": "Opérations invalides", "results": results}), 400
+    
+    if not success:
+        return jsonify({"success": False, "error": "Erreur de sauvegarde"}), 500
+    
+    return jsonify({"success": True, "results": results})
+
+
+@editor_bp.route('/api/telemetry')
+def api_telemetry():
+    """API: Percentiles des mesures des viewers, par mode et par flipbook (?scope=all : tous les workers)"""
+    return jsonify({"success": True, **get_telemetry_summary(scope=request.args.get('scope', 'process'))})
+
+
+@editor_bp.route('/api/flipbook/<flipbook_id>/telemetry')
+def api_flipbook_telemetry(flipbook_id):
+    """API: Percentiles des mesures du viewer d'un flipbook, par mode, et temps moyen par page"""
+    if not storage.flipbook_exists(flipbook_id):
+        return jsonify({"success": False, "error": "Flipbook introuvable"}), 404
+    
+    return jsonify({"success": True, **get_telemetry_summary(flipbook_id, request.args.get('scope', 'process'))})
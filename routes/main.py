@@ -2,6 +2,7 @@
 
 from flask import Blueprint, render_template
 from services.storage_manager import storage
+from services.metrics import is_enabled as metrics_enabled, render_metrics
 
 main_bp = Blueprint('main', __name__)
 
@@ -19,3 +20,12 @@ def index():
 def health():
     """Endpoint de santé"""
     return {"status": "ok", "service": "FlipBook SaaS"}
+
+
+@main_bp.route('/metrics')
+def metrics():
+    """Métriques au format Prometheus"""
+    if not metrics_enabled():
+        return {"success": False, "error": "Métriques indisponibles (prometheus_client non installé ou désactivé)"}, 503
+    body, content_type = render_metrics()
+    return body, 200, {"Content-Type": content_type}
@@ -3,10 +3,11 @@
 import os
 import magic
 from flask import Blueprint, request, jsonify
-from config import allowed_file, ALLOWED_MIME_TYPES, MESSAGES
+from config import allowed_file, ALLOWED_MIME_TYPES, MESSAGES, VIEWER_VERSION, IMPORT_PDF_LINKS, METADATA_FILE
 from services.storage_manager import storage
 from services.pdf_processor import convert_pdf_to_images, get_pdf_info
 from services.flipbook_generator import generate_viewer
+from services.upload_trace import UploadTrace, get_upload_trace, get_upload_stats
 
 upload_bp = Blueprint('upload', __name__)
 
@@ -44,57 +45,100 @@ def upload_pdf():
     if not valid:
         return jsonify({"success": False, "error": error}), 400
     
+    # Import des liens du PDF en hotspots (désactivable par import_links=0)
+    import_links = request.form.get('import_links', '1' if IMPORT_PDF_LINKS else '0') not in ('0', 'false', 'off')
+    
+    # Chaque étape est mesurée : durée, CPU, octets écrits, pic mémoire
+    trace = UploadTrace()
+    
+    def fail(message, status_code, flipbook_id=None):
+        if flipbook_id:
+            storage.delete_flipbook(flipbook_id)
+        trace.finish("failed", message)
+        return jsonify({"success": False, "error": message}), status_code
+    
     # Création flipbook
     try:
         flipbook_id = storage.create_flipbook_id()
+        trace.flipbook_id = flipbook_id
         paths = storage.create_flipbook_directory(flipbook_id)
         pdf_path = storage.get_upload_path(flipbook_id)
-        file.save(pdf_path)
+        with trace.stage("save") as stage:
+            file.save(pdf_path)
+            stage["bytes_written"] = os.path.getsize(pdf_path)
         
         # Info PDF
-        pdf_info = get_pdf_info(pdf_path)
+        with trace.stage("pdf_info"):
+            pdf_info = get_pdf_info(pdf_path)
         if not pdf_info["success"]:
-            storage.delete_flipbook(flipbook_id)
-            return jsonify({"success": False, "error": MESSAGES['invalid_pdf']}), 400
+            return fail(MESSAGES['invalid_pdf'], 400, flipbook_id)
         
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+        return fail(str(e), 500)
     
     # Conversion
     try:
-        result = convert_pdf_to_images(pdf_path, paths["base_path"])
+        with trace.stage("convert", paths["base_path"]) as stage:
+            result = convert_pdf_to_images(pdf_path, paths["base_path"], import_links)
+            if result["success"]:
+                trace.pages_count = stage["pages"] = result["pages_count"]
         if not result["success"]:
-            storage.delete_flipbook(flipbook_id)
-            return jsonify({"success": False, "error": MESSAGES['conversion_error']}), 500
+            return fail(MESSAGES['conversion_error'], 500, flipbook_id)
+        
+    except Exception as e:
+        return fail(str(e), 500, flipbook_id)
+    
+    # Dimensions par page
+    try:
+        with trace.stage("pages_info") as stage:
+            saved = storage.save_pages_info(flipbook_id, result["pages"])
+            if saved:
+                stage["bytes_written"] = os.path.getsize(storage.get_pages_info_path(flipbook_id))
+        if not saved:
+            return fail(MESSAGES['conversion_error'], 500, flipbook_id)
         
     except Exception as e:
-        storage.delete_flipbook(flipbook_id)
-        return jsonify({"success": False, "error": str(e)}), 500
+        return fail(str(e), 500, flipbook_id)
     
     # Génération viewer
     try:
-        viewer_result = generate_viewer(flipbook_id, result["pages_count"], paths["base_path"])
+        with trace.stage("viewer", paths["base_path"]):
+            viewer_result = generate_viewer(flipbook_id, result["pages_count"], paths["base_path"],
+                                            pages=result["pages"])
         if not viewer_result["success"]:
-            storage.delete_flipbook(flipbook_id)
-            return jsonify({"success": False, "error": MESSAGES['conversion_error']}), 500
+            return fail(MESSAGES['conversion_error'], 500, flipbook_id)
         
     except Exception as e:
-        storage.delete_flipbook(flipbook_id)
-        return jsonify({"success": False, "error": str(e)}), 500
+        return fail(str(e), 500, flipbook_id)
     
-    # Sauvegarde métadonnées
-    storage.save_flipbook_metadata(flipbook_id, {
-        "title": pdf_info.get("title", "Sans titre"),
-        "pages_count": result["pages_count"],
-        "pdf_size_bytes": os.path.getsize(pdf_path)
-    })
+    # Sauvegarde métadonnées (la trace enregistrée s'arrête avant cette étape ; complète dans le log et /upload/stats)
+    try:
+        with trace.stage("metadata") as stage:
+            saved = storage.save_flipbook_metadata(flipbook_id, {
+                "title": pdf_info.get("title", "Sans titre"),
+                "pages_count": result["pages_count"],
+                "pdf_size_bytes": os.path.getsize(pdf_path),
+                "viewer_version": VIEWER_VERSION,
+                "hotspots": result["hotspots"],
+                "upload_trace": {**trace.to_dict(), "status": "completed"}
+            })
+            if saved:
+                stage["bytes_written"] = os.path.getsize(METADATA_FILE)
+        if not saved:
+            return fail(MESSAGES['conversion_error'], 500, flipbook_id)
+        
+    except Exception as e:
+        return fail(str(e), 500, flipbook_id)
+    upload_trace = trace.finish()
     
     return jsonify({
         "success": True,
         "flipbook_id": flipbook_id,
         "url": f"/view/{flipbook_id}",
         "pages_count": result["pages_count"],
-        "title": pdf_info.get("title", "Sans titre")
+        "hotspots_count": len(result["hotspots"]),
+        "title": pdf_info.get("title", "Sans titre"),
+        "trace": upload_trace
     })
 
 
@@ -105,6 +149,13 @@ def upload_status(flipbook_id):
         return jsonify({
             "success": True,
             "status": "completed",
-            "metadata": storage.get_flipbook_metadata(flipbook_id)
+            "metadata": storage.get_flipbook_metadata(flipbook_id),
+            "trace": get_upload_trace(flipbook_id)
         })
     return jsonify({"success": False, "status": "not_found"}), 404
+
+
+@upload_bp.route('/upload/stats')
+def upload_stats():
+    """Percentiles par étape sur les derniers uploads du processus"""
+    return jsonify({"success": True, **get_upload_stats()})
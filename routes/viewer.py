@@ -1,12 +1,83 @@
 """Routes du viewer flipbook"""
 
 import os
-from flask import Blueprint, send_from_directory, abort, render_template
+import re
+import json
+from flask import Blueprint, send_from_directory, abort, render_template, request, current_app, jsonify
 from services.storage_manager import storage
-from config import MESSAGES
+from services.flipbook_generator import FlipbookGenerator, build_manifest, manifest_fingerprint
+from services.vendor_assets import vendor_assets
+from services.zoom_renderer import render_zoom_page
+from services.regeneration import schedule_regeneration, get_regeneration_status
+from services.atomic_writer import find_precompressed
+from services.telemetry import record_telemetry
+from config import MESSAGES, VIEWER_VERSION, VIEWER_ASSETS_MAX_AGE, TELEMETRY_ENABLED, TELEMETRY_MAX_BODY
 
 viewer_bp = Blueprint('viewer', __name__)
 
+FLIPBOOK_ID_PATTERN = re.compile(r'^[\w-]+$')
+
+
+def get_preload_links(flipbook_id, metadata):
+    """Valeurs d'en-tête Link: rel=preload pour le premier affichage du viewer"""
+    generator = FlipbookGenerator(
+        flipbook_id,
+        metadata.get('pages_count', 0),
+        mode=metadata.get('mode', 'default')
+    )
+    links = []
+    for resource in generator.get_preload_resources():
+        link = f"<{resource['url']}>; rel=preload; as={resource['as']}"
+        if 'integrity' in resource:
+            link += f'; integrity="{resource["integrity"]}"'
+        if 'crossorigin' in resource:
+            link += "; crossorigin"
+        if 'fetchpriority' in resource:
+            link += f"; fetchpriority={resource['fetchpriority']}"
+        links.append(link)
+    return links
+
+
+def send_early_hints(links):
+    """Envoie une réponse 103 Early Hints si le serveur WSGI le permet (ex. gunicorn)"""
+    early_hints = request.environ.get('wsgi.early_hints')
+    if not early_hints or not links:
+        return
+    try:
+        early_hints([('Link', link) for link in links])
+    except Exception:
+        pass  # Indication facultative
+
+
+def send_generated(directory, filename, mimetype, max_age=None):
+    """Sert un fichier généré, dans sa variante précompressée si le client l'accepte"""
+    path, encoding = find_precompressed(os.path.join(directory, filename), request.accept_encodings)
+    response = send_from_directory(directory, os.path.basename(path), mimetype=mimetype, max_age=max_age)
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.content_encoding = encoding
+    return response
+
+
+def send_flipbook_file(flipbook_id, filename, mimetype):
+    """Sert un fichier généré du flipbook, toujours revalidé (ETag)"""
+    if not storage.flipbook_exists(flipbook_id):
+        abort(404)
+    
+    flipbook_path = storage.get_flipbook_path(flipbook_id)
+    if not os.path.exists(os.path.join(flipbook_path, filename)):
+        abort(404)
+    
+    return send_generated(flipbook_path, filename, mimetype, max_age=0)
+
+
+def send_viewer(flipbook_id, links):
+    """Sert viewer.html avec les en-têtes de préchargement"""
+    response = send_generated(storage.get_flipbook_path(flipbook_id), 'viewer.html', 'text/html')
+    if links:
+        response.headers['Link'] = ', '.join(links)
+    return response
+
 
 @viewer_bp.route('/view/<flipbook_id>')
 def view_flipbook(flipbook_id):
@@ -18,23 +89,21 @@ def view_flipbook(flipbook_id):
             error_code=404
         ), 404
     
-    flipbook_path = storage.get_flipbook_path(flipbook_id)
-    viewer_file = os.path.join(flipbook_path, 'viewer.html')
+    metadata = storage.get_flipbook_metadata(flipbook_id)
+    links = get_preload_links(flipbook_id, metadata)
+    send_early_hints(links)
+    
+    viewer_file = os.path.join(storage.get_flipbook_path(flipbook_id), 'viewer.html')
     
     if not os.path.exists(viewer_file):
-        # Régénérer le viewer si nécessaire
-        from services.flipbook_generator import generate_viewer
-        metadata = storage.get_flipbook_metadata(flipbook_id)
-        generate_viewer(
-            flipbook_id, 
-            metadata.get('pages_count', 0), 
-            flipbook_path,
-            mode=metadata.get('mode', 'default'),
-            background_color=metadata.get('background_color', '#0f0f0f'),
-            hotspots=metadata.get('hotspots', [])
-        )
+        from services.flipbook_generator import rebuild_viewer
+        rebuild_viewer(flipbook_id)
+    elif metadata.get('viewer_version') != VIEWER_VERSION:
+        # Shell d'une autre version du runtime : servi tel quel (ses ressources restent valides),
+        # une seule régénération en arrière-plan pour tous les visiteurs
+        schedule_regeneration(flipbook_id)
     
-    return send_from_directory(flipbook_path, 'viewer.html')
+    return send_viewer(flipbook_id, links)
 
 
 @viewer_bp.route('/view/<flipbook_id>/pages/<filename>')
@@ -52,6 +121,79 @@ def serve_page(flipbook_id, filename):
     return send_from_directory(pages_dir, filename, mimetype='image/jpeg', max_age=86400)
 
 
+@viewer_bp.route('/view/<flipbook_id>/zoom/<int:dpi>/page_<int:page_num>.jpg')
+def serve_zoom_page(flipbook_id, dpi, page_num):
+    """Sert une page en haute définition pour le zoom (rendue à la première demande)"""
+    if not storage.flipbook_exists(flipbook_id):
+        abort(404)
+    
+    result = render_zoom_page(flipbook_id, page_num, dpi)
+    if not result["success"]:
+        if result.get("busy"):
+            return {"success": False, "error": result["error"]}, 503, {"Retry-After": "5"}
+        abort(404)
+    
+    return send_from_directory(os.path.dirname(result["path"]), os.path.basename(result["path"]),
+                               mimetype='image/jpeg', max_age=86400)
+
+
+@viewer_bp.route('/view/<flipbook_id>/sw.js')
+def serve_service_worker(flipbook_id):
+    """Sert le service worker du viewer (portée /view/<id>)"""
+    response = send_flipbook_file(flipbook_id, 'sw.js', 'application/javascript')
+    # Le script est sous /view/<id>/ mais contrôle aussi le viewer /view/<id>
+    response.headers['Service-Worker-Allowed'] = f"/view/{flipbook_id}"
+    return response
+
+
+@viewer_bp.route('/view/<flipbook_id>/precache.json')
+def serve_precache_manifest(flipbook_id):
+    """Sert la liste des ressources à mettre en cache hors ligne"""
+    return send_flipbook_file(flipbook_id, 'precache.json', 'application/json')
+
+
+@viewer_bp.route('/flipbook/<flipbook_id>/manifest.json')
+def serve_manifest(flipbook_id):
+    """Sert le manifeste du viewer (réglages, hotspots), revalidé par ETag"""
+    if not storage.flipbook_exists(flipbook_id):
+        abort(404)
+    
+    # ETag calculé depuis les entrées : une revalidation ne reconstruit pas le manifeste
+    etag = manifest_fingerprint(flipbook_id, storage.get_flipbook_metadata(flipbook_id))
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(build_manifest(flipbook_id))
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+
+@viewer_bp.route('/viewer-assets/<version>/<path:filename>')
+def serve_viewer_asset(version, filename):
+    """Sert le runtime partagé du viewer (URL versionnée, cache long)"""
+    assets_dir = os.path.join(current_app.static_folder, 'viewer')
+    
+    if version != VIEWER_VERSION:
+        # Shell d'une version antérieure : fichier courant, sans cache long
+        return send_from_directory(assets_dir, filename, max_age=0)
+    
+    response = send_from_directory(assets_dir, filename, max_age=VIEWER_ASSETS_MAX_AGE)
+    response.cache_control.immutable = True
+    return response
+
+
+@viewer_bp.route('/vendor/<filename>')
+def serve_vendor_asset(filename):
+    """Sert une dépendance tierce vendorisée (nom empreinté, cache long)"""
+    if filename not in vendor_assets.published_files():
+        abort(404)
+    
+    response = send_from_directory(vendor_assets.vendor_dir, filename, max_age=VIEWER_ASSETS_MAX_AGE)
+    response.cache_control.immutable = True
+    return response
+
+
 @viewer_bp.route('/flipbook/<flipbook_id>/info')
 def flipbook_info(flipbook_id):
     """Retourne les infos d'un flipbook en JSON"""
@@ -67,7 +209,9 @@ def embed_flipbook(flipbook_id):
     if not storage.flipbook_exists(flipbook_id):
         abort(404)
     
-    return send_from_directory(storage.get_flipbook_path(flipbook_id), 'viewer.html')
+    links = get_preload_links(flipbook_id, storage.get_flipbook_metadata(flipbook_id))
+    send_early_hints(links)
+    return send_viewer(flipbook_id, links)
 
 
 @viewer_bp.route('/flipbook/<flipbook_id>/download')
@@ -93,22 +237,38 @@ def download_pdf(flipbook_id):
 
 @viewer_bp.route('/flipbook/<flipbook_id>/regenerate', methods=['POST'])
 def regenerate_viewer(flipbook_id):
-    """Régénère le viewer avec les paramètres actuels"""
+    """Planifie la régénération du viewer (réponse immédiate, version à suivre via /version)"""
     if not storage.flipbook_exists(flipbook_id):
         return {"success": False, "error": "Flipbook introuvable"}, 404
     
-    from services.flipbook_generator import generate_viewer
+    return schedule_regeneration(flipbook_id), 202
+
+
+@viewer_bp.route('/flipbook/<flipbook_id>/version')
+def regeneration_status(flipbook_id):
+    """Version de génération du viewer : demandée, produite, en attente"""
+    if not storage.flipbook_exists(flipbook_id):
+        return {"success": False, "error": "Flipbook introuvable"}, 404
     
-    metadata = storage.get_flipbook_metadata(flipbook_id)
-    flipbook_path = storage.get_flipbook_path(flipbook_id)
+    return get_regeneration_status(flipbook_id)
+
+
+@viewer_bp.route('/flipbook/<flipbook_id>/telemetry', methods=['POST'])
+def ingest_telemetry(flipbook_id):
+    """Lot de mesures envoyé par le viewer (sendBeacon) ; aucune lecture des métadonnées par envoi"""
+    if not TELEMETRY_ENABLED:
+        return '', 204
+    # Simple test du dossier : les lecteurs envoient souvent, flipbooks.json n'est pas relu
+    if not FLIPBOOK_ID_PATTERN.match(flipbook_id) or not os.path.isdir(storage.get_flipbook_path(flipbook_id)):
+        return {"success": False, "error": "Flipbook introuvable"}, 404
+    if (request.content_length or 0) > TELEMETRY_MAX_BODY:
+        return {"success": False, "error": "Lot trop volumineux"}, 413
     
-    result = generate_viewer(
-        flipbook_id,
-        metadata.get('pages_count', 0),
-        flipbook_path,
-        mode=metadata.get('mode', 'default'),
-        background_color=metadata.get('background_color', '#0f0f0f'),
-        hotspots=metadata.get('hotspots', [])
-    )
+    # sendBeacon envoie du texte brut (pas de requête préalable CORS) : le JSON est décodé ici
+    try:
+        batch = json.loads(request.get_data(cache=False)[:TELEMETRY_MAX_BODY])
+    except ValueError:
+        return {"success": False, "error": "Lot invalide"}, 400
     
-    return {"success": result["success"]}
+    record_telemetry(flipbook_id, batch)
+    return '', 204
@@ -1,11 +1,25 @@
 """Services package"""
 
-from .pdf_processor import PDFProcessor, convert_pdf_to_images, get_pdf_info
+from .pdf_processor import PDFProcessor, convert_pdf_to_images, get_pdf_info, read_pages_dimensions
 from .storage_manager import StorageManager, storage
-from .flipbook_generator import FlipbookGenerator, generate_viewer
+from .flipbook_generator import FlipbookGenerator, generate_viewer, rebuild_viewer, build_manifest, manifest_fingerprint
+from .static_exporter import StaticExporter, export_flipbook, export_library
+from .vendor_assets import VendorAssets, vendor_assets, vendor_dependencies
+from .zoom_renderer import ZoomRenderer, zoom_renderer, render_zoom_page
+from .atomic_writer import AtomicWriter, write_atomic
+from .upload_trace import UploadTrace, upload_stats, get_upload_trace, get_upload_stats
+from .regeneration import RegenerationQueue, regeneration_queue, schedule_regeneration, get_regeneration_status
+from .telemetry import TelemetryCollector, telemetry, record_telemetry, get_telemetry_summary
 
 __all__ = [
-    'PDFProcessor', 'convert_pdf_to_images', 'get_pdf_info',
+    'PDFProcessor', 'convert_pdf_to_images', 'get_pdf_info', 'read_pages_dimensions',
     'StorageManager', 'storage',
-    'FlipbookGenerator', 'generate_viewer'
+    'FlipbookGenerator', 'generate_viewer', 'rebuild_viewer', 'build_manifest', 'manifest_fingerprint',
+    'StaticExporter', 'export_flipbook', 'export_library',
+    'VendorAssets', 'vendor_assets', 'vendor_dependencies',
+    'ZoomRenderer', 'zoom_renderer', 'render_zoom_page',
+    'AtomicWriter', 'write_atomic',
+    'UploadTrace', 'upload_stats', 'get_upload_trace', 'get_upload_stats',
+    'RegenerationQueue', 'regeneration_queue', 'schedule_regeneration', 'get_regeneration_status',
+    'TelemetryCollector', 'telemetry', 'record_telemetry', 'get_telemetry_summary'
 ]
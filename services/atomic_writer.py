@@ -0,0 +1,111 @@
+"""Service d'écriture atomique par morceaux, avec variantes précompressées (gzip, brotli)"""
+
+import os
+import gzip
+import tempfile
+
+try:
+    import brotli  # Optionnel : variantes .br
+except ImportError:
+    brotli = None
+
+# Encodage HTTP -> extension du fichier précompressé
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+# Les petits morceaux (ex. json.iterencode) sont regroupés avant d'atteindre disque et encodeurs
+BUFFER_SIZE = 64 * 1024
+
+
+def available_encodings():
+    """Encodages utilisables ici, du plus compact au plus courant"""
+    return [encoding for encoding in ('br', 'gzip') if encoding != 'br' or brotli]
+
+
+class AtomicWriter:
+    """Écrit un fichier par morceaux dans un temporaire renommé à la fin : un lecteur ne voit jamais de fichier partiel"""
+    
+    def __init__(self, path, encodings=()):
+        self.path = path
+        self.encodings = [e for e in encodings if e in available_encodings()]
+        self._files = {}
+        self._encoders = {}
+        self._buffer = []
+        self._buffered = 0
+    
+    def __enter__(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        for encoding in [None] + self.encodings:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(self.path)}.", suffix='.tmp')
+            os.chmod(tmp_path, 0o644)
+            self._files[encoding] = (os.fdopen(fd, 'wb'), tmp_path)
+        
+        if 'gzip' in self.encodings:
+            # mtime fixe : même contenu, même fichier (ETag stable)
+            self._encoders['gzip'] = gzip.GzipFile(fileobj=self._files['gzip'][0], mode='wb', compresslevel=9, mtime=0)
+        if 'br' in self.encodings:
+            self._encoders['br'] = brotli.Compressor(mode=brotli.MODE_TEXT)
+        return self
+    
+    def write(self, chunk):
+        data = chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+        self._buffer.append(data)
+        self._buffered += len(data)
+        if self._buffered >= BUFFER_SIZE:
+            self._flush()
+    
+    def _flush(self):
+        data = b''.join(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+        if not data:
+            return
+        self._files[None][0].write(data)
+        if 'gzip' in self._encoders:
+            self._encoders['gzip'].write(data)
+        if 'br' in self._encoders:
+            self._files['br'][0].write(self._encoders['br'].process(data))
+    
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._flush()
+            if 'gzip' in self._encoders:
+                self._encoders['gzip'].close()
+            if 'br' in self._encoders:
+                self._files['br'][0].write(self._encoders['br'].finish())
+        finally:
+            for f, _ in self._files.values():
+                f.close()
+        
+        if exc_type is not None:
+            for _, tmp_path in self._files.values():
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            return False
+        
+        # Une variante non réécrite serait périmée
+        for encoding, suffix in SUFFIXES.items():
+            if encoding not in self.encodings and os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+        
+        # Variantes d'abord : le fichier principal ne devient visible qu'avec elles
+        for encoding in self.encodings:
+            os.replace(self._files[encoding][1], self.path + SUFFIXES[encoding])
+        os.replace(self._files[None][1], self.path)
+        return False
+
+
+def write_atomic(path, chunks, encodings=()):
+    """Fonction principale : écrit les morceaux (str ou bytes) dans path de façon atomique"""
+    with AtomicWriter(path, encodings) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+
+
+def find_precompressed(path, accepted):
+    """Variante précompressée acceptée par le client (request.accept_encodings) : (chemin, encodage) ou (path, None)"""
+    for encoding in ('br', 'gzip'):
+        candidate = path + SUFFIXES[encoding]
+        if encoding in accepted and os.path.exists(candidate):
+            return candidate, encoding
+    return path, None
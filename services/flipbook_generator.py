@@ -1,11 +1,19 @@
-"""Service de génération du viewer HTML avec modes d'affichage et hotspots"""
+"""Service de génération du viewer : shell HTML par flipbook + runtime partagé (static/viewer)"""
 
 import os
 import json
+import hashlib
+from config import (VIEWER_PREFETCH_PAGES, VIEWER_IMAGE_CONCURRENCY, VIEWER_PLACEHOLDER_WINDOW, VIEWER_VERSION,
+                    VIEWER_MAX_DPR, VIEWER_OFFSCREEN_CANVAS, PDF_DPI, ZOOM_HIRES_THRESHOLD, ZOOM_DPI_BUCKETS,
+                    VIEWER_PRECOMPRESS, TELEMETRY_ENABLED, TELEMETRY_SAMPLE_RATE, TELEMETRY_BATCH_SIZE,
+                    TELEMETRY_BATCH_INTERVAL)
+from services.vendor_assets import vendor_assets, VENDOR_ASSETS, VENDOR_INTEGRITY
+from services.atomic_writer import write_atomic, available_encodings
+from services.metrics import record_cache
 
 
 class FlipbookGenerator:
-    """Génère le viewer HTML pour flipbooks avec modes multiples et hotspots"""
+    """Génère le shell HTML et le manifeste JSON d'un flipbook (modes multiples et hotspots)"""
     
     MODES = {
         'default': 'Standard',
@@ -17,494 +25,384 @@ class FlipbookGenerator:
         'fade': 'Fondu'
     }
     
-    def __init__(self, flipbook_id, pages_count, mode='default', background_color='#0f0f0f', hotspots=None):
+    # Fichiers du runtime partagé (static/viewer)
+    RUNTIME_CSS = 'viewer.css'
+    RUNTIME_JS = 'viewer.js'
+    PAGETURN_JS = 'pageturn.js'
+    PAGETURN_WORKER_JS = 'pageturn-worker.js'
+    # Modules de mode, chargés à la demande par le runtime
+    MODE_SWIPER_JS = 'mode-swiper.js'
+    MODE_MAGAZINE_JS = 'mode-magazine.js'
+    
+    # À incrémenter quand la stratégie de cache du service worker change
+    SW_CACHE_VERSION = 2
+    
+    def __init__(self, flipbook_id, pages_count, mode='default', background_color='#0f0f0f', hotspots=None,
+                 base_url=None, pages=None, assets_url=None, vendor_url=None, hires_zoom=True,
+                 telemetry=True, home_url='/'):
         self.flipbook_id = flipbook_id
         self.pages_count = pages_count
         self.mode = mode if mode in self.MODES else 'default'
         self.background_color = background_color or '#0f0f0f'
         self.hotspots = hotspots or []
+        # Dimensions par page ({"number", "width", "height", ...}) si connues
+        self.pages = {p["number"]: p for p in (pages or []) if p.get("width") and p.get("height")}
+        # Préfixe des ressources du flipbook ('.' pour un export statique relatif)
+        self.base_url = base_url if base_url is not None else f"/view/{flipbook_id}"
+        # Runtime partagé, versionné pour un cache navigateur long
+        self.assets_url = assets_url if assets_url is not None else f"/viewer-assets/{VIEWER_VERSION}"
+        # Dépendances tierces auto-hébergées (noms empreintés)
+        self.vendor_url = vendor_url if vendor_url is not None else "/vendor"
+        # Rendus haute définition pour le zoom (le serveur a besoin du PDF d'origine)
+        self.hires_zoom = hires_zoom
+        # Mesures de performance envoyées au serveur (sans objet pour un export statique)
+        self.telemetry = telemetry
+        # Lien du logo vers l'application (None : logo sans lien, ex. bundle exporté hors du site)
+        self.home_url = home_url
+        # Manifeste (réglages, hotspots) : servi dynamiquement, ou fichier à côté du bundle exporté
+        self.manifest_url = f"{self.base_url}/manifest.json" if base_url is not None else f"/flipbook/{flipbook_id}/manifest.json"
+        # Portée du service worker : le viewer lui-même (/view/<id>) ou le dossier du bundle
+        self.sw_scope = self.base_url.rstrip('/') + '/' if self.base_url.startswith('.') else self.base_url
     
-    def generate(self, output_path):
+    def generate(self, output_path, use_cache=True, precompress=VIEWER_PRECOMPRESS):
+        """Écrit le shell, le service worker et la liste de préchargement à côté (rien si l'empreinte est inchangée)"""
         try:
-            html = self._build_html()
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html)
-            return True
+            output_dir = os.path.dirname(output_path)
+            outputs = [output_path, os.path.join(output_dir, 'sw.js'), os.path.join(output_dir, 'precache.json')]
+            fingerprint_path = os.path.splitext(output_path)[0] + '.fingerprint'
+            fingerprint = self.get_fingerprint()
+            
+            if use_cache:
+                hit = all(os.path.exists(path) for path in outputs) and _read_text(fingerprint_path) == fingerprint
+                record_cache('viewer', hit)
+                if hit:
+                    return {"success": True, "cached": True}
+            
+            # Écritures atomiques et par morceaux, variantes compressées dans la même passe
+            encodings = available_encodings() if precompress else ()
+            write_atomic(outputs[0], [self._build_html()], encodings)
+            write_atomic(outputs[1], [self._build_service_worker()], encodings)
+            write_atomic(outputs[2], self._iter_precache_manifest(), encodings)
+            if use_cache:
+                write_atomic(fingerprint_path, [fingerprint])
+            return {"success": True, "cached": False}
         except Exception as e:
             print(f"Error generating viewer: {e}")
-            return False
+            return {"success": False, "cached": False}
+    
+    def get_fingerprint(self):
+        """Empreinte des entrées du shell, du service worker et de la liste de préchargement"""
+        # Mode, couleurs et hotspots ne sont lus que par le manifeste : ils n'y figurent pas
+        return _fingerprint({
+            "viewer_version": VIEWER_VERSION,
+            "sw_cache_version": self.SW_CACHE_VERSION,
+            "id": self.flipbook_id,
+            "pages_count": self.pages_count,
+            "base_url": self.base_url,
+            "manifest_url": self.manifest_url,
+            "sw_scope": self.sw_scope,
+            "assets": self._shell_assets()
+        })
+    
+    def _page_url(self, page_num):
+        return f"{self.base_url}/pages/page_{page_num}.jpg"
+    
+    def _asset_url(self, filename):
+        return f"{self.assets_url}/{filename}"
+    
+    def _vendor_asset(self, name):
+        return vendor_assets.resolve(name, self.vendor_url)[0]
+    
+    def _vendor_integrity(self):
+        """Empreintes SRI des dépendances (copies vendorisées, ou empreintes figées du CDN), par URL"""
+        integrity = {}
+        for name in VENDOR_ASSETS:
+            url, digest = vendor_assets.resolve(name, self.vendor_url)
+            if digest:
+                integrity[url] = digest
+        return integrity
+    
+    def _module_assets(self):
+        """Ressources de chaque module de mode, dans l'ordre d'exécution"""
+        return {
+            "swiper": [self._vendor_asset('swiper.css'), self._vendor_asset('swiper.js'),
+                       self._asset_url(self.MODE_SWIPER_JS)],
+            "magazine": [self._asset_url(self.PAGETURN_JS), self._asset_url(self.MODE_MAGAZINE_JS)]
+        }
+    
+    def _mode_module(self):
+        return 'magazine' if self.mode == 'magazine' else 'swiper'
+    
+    def _shell_assets(self):
+        """Ressources communes à tous les flipbooks (cache long), modules de tous les modes compris"""
+        modules = self._module_assets()
+        return ([self._asset_url(self.RUNTIME_CSS), self._asset_url(self.RUNTIME_JS)]
+                + modules["swiper"] + modules["magazine"] + [self._asset_url(self.PAGETURN_WORKER_JS)])
     
-    def _get_hotspots_for_page(self, page_num):
-        return [h for h in self.hotspots if h.get('page') == page_num]
+    def get_preload_resources(self, shell=False):
+        """Ressources critiques du premier affichage : runtime, manifeste, module du mode puis première(s) page(s)"""
+        resources = [
+            {"url": self._asset_url(self.RUNTIME_CSS), "as": "style"},
+            {"url": self._asset_url(self.RUNTIME_JS), "as": "script"},
+            {"url": self.manifest_url, "as": "fetch", "crossorigin": "anonymous"}
+        ]
+        first_pages = 1
+        # Le shell ne dépend pas des réglages : le module du mode courant n'est indiqué que par l'en-tête Link
+        if not shell:
+            integrity = self._vendor_integrity()
+            for url in self._module_assets()[self._mode_module()]:
+                resource = {"url": url, "as": "style" if url.endswith('.css') else "script"}
+                # Même intégrité et même mode CORS que le chargement du module : sinon le préchargement n'est pas réutilisé
+                if url in integrity:
+                    resource.update(integrity=integrity[url], crossorigin="anonymous")
+                resources.append(resource)
+            # Le mode magazine ouvre sur une double page
+            if self.mode == 'magazine':
+                first_pages = 2
+        for i in range(1, min(first_pages, self.pages_count) + 1):
+            resources.append({"url": self._page_url(i), "as": "image", "fetchpriority": "high"})
+        return resources
     
-    def _build_hotspots_html(self, page_num):
-        page_hotspots = self._get_hotspots_for_page(page_num)
-        html = ''
-        for h in page_hotspots:
-            if h.get('type') == 'url':
-                html += f'''<a href="{h.get('target', '#')}" target="_blank" class="hotspot" 
-                   style="left:{h.get('x', 0)}%;top:{h.get('y', 0)}%;width:{h.get('width', 10)}%;height:{h.get('height', 10)}%"
-                   title="{h.get('label', '')}"></a>'''
-            elif h.get('type') == 'page':
-                html += f'''<div class="hotspot hotspot-page" data-target-page="{h.get('target', 1)}"
-                     style="left:{h.get('x', 0)}%;top:{h.get('y', 0)}%;width:{h.get('width', 10)}%;height:{h.get('height', 10)}%"
-                     title="{h.get('label', '')}"></div>'''
-        return html
+    def _build_preload_tags(self):
+        tags = []
+        for r in self.get_preload_resources(shell=True):
+            extra = ''.join(f' {key}="{r[key]}"' for key in ('integrity', 'crossorigin', 'fetchpriority') if key in r)
+            tags.append(f'    <link rel="preload" href="{r["url"]}" as="{r["as"]}"{extra}>')
+        return '\n'.join(tags)
+    
+    def _iter_precache_manifest(self):
+        """Liste des ressources à mettre en cache hors ligne, produite page par page (mémoire constante)"""
+        head = json.dumps({
+            "version": self.SW_CACHE_VERSION,
+            "id": self.flipbook_id,
+            "shell": self._shell_assets() + [self.manifest_url]
+        })
+        yield head[:-1] + ', "pages": ['
+        for i in range(1, self.pages_count + 1):
+            yield (', ' if i > 1 else '') + json.dumps(self._page_url(i))
+        yield ']}'
+    
+    def _build_service_worker(self):
+        """Service worker : shell réseau d'abord, pages en cache d'abord, préchargement à la demande"""
+        return f'''/* Service worker du flipbook {self.flipbook_id} (généré) */
+'use strict';
+
+const CACHE_PREFIX = 'flipbook-{self.flipbook_id}-';
+const CACHE = CACHE_PREFIX + 'v{self.SW_CACHE_VERSION}';
+const PRECACHE_URL = new URL('precache.json', self.location).href;
+const MANIFEST_URL = new URL({json.dumps(self.manifest_url)}, self.location).href;
+// Runtime versionné et Swiper : immuables, servis depuis le cache
+const ASSETS = {json.dumps(self._shell_assets())}.map(url => new URL(url, self.location).href);
+const SHELL = [self.registration.scope, MANIFEST_URL, ...ASSETS];
+const CONCURRENCY = 4;
+
+self.addEventListener('install', event => {{
+    event.waitUntil(
+        caches.open(CACHE)
+            .then(cache => Promise.allSettled(SHELL.map(url => cache.add(url))))
+            .then(() => self.skipWaiting())
+    );
+}});
+
+self.addEventListener('activate', event => {{
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(keys
+                .filter(key => key.startsWith(CACHE_PREFIX) && key !== CACHE)
+                .map(key => caches.delete(key))))
+            .then(() => self.clients.claim())
+    );
+}});
+
+function isCacheable(url) {{
+    return ASSETS.includes(url) || (url.startsWith(self.registration.scope) && url.includes('/pages/'));
+}}
+
+async function cacheFirst(request) {{
+    const cache = await caches.open(CACHE);
+    const hit = await cache.match(request);
+    if (hit) return hit;
+    const response = await fetch(request);
+    if (response.ok) cache.put(request, response.clone());
+    return response;
+}}
+
+async function networkFirst(request) {{
+    const cache = await caches.open(CACHE);
+    try {{
+        const response = await fetch(request);
+        if (response.ok) cache.put(request, response.clone());
+        return response;
+    }} catch (e) {{
+        return (await cache.match(request)) || (await cache.match(self.registration.scope)) || Response.error();
+    }}
+}}
+
+self.addEventListener('fetch', event => {{
+    const request = event.request;
+    if (request.method !== 'GET') return;
+    
+    // Le manifeste change à chaque modification dans l'éditeur
+    if (request.mode === 'navigate' || request.url === MANIFEST_URL) {{
+        event.respondWith(networkFirst(request));
+    }} else if (isCacheable(request.url)) {{
+        event.respondWith(cacheFirst(request));
+    }}
+}});
+
+async function fetchIntoCache(cache, url) {{
+    if (await cache.match(url)) return;
+    try {{
+        const response = await fetch(url);
+        if (response.ok) await cache.put(url, response);
+    }} catch (e) {{}}
+}}
+
+// Préchargement séquentiel : ne concurrence pas la page affichée
+async function prefetch(urls) {{
+    const cache = await caches.open(CACHE);
+    for (const url of urls) {{
+        await fetchIntoCache(cache, new URL(url, self.registration.scope).href);
+    }}
+}}
+
+// Mise en cache complète du flipbook pour la lecture hors ligne
+async function cacheAll(client) {{
+    const cache = await caches.open(CACHE);
+    const precache = await (await fetch(PRECACHE_URL, {{ cache: 'no-cache' }})).json();
+    const urls = [self.registration.scope, ...precache.shell, ...precache.pages]
+        .map(url => new URL(url, PRECACHE_URL).href);
+    
+    let done = 0;
+    const queue = urls.slice();
+    const notify = () => client && client.postMessage({{ type: 'cache-progress', done, total: urls.length }});
+    
+    async function worker() {{
+        while (queue.length) {{
+            await fetchIntoCache(cache, queue.shift());
+            done++;
+            notify();
+        }}
+    }}
+    
+    await Promise.all(Array.from({{ length: CONCURRENCY }}, worker));
+}}
+
+self.addEventListener('message', event => {{
+    const message = event.data || {{}};
+    if (message.type === 'prefetch') {{
+        event.waitUntil(prefetch(message.urls || []));
+    }} else if (message.type === 'cache-all') {{
+        event.waitUntil(cacheAll(event.source));
+    }}
+}});
+'''
+    
+    def _page_sizes(self):
+        """Tailles [largeur, hauteur] par page pour le manifeste ([] si inconnues)"""
+        if len(self.pages) != self.pages_count:
+            return []
+        return [[self.pages[i]["width"], self.pages[i]["height"]] for i in range(1, self.pages_count + 1)]
+    
+    def _base_dpi(self, num):
+        """Résolution effective de l'image standard d'une page (après redimensionnement)"""
+        page = self.pages.get(num, {})
+        if page.get("pdf_width"):
+            return round(page["width"] * 72 / page["pdf_width"], 1)
+        return PDF_DPI
+    
+    def _hires_zoom(self):
+        """Réglages du zoom haute définition (None : pas de rendu à la demande)"""
+        if not self.hires_zoom:
+            return None
+        return {
+            "URL": f"{self.base_url}/zoom",
+            "THRESHOLD": ZOOM_HIRES_THRESHOLD,
+            "BUCKETS": list(ZOOM_DPI_BUCKETS),
+            "DPI": [self._base_dpi(i) for i in range(1, self.pages_count + 1)]
+        }
+    
+    def _telemetry(self):
+        """Réglages de la télémétrie du viewer (None : aucune mesure envoyée)"""
+        if not (self.telemetry and TELEMETRY_ENABLED):
+            return None
+        return {
+            "URL": f"/flipbook/{self.flipbook_id}/telemetry",
+            "SAMPLE": TELEMETRY_SAMPLE_RATE,
+            "BATCH": TELEMETRY_BATCH_SIZE,
+            "INTERVAL": TELEMETRY_BATCH_INTERVAL
+        }
+    
+    def _hotspots_by_page(self):
+        """Hotspots regroupés par page en une passe ({"3": [...]}) : le viewer n'a plus à filtrer la liste"""
+        by_page = {}
+        for h in self.hotspots:
+            try:
+                page = int(h.get("page"))
+            except (TypeError, ValueError):
+                continue
+            by_page.setdefault(str(page), []).append({
+                "x": h.get("x"), "y": h.get("y"), "width": h.get("width"), "height": h.get("height"),
+                "type": h.get("type"), "target": h.get("target", ""), "label": h.get("label", "")
+            })
+        return by_page
+    
+    def _placeholders(self):
+        """Aperçus inlinés pour la fenêtre visible à l'ouverture"""
+        return {
+            i: self.pages[i]["placeholder"]
+            for i in range(1, min(VIEWER_PLACEHOLDER_WINDOW, self.pages_count) + 1)
+            if self.pages.get(i, {}).get("placeholder")
+        }
+    
+    def build_manifest(self):
+        """Réglages et hotspots du flipbook, lus par le runtime au démarrage"""
+        return {
+            "TOTAL": self.pages_count,
+            "ID": self.flipbook_id,
+            "BASE_URL": self.base_url,
+            "SW_URL": f"{self.base_url}/sw.js",
+            "SW_SCOPE": self.sw_scope,
+            "PREFETCH": VIEWER_PREFETCH_PAGES,
+            "CONCURRENCY": VIEWER_IMAGE_CONCURRENCY,
+            "MAX_DPR": VIEWER_MAX_DPR,
+            "OFFSCREEN": VIEWER_OFFSCREEN_CANVAS,
+            "HIRES": self._hires_zoom(),
+            "TELEMETRY": self._telemetry(),
+            "MODULES": self._module_assets(),
+            "INTEGRITY": self._vendor_integrity(),
+            "DEFAULT_MODE": self.mode,
+            "BACKGROUND": self.background_color,
+            "HOTSPOTS": self._hotspots_by_page(),
+            "PAGES": self._page_sizes(),
+            "PLACEHOLDERS": self._placeholders()
+        }
     
     def _build_html(self):
-        hotspots_json = json.dumps(self.hotspots)
-        
-        # Pages pour Swiper
-        swiper_pages = '\n'.join([
-            f'''                <div class="swiper-slide" data-page="{i}">
-                    <div class="page">
-                        <img src="/view/{self.flipbook_id}/pages/page_{i}.jpg" alt="Page {i}" loading="lazy">
-                        {self._build_hotspots_html(i)}
-                    </div>
-                </div>'''
-            for i in range(1, self.pages_count + 1)
-        ])
-        
+        """Shell HTML : balisage commun, le comportement vient du runtime partagé"""
         mode_options = '\n'.join([
-            f'''                        <button class="mode-option{' active' if key == self.mode else ''}" data-mode="{key}">{name}</button>'''
+            f'''                    <button class="mode-option" data-mode="{key}">{name}</button>'''
             for key, name in self.MODES.items()
         ])
         
+        logo_open, logo_close = (f'a href="{self.home_url}"', 'a') if self.home_url else ('span', 'span')
+        
         return f'''<!DOCTYPE html>
 <html lang="fr">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <meta name="flipbook-viewer" content="{VIEWER_VERSION}">
     <title>Flipbook</title>
-    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/swiper@11/swiper-bundle.min.css">
-    <style>
-        :root {{
-            --bg: {self.background_color};
-            --surface: #1a1a1a;
-            --surface-2: #242424;
-            --border: #2a2a2a;
-            --text: #e5e5e5;
-            --text-muted: #888;
-            --accent: #3b82f6;
-        }}
-        
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', system-ui, sans-serif;
-            background: var(--bg);
-            color: var(--text);
-            height: 100vh;
-            display: flex;
-            flex-direction: column;
-            overflow: hidden;
-            user-select: none;
-        }}
-        
-        /* Header */
-        .header {{
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            padding: 0.75rem 1.5rem;
-            background: var(--surface);
-            border-bottom: 1px solid var(--border);
-            flex-shrink: 0;
-            z-index: 100;
-        }}
-        
-        .logo {{
-            font-size: 0.9rem;
-            font-weight: 600;
-            color: var(--text);
-            text-decoration: none;
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-        }}
-        
-        .logo svg {{ width: 20px; height: 20px; fill: var(--accent); }}
-        
-        .header-actions {{ display: flex; gap: 0.5rem; align-items: center; }}
-        
-        .mode-selector {{ position: relative; }}
-        
-        .mode-btn {{
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-            padding: 0.5rem 0.75rem;
-            background: var(--surface-2);
-            border: 1px solid var(--border);
-            border-radius: 6px;
-            color: var(--text);
-            font-size: 0.8rem;
-            cursor: pointer;
-            transition: all 0.15s;
-        }}
-        
-        .mode-btn:hover {{ background: var(--border); }}
-        .mode-btn svg {{ width: 16px; height: 16px; }}
-        
-        .mode-dropdown {{
-            position: absolute;
-            top: calc(100% + 0.5rem);
-            right: 0;
-            background: var(--surface);
-            border: 1px solid var(--border);
-            border-radius: 8px;
-            min-width: 140px;
-            display: none;
-            z-index: 200;
-            overflow: hidden;
-        }}
-        
-        .mode-dropdown.open {{ display: block; }}
-        
-        .mode-option {{
-            display: block;
-            width: 100%;
-            padding: 0.6rem 1rem;
-            background: transparent;
-            border: none;
-            color: var(--text-muted);
-            font-size: 0.85rem;
-            text-align: left;
-            cursor: pointer;
-            transition: all 0.15s;
-        }}
-        
-        .mode-option:hover {{ background: var(--surface-2); color: var(--text); }}
-        .mode-option.active {{ background: var(--accent); color: #fff; }}
-        
-        .btn {{
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            width: 36px;
-            height: 36px;
-            background: transparent;
-            border: 1px solid var(--border);
-            border-radius: 6px;
-            color: var(--text-muted);
-            cursor: pointer;
-            transition: all 0.15s;
-        }}
-        
-        .btn:hover {{ background: var(--border); color: var(--text); }}
-        .btn:disabled {{ opacity: 0.3; cursor: not-allowed; }}
-        .btn svg {{ width: 18px; height: 18px; }}
-        
-        /* Viewer */
-        .viewer {{
-            flex: 1;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            padding: 1rem;
-            overflow: hidden;
-            position: relative;
-        }}
-        
-        /* Swiper */
-        .swiper-container {{
-            width: 100%;
-            height: 100%;
-            max-width: 1200px;
-        }}
-        
-        .swiper {{ width: 100%; height: 100%; }}
-        
-        .swiper-slide {{
-            display: flex;
-            align-items: center;
-            justify-content: center;
-        }}
-        
-        .page {{
-            position: relative;
-            background: #fff;
-            box-shadow: 0 4px 24px rgba(0,0,0,0.6);
-            border-radius: 2px;
-            overflow: hidden;
-            max-height: calc(100vh - 140px);
-        }}
-        
-        .page img {{
-            display: block;
-            max-width: 100%;
-            max-height: calc(100vh - 140px);
-            object-fit: contain;
-        }}
-        
-        .swiper.mode-coverflow .swiper-slide {{ width: 70%; }}
-        .swiper.mode-cards .swiper-slide {{ width: 85%; }}
-        
-        /* ========================================
-           MAGAZINE MODE - Ultra Réaliste
-           ======================================== */
-        .magazine-container {{
-            display: none;
-            width: 100%;
-            height: 100%;
-            align-items: center;
-            justify-content: center;
-            perspective: 3000px;
-            perspective-origin: 50% 50%;
-        }}
-        
-        .magazine-container.active {{
-            display: flex;
-        }}
-        
-        .book-wrapper {{
-            position: relative;
-            transform-style: preserve-3d;
-        }}
-        
-        /* Ombre sous le livre */
-        .book-shadow {{
-            position: absolute;
-            bottom: -25px;
-            left: 50%;
-            transform: translateX(-50%);
-            width: 90%;
-            height: 40px;
-            background: radial-gradient(ellipse at center, rgba(0,0,0,0.4) 0%, transparent 70%);
-            filter: blur(15px);
-            pointer-events: none;
-        }}
-        
-        .book {{
-            position: relative;
-            transform-style: preserve-3d;
-            display: flex;
-        }}
-        
-        /* Page statique */
-        .book-page {{
-            position: relative;
-            background: #fff;
-            overflow: hidden;
-            box-shadow: 0 0 30px rgba(0,0,0,0.3);
-        }}
-        
-        .book-page img {{
-            width: 100%;
-            height: 100%;
-            object-fit: cover;
-            display: block;
-            pointer-events: none;
-        }}
-        
-        .book-page.left {{
-            border-radius: 5px 0 0 5px;
-            transform-origin: right center;
-        }}
-        
-        .book-page.right {{
-            border-radius: 0 5px 5px 0;
-            transform-origin: left center;
-        }}
-        
-        /* Effet de reliure */
-        .book-page.left::after {{
-            content: '';
-            position: absolute;
-            top: 0;
-            right: 0;
-            width: 40px;
-            height: 100%;
-            background: linear-gradient(to left, 
-                rgba(0,0,0,0.2) 0%, 
-                rgba(0,0,0,0.1) 20%,
-                rgba(0,0,0,0.05) 40%,
-                transparent 100%);
-            pointer-events: none;
-        }}
-        
-        .book-page.right::before {{
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            width: 40px;
-            height: 100%;
-            background: linear-gradient(to right, 
-                rgba(0,0,0,0.2) 0%, 
-                rgba(0,0,0,0.1) 20%,
-                rgba(0,0,0,0.05) 40%,
-                transparent 100%);
-            pointer-events: none;
-            z-index: 2;
-        }}
-        
-        /* Canvas pour l'animation de page */
-        #pageFlipCanvas {{
-            position: absolute;
-            top: 0;
-            left: 0;
-            pointer-events: none;
-            z-index: 100;
-        }}
-        
-        /* Zones interactives */
-        .flip-zone {{
-            position: absolute;
-            top: 0;
-            width: 100px;
-            height: 100%;
-            cursor: pointer;
-            z-index: 50;
-        }}
-        
-        .flip-zone.left {{
-            left: 0;
-            cursor: url('data:image/svg+xml,<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="%23ffffff" stroke-width="2"><path d="M15 18l-6-6 6-6"/></svg>') 12 12, w-resize;
-        }}
-        
-        .flip-zone.right {{
-            right: 0;
-            cursor: url('data:image/svg+xml,<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="%23ffffff" stroke-width="2"><path d="M9 18l6-6-6-6"/></svg>') 12 12, e-resize;
-        }}
-        
-        /* Coin de page (hover effect) */
-        .page-corner {{
-            position: absolute;
-            width: 60px;
-            height: 60px;
-            z-index: 60;
-            pointer-events: none;
-            transition: transform 0.2s ease;
-        }}
-        
-        .page-corner.bottom-right {{
-            bottom: 0;
-            right: 0;
-            background: linear-gradient(135deg, transparent 50%, rgba(0,0,0,0.1) 50%);
-            transform-origin: bottom right;
-            transform: scale(0);
-            border-radius: 0 0 5px 0;
-        }}
-        
-        .page-corner.bottom-left {{
-            bottom: 0;
-            left: 0;
-            background: linear-gradient(-135deg, transparent 50%, rgba(0,0,0,0.1) 50%);
-            transform-origin: bottom left;
-            transform: scale(0);
-            border-radius: 0 0 0 5px;
-        }}
-        
-        .book-page.right:hover .page-corner.bottom-right,
-        .book-page.left:hover .page-corner.bottom-left {{
-            transform: scale(1);
-        }}
-        
-        /* Drag zone pour tourner avec la souris */
-        .drag-corner {{
-            position: absolute;
-            width: 80px;
-            height: 80px;
-            z-index: 70;
-            cursor: grab;
-        }}
-        
-        .drag-corner:active {{
-            cursor: grabbing;
-        }}
-        
-        .drag-corner.bottom-right {{
-            bottom: 0;
-            right: 0;
-        }}
-        
-        .drag-corner.bottom-left {{
-            bottom: 0;
-            left: 0;
-        }}
-        
-        .drag-corner.top-right {{
-            top: 0;
-            right: 0;
-        }}
-        
-        .drag-corner.top-left {{
-            top: 0;
-            left: 0;
-        }}
-        
-        /* Hotspots */
-        .hotspot {{
-            position: absolute;
-            background: rgba(59, 130, 246, 0.15);
-            border: 2px solid rgba(59, 130, 246, 0.5);
-            border-radius: 4px;
-            cursor: pointer;
-            transition: all 0.2s;
-            text-decoration: none;
-            z-index: 10;
-        }}
-        
-        .hotspot:hover {{
-            background: rgba(59, 130, 246, 0.3);
-            border-color: var(--accent);
-        }}
-        
-        /* Controls */
-        .controls {{
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            gap: 1rem;
-            padding: 0.75rem;
-            background: var(--surface);
-            border-top: 1px solid var(--border);
-            flex-shrink: 0;
-        }}
-        
-        .nav-group {{ display: flex; align-items: center; gap: 0.25rem; }}
-        
-        .page-info {{
-            font-size: 0.85rem;
-            color: var(--text-muted);
-            min-width: 100px;
-            text-align: center;
-            font-variant-numeric: tabular-nums;
-        }}
-        
-        .divider {{ width: 1px; height: 24px; background: var(--border); }}
-        
-        .swiper-button-next, .swiper-button-prev, .swiper-pagination {{ display: none; }}
-        
-        /* Sound toggle */
-        .sound-toggle {{
-            position: relative;
-        }}
-        
-        .sound-toggle.muted svg {{
-            opacity: 0.4;
-        }}
-        
-        @media (max-width: 768px) {{
-            .header {{ padding: 0.5rem 1rem; }}
-            .controls {{ gap: 0.5rem; padding: 0.5rem; }}
-            .btn {{ width: 32px; height: 32px; }}
-            .btn svg {{ width: 16px; height: 16px; }}
-            .page-info {{ font-size: 0.75rem; min-width: 80px; }}
-            .divider {{ display: none; }}
-            .mode-btn span {{ display: none; }}
-            .flip-zone {{ width: 60px; }}
-            .drag-corner {{ width: 50px; height: 50px; }}
-        }}
-    </style>
+{self._build_preload_tags()}
+    <link rel="stylesheet" href="{self._asset_url(self.RUNTIME_CSS)}">
 </head>
-<body>
+<body data-manifest="{self.manifest_url}">
     <header class="header">
-        <a href="/" class="logo">
+        <{logo_open} class="logo">
             <svg viewBox="0 0 24 24"><path d="M6 2a2 2 0 0 0-2 2v16a2 2 0 0 0 2 2h12a2 2 0 0 0 2-2V8l-6-6H6zm7 1.5L18.5 9H13V3.5zM8 12h8v2H8v-2zm0 4h8v2H8v-2z"/></svg>
             FlipBook
-        </a>
+        </{logo_close}>
         <div class="header-actions">
             <div class="mode-selector">
                 <button class="mode-btn" id="modeBtn">
@@ -512,7 +410,7 @@ class FlipbookGenerator:
                         <rect x="3" y="3" width="7" height="7"/><rect x="14" y="3" width="7" height="7"/>
                         <rect x="14" y="14" width="7" height="7"/><rect x="3" y="14" width="7" height="7"/>
                     </svg>
-                    <span id="currentMode">{self.MODES.get(self.mode, 'Standard')}</span>
+                    <span id="currentMode"></span>
                     <svg viewBox="0 0 24 24" width="14" height="14" fill="none" stroke="currentColor" stroke-width="2">
                         <path d="M6 9l6 6 6-6"/>
                     </svg>
@@ -528,6 +426,12 @@ class FlipbookGenerator:
                     <path d="M19.07 4.93a10 10 0 0 1 0 14.14"/>
                 </svg>
             </button>
+            <button class="btn offline-btn" id="offlineBtn" title="Disponible hors ligne" hidden>
+                <svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
+                    <path d="M21 15v4a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2v-4"/>
+                    <path d="M7 10l5 5 5-5M12 15V3"/>
+                </svg>
+            </button>
             <button class="btn" id="fullscreenBtn" title="Plein écran">
                 <svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
                     <path d="M8 3H5a2 2 0 0 0-2 2v3m18 0V5a2 2 0 0 0-2-2h-3m0 18h3a2 2 0 0 0 2-2v-3M3 16v3a2 2 0 0 0 2 2h3"/>
@@ -540,9 +444,7 @@ class FlipbookGenerator:
         <!-- Swiper -->
         <div class="swiper-container" id="swiperContainer">
             <div class="swiper" id="viewer">
-                <div class="swiper-wrapper">
-{swiper_pages}
-                </div>
+                <div class="swiper-wrapper"></div>
             </div>
         </div>
         
@@ -570,7 +472,7 @@ class FlipbookGenerator:
             </button>
         </div>
         
-        <span class="page-info"><span id="current">1</span> / {self.pages_count}</span>
+        <span class="page-info"><span id="current">1</span> / <span id="total">{self.pages_count}</span></span>
         
         <div class="nav-group">
             <button class="btn" id="nextBtn" title="Page suivante">
@@ -601,1031 +503,95 @@ class FlipbookGenerator:
         </div>
     </div>
     
-    <script src="https://cdn.jsdelivr.net/npm/swiper@11/swiper-bundle.min.js"></script>
-    <script>
-    (function() {{
-        'use strict';
-        
-        // ========================================
-        // CONFIGURATION
-        // ========================================
-        const CONFIG = {{
-            TOTAL: {self.pages_count},
-            ID: "{self.flipbook_id}",
-            DEFAULT_MODE: "{self.mode}",
-            HOTSPOTS: {hotspots_json}
-        }};
-        
-        // ========================================
-        // STATE
-        // ========================================
-        const state = {{
-            currentMode: null,
-            currentPage: 1,
-            zoom: 1,
-            swiper: null,
-            
-            // Magazine specific
-            isLandscape: false,
-            pageWidth: 0,
-            pageHeight: 0,
-            pagesLoaded: [],
-            
-            // Animation
-            isAnimating: false,
-            isDragging: false,
-            dragStartX: 0,
-            dragStartY: 0,
-            dragProgress: 0,
-            dragCorner: null,
-            
-            // Sound
-            soundEnabled: true
-        }};
-        
-        // ========================================
-        // DOM ELEMENTS
-        // ========================================
-        const $ = id => document.getElementById(id);
-        const $$ = sel => document.querySelectorAll(sel);
-        
-        const elements = {{
-            swiperContainer: $('swiperContainer'),
-            magazineContainer: $('magazineContainer'),
-            bookWrapper: $('bookWrapper'),
-            book: $('book'),
-            canvas: $('pageFlipCanvas'),
-            currentDisplay: $('current'),
-            soundToggle: $('soundToggle')
-        }};
-        
-        let ctx = elements.canvas.getContext('2d');
-        
-        // ========================================
-        // AUDIO - Son de page qui tourne
-        // ========================================
-        const AudioManager = {{
-            context: null,
-            
-            init() {{
-                try {{
-                    this.context = new (window.AudioContext || window.webkitAudioContext)();
-                }} catch(e) {{
-                    console.log('Audio not supported');
-                }}
-            }},
-            
-            playPageTurn() {{
-                if (!this.context || !state.soundEnabled) return;
-                
-                // Créer un son de page qui tourne synthétique
-                const duration = 0.4;
-                const now = this.context.currentTime;
-                
-                // Bruit blanc filtré pour simuler le froissement du papier
-                const bufferSize = this.context.sampleRate * duration;
-                const buffer = this.context.createBuffer(1, bufferSize, this.context.sampleRate);
-                const data = buffer.getChannelData(0);
-                
-                for (let i = 0; i < bufferSize; i++) {{
-                    const t = i / bufferSize;
-                    // Enveloppe qui monte puis descend
-                    const envelope = Math.sin(t * Math.PI) * 0.3;
-                    // Bruit avec plus de basses fréquences
-                    data[i] = (Math.random() * 2 - 1) * envelope;
-                }}
-                
-                const source = this.context.createBufferSource();
-                source.buffer = buffer;
-                
-                // Filtre passe-bas pour un son plus doux
-                const filter = this.context.createBiquadFilter();
-                filter.type = 'lowpass';
-                filter.frequency.setValueAtTime(2000, now);
-                filter.frequency.linearRampToValueAtTime(800, now + duration);
-                
-                // Gain
-                const gainNode = this.context.createGain();
-                gainNode.gain.setValueAtTime(0.15, now);
-                gainNode.gain.linearRampToValueAtTime(0, now + duration);
-                
-                source.connect(filter);
-                filter.connect(gainNode);
-                gainNode.connect(this.context.destination);
-                
-                source.start(now);
-            }}
-        }};
-        
-        // ========================================
-        // SWIPER
-        // ========================================
-        const swiperConfigs = {{
-            default: {{
-                slidesPerView: 1,
-                spaceBetween: 30,
-                keyboard: {{ enabled: true }},
-                mousewheel: {{ forceToAxis: true }}
-            }},
-            coverflow: {{
-                effect: 'coverflow',
-                grabCursor: true,
-                centeredSlides: true,
-                slidesPerView: 'auto',
-                coverflowEffect: {{ rotate: 50, stretch: 0, depth: 100, modifier: 1, slideShadows: true }},
-                keyboard: {{ enabled: true }}
-            }},
-            cards: {{
-                effect: 'cards',
-                grabCursor: true,
-                keyboard: {{ enabled: true }}
-            }},
-            cube: {{
-                effect: 'cube',
-                grabCursor: true,
-                cubeEffect: {{ shadow: true, slideShadows: true, shadowOffset: 20, shadowScale: 0.94 }},
-                keyboard: {{ enabled: true }}
-            }},
-            flip: {{
-                effect: 'flip',
-                grabCursor: true,
-                keyboard: {{ enabled: true }}
-            }},
-            fade: {{
-                effect: 'fade',
-                fadeEffect: {{ crossFade: true }},
-                keyboard: {{ enabled: true }}
-            }}
-        }};
-        
-        function initSwiper(mode) {{
-            const idx = state.swiper ? state.swiper.activeIndex : (state.currentPage - 1);
-            if (state.swiper) state.swiper.destroy(true, true);
-            
-            $('viewer').className = 'swiper mode-' + mode;
-            
-            state.swiper = new Swiper('#viewer', {{
-                ...swiperConfigs[mode],
-                on: {{ 
-                    slideChange: () => {{ 
-                        state.currentPage = state.swiper.activeIndex + 1; 
-                        updateUI(); 
-                    }} 
-                }}
-            }});
-            
-            if (idx > 0) state.swiper.slideTo(idx, 0);
-        }}
-        
-        // ========================================
-        // MAGAZINE - Core
-        // ========================================
-        function getPageSrc(num) {{
-            if (num < 1 || num > CONFIG.TOTAL) return null;
-            return `/view/${{CONFIG.ID}}/pages/page_${{num}}.jpg`;
-        }}
-        
-        async function loadImage(src) {{
-            return new Promise((resolve, reject) => {{
-                const img = new Image();
-                img.onload = () => resolve(img);
-                img.onerror = reject;
-                img.src = src;
-            }});
-        }}
-        
-        async function detectPageFormat() {{
-            try {{
-                const img = await loadImage(getPageSrc(1));
-                const ratio = img.naturalWidth / img.naturalHeight;
-                state.isLandscape = ratio > 1.2;
-                return {{ width: img.naturalWidth, height: img.naturalHeight, ratio }};
-            }} catch(e) {{
-                state.isLandscape = false;
-                return {{ width: 800, height: 1000, ratio: 0.8 }};
-            }}
-        }}
-        
-        function calculatePageSize(pageInfo) {{
-            const container = elements.magazineContainer;
-            const maxHeight = container.clientHeight - 60;
-            const maxWidth = container.clientWidth - 60;
-            
-            if (state.isLandscape) {{
-                // Mode single page
-                if (maxWidth * 0.9 / pageInfo.ratio <= maxHeight) {{
-                    state.pageWidth = Math.floor(maxWidth * 0.85);
-                    state.pageHeight = Math.floor(state.pageWidth / pageInfo.ratio);
-                }} else {{
-                    state.pageHeight = Math.floor(maxHeight * 0.95);
-                    state.pageWidth = Math.floor(state.pageHeight * pageInfo.ratio);
-                }}
-            }} else {{
-                // Mode double page
-                const availableWidth = maxWidth * 0.95;
-                const singleWidth = availableWidth / 2;
-                
-                if (singleWidth / pageInfo.ratio <= maxHeight) {{
-                    state.pageWidth = Math.floor(singleWidth);
-                    state.pageHeight = Math.floor(state.pageWidth / pageInfo.ratio);
-                }} else {{
-                    state.pageHeight = Math.floor(maxHeight * 0.95);
-                    state.pageWidth = Math.floor(state.pageHeight * pageInfo.ratio);
-                }}
-            }}
-        }}
-        
-        async function preloadPages() {{
-            // Précharger toutes les images
-            const promises = [];
-            for (let i = 1; i <= CONFIG.TOTAL; i++) {{
-                promises.push(
-                    loadImage(getPageSrc(i))
-                        .then(img => {{ state.pagesLoaded[i] = img; }})
-                        .catch(() => {{ state.pagesLoaded[i] = null; }})
-                );
-            }}
-            await Promise.all(promises);
-        }}
-        
-        // ========================================
-        // MAGAZINE - Rendering
-        // ========================================
-        function getCurrentSpread() {{
-            if (state.isLandscape) {{
-                return {{ left: state.currentPage, right: null }};
-            }} else {{
-                const leftPage = state.currentPage % 2 === 1 ? state.currentPage : state.currentPage - 1;
-                return {{
-                    left: leftPage,
-                    right: leftPage + 1 <= CONFIG.TOTAL ? leftPage + 1 : null
-                }};
-            }}
-        }}
-        
-        function renderBook() {{
-            const spread = getCurrentSpread();
-            const book = elements.book;
-            
-            if (state.isLandscape) {{
-                // Single page mode
-                book.innerHTML = `
-                    <div class="book-page single" style="width:${{state.pageWidth}}px;height:${{state.pageHeight}}px;">
-                        <img src="${{getPageSrc(spread.left)}}" alt="Page ${{spread.left}}">
-                        <div class="page-corner bottom-right"></div>
-                        <div class="page-corner bottom-left"></div>
-                        <div class="drag-corner bottom-right" data-corner="br" data-direction="next"></div>
-                        <div class="drag-corner bottom-left" data-corner="bl" data-direction="prev"></div>
-                        <div class="drag-corner top-right" data-corner="tr" data-direction="next"></div>
-                        <div class="drag-corner top-left" data-corner="tl" data-direction="prev"></div>
-                        <div class="flip-zone right" data-direction="next"></div>
-                        <div class="flip-zone left" data-direction="prev"></div>
-                    </div>
-                `;
-            }} else {{
-                // Double page mode
-                book.innerHTML = `
-                    <div class="book-page left" style="width:${{state.pageWidth}}px;height:${{state.pageHeight}}px;">
-                        ${{spread.left ? `<img src="${{getPageSrc(spread.left)}}" alt="Page ${{spread.left}}">` : ''}}
-                        <div class="page-corner bottom-left"></div>
-                        <div class="drag-corner bottom-left" data-corner="bl" data-direction="prev"></div>
-                        <div class="drag-corner top-left" data-corner="tl" data-direction="prev"></div>
-                        <div class="flip-zone left" data-direction="prev"></div>
-                    </div>
-                    <div class="book-page right" style="width:${{state.pageWidth}}px;height:${{state.pageHeight}}px;">
-                        ${{spread.right ? `<img src="${{getPageSrc(spread.right)}}" alt="Page ${{spread.right}}">` : ''}}
-                        <div class="page-corner bottom-right"></div>
-                        <div class="drag-corner bottom-right" data-corner="br" data-direction="next"></div>
-                        <div class="drag-corner top-right" data-corner="tr" data-direction="next"></div>
-                        <div class="flip-zone right" data-direction="next"></div>
-                    </div>
-                `;
-            }}
-            
-            // Setup canvas
-            const totalWidth = state.isLandscape ? state.pageWidth : state.pageWidth * 2;
-            elements.canvas.width = totalWidth;
-            elements.canvas.height = state.pageHeight;
-            elements.canvas.style.width = totalWidth + 'px';
-            elements.canvas.style.height = state.pageHeight + 'px';
-            
-            // Bind interactions
-            bindDragEvents();
-            bindClickEvents();
-            
-            updateUI();
-        }}
-        
-        // ========================================
-        // MAGAZINE - Page Turn Animation
-        // ========================================
-        function animatePageTurn(direction, fromDrag = false, startProgress = 0) {{
-            if (state.isAnimating && !fromDrag) return;
-            
-            const spread = getCurrentSpread();
-            let canTurn = false;
-            let turningPageNum, nextPageNum, underPageNum;
-            
-            if (state.isLandscape) {{
-                if (direction === 'next' && state.currentPage < CONFIG.TOTAL) {{
-                    canTurn = true;
-                    turningPageNum = state.currentPage;
-                    nextPageNum = state.currentPage + 1;
-                }} else if (direction === 'prev' && state.currentPage > 1) {{
-                    canTurn = true;
-                    turningPageNum = state.currentPage;
-                    nextPageNum = state.currentPage - 1;
-                }}
-            }} else {{
-                if (direction === 'next' && spread.right && spread.right < CONFIG.TOTAL) {{
-                    canTurn = true;
-                    turningPageNum = spread.right;
-                    nextPageNum = spread.right + 1;
-                    underPageNum = spread.right + 2;
-                }} else if (direction === 'prev' && spread.left > 1) {{
-                    canTurn = true;
-                    turningPageNum = spread.left;
-                    nextPageNum = spread.left - 1;
-                    underPageNum = spread.left - 2;
-                }}
-            }}
-            
-            if (!canTurn) return;
-            
-            state.isAnimating = true;
-            AudioManager.playPageTurn();
-            
-            const turningImage = state.pagesLoaded[turningPageNum];
-            const nextImage = state.pagesLoaded[nextPageNum];
-            const underImage = underPageNum ? state.pagesLoaded[underPageNum] : null;
-            
-            let progress = startProgress;
-            const duration = fromDrag ? 400 * (1 - startProgress) : 600;
-            const startTime = performance.now();
-            
-            function animate(currentTime) {{
-                const elapsed = currentTime - startTime;
-                
-                if (fromDrag) {{
-                    progress = startProgress + (1 - startProgress) * Math.min(elapsed / duration, 1);
-                }} else {{
-                    progress = easeInOutCubic(Math.min(elapsed / duration, 1));
-                }}
-                
-                drawPageTurn(direction, progress, turningImage, nextImage, underImage);
-                
-                if (progress < 1) {{
-                    requestAnimationFrame(animate);
-                }} else {{
-                    finishPageTurn(direction);
-                }}
-            }}
-            
-            requestAnimationFrame(animate);
-        }}
-        
-        function drawPageTurn(direction, progress, turningImage, nextImage, underImage) {{
-            const w = state.pageWidth;
-            const h = state.pageHeight;
-            const isDouble = !state.isLandscape;
-            
-            ctx.clearRect(0, 0, elements.canvas.width, elements.canvas.height);
-            
-            if (isDouble) {{
-                // Double page mode
-                if (direction === 'next') {{
-                    // Page de droite qui tourne vers la gauche
-                    const foldX = w + w * (1 - progress);
-                    const angle = progress * Math.PI;
-                    
-                    // Page du dessous (nouvelle page droite)
-                    if (underImage) {{
-                        ctx.save();
-                        ctx.beginPath();
-                        ctx.rect(w, 0, w, h);
-                        ctx.clip();
-                        ctx.drawImage(underImage, w, 0, w, h);
-                        
-                        // Ombre sur la page du dessous
-                        const shadowIntensity = Math.sin(progress * Math.PI) * 0.4;
-                        ctx.fillStyle = `rgba(0,0,0,${{shadowIntensity}})`;
-                        ctx.fillRect(w, 0, w * (1 - progress) + 20, h);
-                        ctx.restore();
-                    }}
-                    
-                    // Page qui tourne - face avant
-                    if (progress < 0.5 && turningImage) {{
-                        ctx.save();
-                        ctx.beginPath();
-                        ctx.moveTo(foldX, 0);
-                        ctx.lineTo(w * 2, 0);
-                        ctx.lineTo(w * 2, h);
-                        ctx.lineTo(foldX, h);
-                        ctx.closePath();
-                        ctx.clip();
-                        
-                        ctx.translate(foldX, 0);
-                        ctx.scale((1 - progress * 2) || 0.01, 1);
-                        ctx.translate(-foldX, 0);
-                        ctx.drawImage(turningImage, w, 0, w, h);
-                        
-                        // Ombre sur la page qui tourne
-                        const gradient = ctx.createLinearGradient(foldX - 50, 0, foldX, 0);
-                        gradient.addColorStop(0, 'rgba(0,0,0,0)');
-                        gradient.addColorStop(1, `rgba(0,0,0,${{0.3 * (1 - progress * 2)}})`);
-                        ctx.fillStyle = gradient;
-                        ctx.fillRect(w, 0, w, h);
-                        
-                        ctx.restore();
-                    }}
-                    
-                    // Page qui tourne - face arrière
-                    if (progress >= 0.5 && nextImage) {{
-                        ctx.save();
-                        const backFoldX = w - (w * (progress - 0.5) * 2);
-                        
-                        ctx.beginPath();
-                        ctx.moveTo(0, 0);
-                        ctx.lineTo(backFoldX, 0);
-                        ctx.lineTo(backFoldX, h);
-                        ctx.lineTo(0, h);
-                        ctx.closePath();
-                        ctx.clip();
-                        
-                        ctx.translate(backFoldX, 0);
-                        ctx.scale(-((progress - 0.5) * 2) || 0.01, 1);
-                        ctx.translate(-backFoldX, 0);
-                        ctx.drawImage(nextImage, 0, 0, w, h);
-                        
-                        // Ombre
-                        const gradient = ctx.createLinearGradient(backFoldX, 0, backFoldX + 50, 0);
-                        gradient.addColorStop(0, `rgba(0,0,0,${{0.3 * ((progress - 0.5) * 2)}})`);
-                        gradient.addColorStop(1, 'rgba(0,0,0,0)');
-                        ctx.fillStyle = gradient;
-                        ctx.fillRect(0, 0, w, h);
-                        
-                        ctx.restore();
-                    }}
-                    
-                    // Pli central (ombre de reliure)
-                    ctx.save();
-                    const spineGradient = ctx.createLinearGradient(w - 20, 0, w + 20, 0);
-                    spineGradient.addColorStop(0, 'rgba(0,0,0,0)');
-                    spineGradient.addColorStop(0.5, 'rgba(0,0,0,0.2)');
-                    spineGradient.addColorStop(1, 'rgba(0,0,0,0)');
-                    ctx.fillStyle = spineGradient;
-                    ctx.fillRect(w - 20, 0, 40, h);
-                    ctx.restore();
-                    
-                }} else {{
-                    // Page de gauche qui tourne vers la droite (direction === 'prev')
-                    const foldX = w * progress;
-                    
-                    // Page du dessous (nouvelle page gauche)
-                    if (underImage) {{
-                        ctx.save();
-                        ctx.beginPath();
-                        ctx.rect(0, 0, w, h);
-                        ctx.clip();
-                        ctx.drawImage(underImage, 0, 0, w, h);
-                        
-                        const shadowIntensity = Math.sin(progress * Math.PI) * 0.4;
-                        ctx.fillStyle = `rgba(0,0,0,${{shadowIntensity}})`;
-                        ctx.fillRect(w * progress - 20, 0, w * (1 - progress) + 20, h);
-                        ctx.restore();
-                    }}
-                    
-                    // Page qui tourne - face avant
-                    if (progress < 0.5 && turningImage) {{
-                        ctx.save();
-                        ctx.beginPath();
-                        ctx.moveTo(0, 0);
-                        ctx.lineTo(foldX, 0);
-                        ctx.lineTo(foldX, h);
-                        ctx.lineTo(0, h);
-                        ctx.closePath();
-                        ctx.clip();
-                        
-                        ctx.translate(foldX, 0);
-                        ctx.scale((1 - progress * 2) || 0.01, 1);
-                        ctx.translate(-foldX, 0);
-                        ctx.drawImage(turningImage, 0, 0, w, h);
-                        
-                        const gradient = ctx.createLinearGradient(foldX, 0, foldX + 50, 0);
-                        gradient.addColorStop(0, `rgba(0,0,0,${{0.3 * (1 - progress * 2)}})`);
-                        gradient.addColorStop(1, 'rgba(0,0,0,0)');
-                        ctx.fillStyle = gradient;
-                        ctx.fillRect(0, 0, w, h);
-                        
-                        ctx.restore();
-                    }}
-                    
-                    // Face arrière
-                    if (progress >= 0.5 && nextImage) {{
-                        ctx.save();
-                        const backFoldX = w + (w * (progress - 0.5) * 2);
-                        
-                        ctx.beginPath();
-                        ctx.moveTo(w, 0);
-                        ctx.lineTo(backFoldX, 0);
-                        ctx.lineTo(backFoldX, h);
-                        ctx.lineTo(w, h);
-                        ctx.closePath();
-                        ctx.clip();
-                        
-                        ctx.translate(backFoldX, 0);
-                        ctx.scale(-((progress - 0.5) * 2) || 0.01, 1);
-                        ctx.translate(-backFoldX, 0);
-                        ctx.drawImage(nextImage, w, 0, w, h);
-                        
-                        const gradient = ctx.createLinearGradient(backFoldX - 50, 0, backFoldX, 0);
-                        gradient.addColorStop(0, 'rgba(0,0,0,0)');
-                        gradient.addColorStop(1, `rgba(0,0,0,${{0.3 * ((progress - 0.5) * 2)}})`);
-                        ctx.fillStyle = gradient;
-                        ctx.fillRect(w, 0, w, h);
-                        
-                        ctx.restore();
-                    }}
-                    
-                    // Pli central
-                    ctx.save();
-                    const spineGradient = ctx.createLinearGradient(w - 20, 0, w + 20, 0);
-                    spineGradient.addColorStop(0, 'rgba(0,0,0,0)');
-                    spineGradient.addColorStop(0.5, 'rgba(0,0,0,0.2)');
-                    spineGradient.addColorStop(1, 'rgba(0,0,0,0)');
-                    ctx.fillStyle = spineGradient;
-                    ctx.fillRect(w - 20, 0, 40, h);
-                    ctx.restore();
-                }}
-            }} else {{
-                // Single page mode (landscape)
-                if (direction === 'next') {{
-                    const foldX = w * (1 - progress);
-                    
-                    // Page du dessous
-                    if (nextImage) {{
-                        ctx.drawImage(nextImage, 0, 0, w, h);
-                        const shadowIntensity = Math.sin(progress * Math.PI) * 0.5;
-                        ctx.fillStyle = `rgba(0,0,0,${{shadowIntensity}})`;
-                        ctx.fillRect(0, 0, foldX + 20, h);
-                    }}
-                    
-                    // Page qui tourne
-                    if (progress < 0.5 && turningImage) {{
-                        ctx.save();
-                        ctx.beginPath();
-                        ctx.moveTo(foldX, 0);
-                        ctx.lineTo(w, 0);
-                        ctx.lineTo(w, h);
-                        ctx.lineTo(foldX, h);
-                        ctx.closePath();
-                        ctx.clip();
-                        
-                        const scaleX = Math.max(0.01, 1 - progress * 2);
-                        ctx.translate(foldX, 0);
-                        ctx.scale(scaleX, 1);
-                        ctx.translate(-foldX, 0);
-                        ctx.drawImage(turningImage, 0, 0, w, h);
-                        
-                        ctx.restore();
-                    }}
-                }} else {{
-                    const foldX = w * progress;
-                    
-                    // Page du dessous
-                    if (nextImage) {{
-                        ctx.drawImage(nextImage, 0, 0, w, h);
-                        const shadowIntensity = Math.sin(progress * Math.PI) * 0.5;
-                        ctx.fillStyle = `rgba(0,0,0,${{shadowIntensity}})`;
-                        ctx.fillRect(foldX - 20, 0, w - foldX + 20, h);
-                    }}
-                    
-                    // Page qui tourne
-                    if (progress < 0.5 && turningImage) {{
-                        ctx.save();
-                        ctx.beginPath();
-                        ctx.moveTo(0, 0);
-                        ctx.lineTo(foldX, 0);
-                        ctx.lineTo(foldX, h);
-                        ctx.lineTo(0, h);
-                        ctx.closePath();
-                        ctx.clip();
-                        
-                        const scaleX = Math.max(0.01, 1 - progress * 2);
-                        ctx.translate(foldX, 0);
-                        ctx.scale(scaleX, 1);
-                        ctx.translate(-foldX, 0);
-                        ctx.drawImage(turningImage, 0, 0, w, h);
-                        
-                        ctx.restore();
-                    }}
-                }}
-            }}
-        }}
-        
-        function finishPageTurn(direction) {{
-            ctx.clearRect(0, 0, elements.canvas.width, elements.canvas.height);
-            
-            if (state.isLandscape) {{
-                state.currentPage += direction === 'next' ? 1 : -1;
-            }} else {{
-                state.currentPage += direction === 'next' ? 2 : -2;
-                // Ajuster pour rester sur une page impaire
-                if (state.currentPage < 1) state.currentPage = 1;
-                if (state.currentPage > CONFIG.TOTAL) state.currentPage = CONFIG.TOTAL;
-                if (state.currentPage % 2 === 0) state.currentPage--;
-            }}
-            
-            state.isAnimating = false;
-            renderBook();
-        }}
-        
-        function easeInOutCubic(t) {{
-            return t < 0.5 ? 4 * t * t * t : 1 - Math.pow(-2 * t + 2, 3) / 2;
-        }}
-        
-        // ========================================
-        // MAGAZINE - Drag Interaction
-        // ========================================
-        function bindDragEvents() {{
-            const dragCorners = elements.book.querySelectorAll('.drag-corner');
-            
-            dragCorners.forEach(corner => {{
-                corner.addEventListener('mousedown', startDrag);
-                corner.addEventListener('touchstart', startDrag, {{ passive: false }});
-            }});
-        }}
-        
-        function startDrag(e) {{
-            if (state.isAnimating) return;
-            e.preventDefault();
-            
-            const touch = e.touches ? e.touches[0] : e;
-            state.isDragging = true;
-            state.dragStartX = touch.clientX;
-            state.dragStartY = touch.clientY;
-            state.dragCorner = e.currentTarget.dataset.corner;
-            state.dragDirection = e.currentTarget.dataset.direction;
-            state.dragProgress = 0;
-            
-            document.addEventListener('mousemove', onDrag);
-            document.addEventListener('mouseup', endDrag);
-            document.addEventListener('touchmove', onDrag, {{ passive: false }});
-            document.addEventListener('touchend', endDrag);
-        }}
-        
-        function onDrag(e) {{
-            if (!state.isDragging) return;
-            e.preventDefault();
-            
-            const touch = e.touches ? e.touches[0] : e;
-            const deltaX = touch.clientX - state.dragStartX;
-            const maxDrag = state.pageWidth;
-            
-            let progress;
-            if (state.dragDirection === 'next') {{
-                progress = Math.max(0, Math.min(1, -deltaX / maxDrag));
-            }} else {{
-                progress = Math.max(0, Math.min(1, deltaX / maxDrag));
-            }}
-            
-            state.dragProgress = progress;
-            
-            // Dessiner l'aperçu du pli
-            drawDragPreview(state.dragDirection, progress);
-        }}
-        
-        function drawDragPreview(direction, progress) {{
-            if (progress < 0.02) {{
-                ctx.clearRect(0, 0, elements.canvas.width, elements.canvas.height);
-                return;
-            }}
-            
-            const spread = getCurrentSpread();
-            let turningImage, nextImage, underImage;
-            
-            if (state.isLandscape) {{
-                if (direction === 'next') {{
-                    turningImage = state.pagesLoaded[state.currentPage];
-                    nextImage = state.pagesLoaded[state.currentPage + 1];
-                }} else {{
-                    turningImage = state.pagesLoaded[state.currentPage];
-                    nextImage = state.pagesLoaded[state.currentPage - 1];
-                }}
-            }} else {{
-                if (direction === 'next') {{
-                    turningImage = state.pagesLoaded[spread.right];
-                    nextImage = state.pagesLoaded[spread.right + 1];
-                    underImage = state.pagesLoaded[spread.right + 2];
-                }} else {{
-                    turningImage = state.pagesLoaded[spread.left];
-                    nextImage = state.pagesLoaded[spread.left - 1];
-                    underImage = state.pagesLoaded[spread.left - 2];
-                }}
-            }}
-            
-            drawPageTurn(direction, progress * 0.5, turningImage, nextImage, underImage);
-        }}
-        
-        function endDrag(e) {{
-            if (!state.isDragging) return;
-            
-            document.removeEventListener('mousemove', onDrag);
-            document.removeEventListener('mouseup', endDrag);
-            document.removeEventListener('touchmove', onDrag);
-            document.removeEventListener('touchend', endDrag);
-            
-            const progress = state.dragProgress;
-            state.isDragging = false;
-            
-            if (progress > 0.3) {{
-                // Compléter l'animation
-                animatePageTurn(state.dragDirection, true, progress * 0.5);
-            }} else {{
-                // Annuler - retourner à la position initiale
-                cancelDrag(state.dragDirection, progress * 0.5);
-            }}
-        }}
-        
-        function cancelDrag(direction, startProgress) {{
-            const duration = 300 * startProgress;
-            const startTime = performance.now();
-            
-            const spread = getCurrentSpread();
-            let turningImage, nextImage, underImage;
-            
-            if (state.isLandscape) {{
-                turningImage = state.pagesLoaded[state.currentPage];
-                nextImage = direction === 'next' ? 
-                    state.pagesLoaded[state.currentPage + 1] : 
-                    state.pagesLoaded[state.currentPage - 1];
-            }} else {{
-                if (direction === 'next') {{
-                    turningImage = state.pagesLoaded[spread.right];
-                    nextImage = state.pagesLoaded[spread.right + 1];
-                    underImage = state.pagesLoaded[spread.right + 2];
-                }} else {{
-                    turningImage = state.pagesLoaded[spread.left];
-                    nextImage = state.pagesLoaded[spread.left - 1];
-                    underImage = state.pagesLoaded[spread.left - 2];
-                }}
-            }}
-            
-            function animate(currentTime) {{
-                const elapsed = currentTime - startTime;
-                const t = Math.min(elapsed / duration, 1);
-                const progress = startProgress * (1 - easeInOutCubic(t));
-                
-                if (progress > 0.01) {{
-                    drawPageTurn(direction, progress, turningImage, nextImage, underImage);
-                    requestAnimationFrame(animate);
-                }} else {{
-                    ctx.clearRect(0, 0, elements.canvas.width, elements.canvas.height);
-                }}
-            }}
-            
-            requestAnimationFrame(animate);
-        }}
-        
-        // ========================================
-        // MAGAZINE - Click Events
-        // ========================================
-        function bindClickEvents() {{
-            const flipZones = elements.book.querySelectorAll('.flip-zone');
-            
-            flipZones.forEach(zone => {{
-                zone.addEventListener('click', (e) => {{
-                    if (state.isDragging) return;
-                    const direction = zone.dataset.direction;
-                    animatePageTurn(direction);
-                }});
-            }});
-        }}
-        
-        // ========================================
-        // MAGAZINE - Init
-        // ========================================
-        async function initMagazine() {{
-            elements.book.innerHTML = '<div style="color:#888;padding:20px;">Chargement...</div>';
-            
-            const pageInfo = await detectPageFormat();
-            calculatePageSize(pageInfo);
-            await preloadPages();
-            
-            // Ajuster pour démarrer sur une page impaire en mode double
-            if (!state.isLandscape && state.currentPage % 2 === 0) {{
-                state.currentPage--;
-            }}
-            
-            renderBook();
-        }}
-        
-        // ========================================
-        // MODE SWITCHING
-        // ========================================
-        const modeNames = {{
-            default: 'Standard',
-            magazine: 'Magazine',
-            coverflow: 'Coverflow',
-            cards: 'Cartes',
-            cube: 'Cube',
-            flip: 'Flip',
-            fade: 'Fondu'
-        }};
-        
-        function changeMode(mode) {{
-            if (state.currentMode === mode) return;
-            
-            // Sauvegarder la page actuelle
-            if (state.swiper) {{
-                state.currentPage = state.swiper.activeIndex + 1;
-            }}
-            
-            state.currentMode = mode;
-            
-            // Mettre à jour l'UI
-            $('currentMode').textContent = modeNames[mode];
-            $$('.mode-option').forEach(opt => {{
-                opt.classList.toggle('active', opt.dataset.mode === mode);
-            }});
-            $('modeDropdown').classList.remove('open');
-            
-            if (mode === 'magazine') {{
-                elements.swiperContainer.style.display = 'none';
-                elements.magazineContainer.classList.add('active');
-                if (state.swiper) {{
-                    state.swiper.destroy(true, true);
-                    state.swiper = null;
-                }}
-                initMagazine();
-            }} else {{
-                elements.magazineContainer.classList.remove('active');
-                elements.swiperContainer.style.display = '';
-                ctx.clearRect(0, 0, elements.canvas.width, elements.canvas.height);
-                initSwiper(mode);
-                if (state.currentPage > 1 && state.swiper) {{
-                    state.swiper.slideTo(state.currentPage - 1, 0);
-                }}
-            }}
-            
-            updateUI();
-        }}
-        
-        // ========================================
-        // UI & NAVIGATION
-        // ========================================
-        function updateUI() {{
-            let displayText;
-            let atStart, atEnd;
-            
-            if (state.currentMode === 'magazine') {{
-                if (state.isLandscape) {{
-                    displayText = state.currentPage;
-                    atStart = state.currentPage <= 1;
-                    atEnd = state.currentPage >= CONFIG.TOTAL;
-                }} else {{
-                    const spread = getCurrentSpread();
-                    displayText = spread.right ? `${{spread.left}}-${{spread.right}}` : spread.left;
-                    atStart = spread.left <= 1;
-                    atEnd = !spread.right || spread.right >= CONFIG.TOTAL;
-                }}
-            }} else if (state.swiper) {{
-                displayText = state.swiper.activeIndex + 1;
-                atStart = state.swiper.activeIndex === 0;
-                atEnd = state.swiper.activeIndex >= CONFIG.TOTAL - 1;
-            }} else {{
-                displayText = state.currentPage;
-                atStart = state.currentPage <= 1;
-                atEnd = state.currentPage >= CONFIG.TOTAL;
-            }}
-            
-            elements.currentDisplay.textContent = displayText;
-            $('firstBtn').disabled = $('prevBtn').disabled = atStart;
-            $('nextBtn').disabled = $('lastBtn').disabled = atEnd;
-        }}
-        
-        function goToPage(page) {{
-            page = Math.max(1, Math.min(CONFIG.TOTAL, page));
-            
-            if (state.currentMode === 'magazine') {{
-                if (!state.isLandscape && page % 2 === 0) page--;
-                state.currentPage = page;
-                renderBook();
-            }} else if (state.swiper) {{
-                state.swiper.slideTo(page - 1);
-            }}
-            
-            updateUI();
-        }}
-        
-        function nextPage() {{
-            if (state.currentMode === 'magazine') {{
-                animatePageTurn('next');
-            }} else if (state.swiper) {{
-                state.swiper.slideNext();
-            }}
-        }}
-        
-        function prevPage() {{
-            if (state.currentMode === 'magazine') {{
-                animatePageTurn('prev');
-            }} else if (state.swiper) {{
-                state.swiper.slidePrev();
-            }}
-        }}
-        
-        function setZoom(z) {{
-            state.zoom = Math.max(0.5, Math.min(2, z));
-            if (state.currentMode === 'magazine') {{
-                elements.bookWrapper.style.transform = `scale(${{state.zoom}})`;
-            }} else {{
-                $$('.page img').forEach(img => {{
-                    img.style.transform = `scale(${{state.zoom}})`;
-                }});
-            }}
-        }}
-        
-        // ========================================
-        // EVENT LISTENERS
-        // ========================================
-        $('firstBtn').onclick = () => goToPage(1);
-        $('prevBtn').onclick = prevPage;
-        $('nextBtn').onclick = nextPage;
-        $('lastBtn').onclick = () => goToPage(CONFIG.TOTAL);
-        $('zoomInBtn').onclick = () => setZoom(state.zoom + 0.25);
-        $('zoomOutBtn').onclick = () => setZoom(state.zoom - 0.25);
-        
-        $('fullscreenBtn').onclick = () => {{
-            if (!document.fullscreenElement) document.documentElement.requestFullscreen();
-            else document.exitFullscreen();
-        }};
-        
-        $('modeBtn').onclick = e => {{
-            e.stopPropagation();
-            $('modeDropdown').classList.toggle('open');
-        }};
-        
-        document.addEventListener('click', () => $('modeDropdown').classList.remove('open'));
-        
-        $$('.mode-option').forEach(opt => {{
-            opt.onclick = e => {{
-                e.stopPropagation();
-                changeMode(opt.dataset.mode);
-            }};
-        }});
-        
-        // Sound toggle
-        elements.soundToggle.onclick = () => {{
-            state.soundEnabled = !state.soundEnabled;
-            elements.soundToggle.classList.toggle('muted', !state.soundEnabled);
-            if (state.soundEnabled) AudioManager.init();
-        }};
-        
-        // Hotspots
-        $$('.hotspot-page').forEach(h => {{
-            h.onclick = () => goToPage(parseInt(h.dataset.targetPage));
-        }});
-        
-        // Keyboard
-        document.addEventListener('keydown', e => {{
-            if (state.isAnimating) return;
-            if (e.key === 'ArrowLeft') prevPage();
-            if (e.key === 'ArrowRight') nextPage();
-            if (e.key === '+' || e.key === '=') setZoom(state.zoom + 0.25);
-            if (e.key === '-') setZoom(state.zoom - 0.25);
-            if (e.key === '0') setZoom(1);
-            if (e.key === 'Home') goToPage(1);
-            if (e.key === 'End') goToPage(CONFIG.TOTAL);
-        }});
-        
-        // Resize
-        let resizeTimeout;
-        window.addEventListener('resize', () => {{
-            clearTimeout(resizeTimeout);
-            resizeTimeout = setTimeout(async () => {{
-                if (state.currentMode === 'magazine') {{
-                    const pageInfo = await detectPageFormat();
-                    calculatePageSize(pageInfo);
-                    renderBook();
-                }}
-            }}, 250);
-        }});
-        
-        // ========================================
-        // INIT
-        // ========================================
-        AudioManager.init();
-        changeMode(CONFIG.DEFAULT_MODE);
-        
-    }})();
-    </script>
+    <script src="{self._asset_url(self.RUNTIME_JS)}"></script>
 </body>
 </html>'''
 
 
-def generate_viewer(flipbook_id, pages_count, output_dir, mode='default', background_color='#0f0f0f', hotspots=None):
+def _fingerprint(inputs):
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _read_text(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def generate_viewer(flipbook_id, pages_count, output_dir, mode='default', background_color='#0f0f0f', hotspots=None,
+                    base_url=None, pages=None):
     """Fonction principale de génération"""
-    generator = FlipbookGenerator(flipbook_id, pages_count, mode, background_color, hotspots)
+    generator = FlipbookGenerator(flipbook_id, pages_count, mode, background_color, hotspots, base_url, pages)
     viewer_path = os.path.join(output_dir, 'viewer.html')
-    success = generator.generate(viewer_path)
-    return {"success": success, "viewer_path": viewer_path if success else None}
+    result = generator.generate(viewer_path)
+    return {**result, "viewer_path": viewer_path if result["success"] else None}
+
+
+def _generator_from_metadata(flipbook_id, metadata, **kwargs):
+    """Générateur configuré à partir des métadonnées enregistrées"""
+    from services.storage_manager import storage
+    
+    pages_count = metadata.get('pages_count', 0)
+    return FlipbookGenerator(
+        flipbook_id,
+        pages_count,
+        mode=metadata.get('mode', 'default'),
+        background_color=metadata.get('background_color', '#0f0f0f'),
+        hotspots=metadata.get('hotspots', []),
+        pages=storage.ensure_pages_info(flipbook_id, pages_count),
+        **kwargs
+    )
+
+
+def build_manifest(flipbook_id):
+    """Manifeste du viewer d'après les métadonnées courantes (None si flipbook inconnu)"""
+    from services.storage_manager import storage
+    
+    metadata = storage.get_flipbook_metadata(flipbook_id)
+    if not metadata:
+        return None
+    return _generator_from_metadata(flipbook_id, metadata).build_manifest()
+
+
+def manifest_fingerprint(flipbook_id, metadata):
+    """Empreinte des entrées du manifeste, calculée sans le construire (ETag)"""
+    from services.storage_manager import storage
+    
+    try:
+        stat = os.stat(storage.get_pages_info_path(flipbook_id))
+        pages_stamp = [stat.st_mtime_ns, stat.st_size]
+    except OSError:
+        pages_stamp = None
+    
+    return _fingerprint({
+        "viewer_version": VIEWER_VERSION,
+        # Réglages lus par build_manifest : à compléter avec toute nouvelle clé de configuration
+        "settings": [VIEWER_PREFETCH_PAGES, VIEWER_IMAGE_CONCURRENCY, VIEWER_MAX_DPR, VIEWER_OFFSCREEN_CANVAS,
+                     VIEWER_PLACEHOLDER_WINDOW, PDF_DPI, ZOOM_HIRES_THRESHOLD, list(ZOOM_DPI_BUCKETS),
+                     TELEMETRY_ENABLED, TELEMETRY_SAMPLE_RATE, TELEMETRY_BATCH_SIZE, TELEMETRY_BATCH_INTERVAL],
+        "vendor": [vendor_assets.get_manifest(), VENDOR_INTEGRITY],
+        "flipbook": {key: metadata.get(key) for key in ('pages_count', 'mode', 'background_color', 'hotspots')},
+        "pages": pages_stamp
+    })
+
+
+def rebuild_viewer(flipbook_id, generation=None):
+    """Régénère le shell d'un flipbook (nécessaire seulement si le runtime change de version)"""
+    from services.storage_manager import storage
+    
+    metadata = storage.get_flipbook_metadata(flipbook_id)
+    if not metadata:
+        return {"success": False, "viewer_path": None}
+    
+    viewer_path = os.path.join(storage.get_flipbook_path(flipbook_id), 'viewer.html')
+    result = _generator_from_metadata(flipbook_id, metadata).generate(viewer_path)
+    if result["success"]:
+        updates = {'viewer_version': VIEWER_VERSION}
+        if generation is not None:
+            updates['generation'] = generation
+        # Rien à enregistrer si la génération n'a rien changé
+        if any(metadata.get(key) != value for key, value in updates.items()):
+            storage.update_flipbook_metadata(flipbook_id, updates)
+    return {**result, "viewer_path": viewer_path if result["success"] else None}
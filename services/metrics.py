@@ -0,0 +1,149 @@
+"""Service de métriques Prometheus : latence des routes, conversions, stockage, octets servis et caches"""
+
+import os
+import time
+from contextlib import contextmanager
+from config import METRICS_ENABLED, METRICS_LATENCY_BUCKETS, METRICS_STAGE_BUCKETS
+
+try:
+    # Optionnel : sans prometheus_client, l'instrumentation ne coûte rien et /metrics répond 503
+    import prometheus_client
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:
+    prometheus_client = None
+
+# Plusieurs workers (gunicorn) : chaque processus écrit ses valeurs dans ce dossier, agrégées par /metrics
+MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+
+class _NullMetric:
+    """Métrique inactive (module absent ou métriques désactivées)"""
+    
+    def labels(self, *args, **kwargs):
+        return self
+    
+    def observe(self, value):
+        pass
+    
+    def inc(self, amount=1):
+        pass
+    
+    def dec(self, amount=1):
+        pass
+    
+    def set(self, value):
+        pass
+
+
+def is_enabled():
+    return METRICS_ENABLED and prometheus_client is not None
+
+
+if is_enabled():
+    REQUEST_LATENCY = Histogram(
+        'flipbook_http_request_duration_seconds', "Durée des requêtes par route",
+        ['blueprint', 'endpoint', 'method', 'status'], buckets=METRICS_LATENCY_BUCKETS)
+    REQUESTS_IN_PROGRESS = Gauge(
+        'flipbook_http_requests_in_progress', "Requêtes en cours par route",
+        ['blueprint', 'endpoint'], multiprocess_mode='livesum')
+    RESPONSE_BYTES = Counter(
+        'flipbook_http_response_bytes', "Octets servis par route",
+        ['blueprint', 'endpoint'])
+    CACHE_REQUESTS = Counter(
+        'flipbook_cache_requests', "Accès aux caches : http (revalidation 304), zoom, viewer",
+        ['cache', 'result'])
+    UPLOAD_STAGE_DURATION = Histogram(
+        'flipbook_upload_stage_duration_seconds', "Durée des étapes du pipeline d'upload",
+        ['stage', 'status'], buckets=METRICS_STAGE_BUCKETS)
+    UPLOAD_STAGES_IN_PROGRESS = Gauge(
+        'flipbook_upload_stages_in_progress', "Étapes d'upload en cours (stage=convert : conversions en cours)",
+        ['stage'], multiprocess_mode='livesum')
+    REGENERATION_QUEUE_DEPTH = Gauge(
+        'flipbook_regeneration_queue_depth', "Régénérations de viewer en attente",
+        multiprocess_mode='livesum')
+    REGENERATION_DURATION = Histogram(
+        'flipbook_regeneration_duration_seconds', "Durée des régénérations de viewer",
+        ['status'], buckets=METRICS_STAGE_BUCKETS)
+    METADATA_DURATION = Histogram(
+        'flipbook_metadata_duration_seconds', "Lectures et écritures du fichier de métadonnées",
+        ['operation'], buckets=METRICS_LATENCY_BUCKETS)
+else:
+    REQUEST_LATENCY = REQUESTS_IN_PROGRESS = RESPONSE_BYTES = CACHE_REQUESTS = _NullMetric()
+    UPLOAD_STAGE_DURATION = UPLOAD_STAGES_IN_PROGRESS = _NullMetric()
+    REGENERATION_QUEUE_DEPTH = REGENERATION_DURATION = METADATA_DURATION = _NullMetric()
+
+
+@contextmanager
+def timed(histogram, **labels):
+    """Observe la durée du bloc dans un histogramme"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(**labels).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def in_progress(gauge, **labels):
+    """Compte le bloc dans une jauge tant qu'il s'exécute"""
+    child = gauge.labels(**labels) if labels else gauge
+    child.inc()
+    try:
+        yield
+    finally:
+        child.dec()
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.labels(cache=cache, result='hit' if hit else 'miss').inc()
+
+
+def init_app(app):
+    """Instrumente toutes les routes de l'application (latence, requêtes en cours, octets, revalidations)"""
+    if not is_enabled():
+        return
+    
+    from flask import request, g
+    
+    @app.before_request
+    def _start_timer():
+        g.metrics_start = time.perf_counter()
+        g.metrics_labels = {"blueprint": request.blueprint or 'app', "endpoint": request.endpoint or 'none'}
+        REQUESTS_IN_PROGRESS.labels(**g.metrics_labels).inc()
+    
+    @app.after_request
+    def _record(response):
+        labels = g.get('metrics_labels')
+        if labels is None:
+            return response
+        REQUEST_LATENCY.labels(method=request.method, status=str(response.status_code), **labels).observe(
+            time.perf_counter() - g.metrics_start)
+        if response.content_length:
+            RESPONSE_BYTES.labels(**labels).inc(response.content_length)
+        if request.if_none_match or request.if_modified_since:
+            record_cache('http', response.status_code == 304)
+        return response
+    
+    @app.teardown_request
+    def _finish(exc):
+        labels = g.pop('metrics_labels', None)
+        if labels is not None:
+            REQUESTS_IN_PROGRESS.labels(**labels).dec()
+
+
+def render_metrics():
+    """Exposition texte Prometheus : (corps, content-type), agrégée sur tous les workers en mode multiprocessus"""
+    if MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid):
+    """À appeler depuis le hook child_exit de gunicorn : retire les jauges du worker arrêté"""
+    if is_enabled() and MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(pid)
@@ -2,9 +2,15 @@
 
 import os
 import io
+import uuid
+import base64
 import fitz  # PyMuPDF
-from PIL import Image
-from config import PDF_DPI, MAX_IMAGE_WIDTH, IMAGE_QUALITY, IMAGE_FORMAT
+from PIL import Image, features
+from config import (PDF_DPI, MAX_IMAGE_WIDTH, IMAGE_QUALITY, IMAGE_FORMAT,
+                    PLACEHOLDER_WIDTH, PLACEHOLDER_QUALITY, IMPORT_PDF_LINKS)
+
+# WebP divise par ~3 la taille d'un aperçu minuscule par rapport au JPEG
+PLACEHOLDER_FORMAT = 'WEBP' if features.check('webp') else 'JPEG'
 
 
 class PDFProcessor:
@@ -43,6 +49,17 @@ class PDFProcessor:
         except Exception:
             return None
     
+    def render_page(self, page_num, dpi, max_pixels=None):
+        """Rend une page à la résolution demandée, plafonnée à max_pixels"""
+        page = self.doc[page_num]
+        zoom = dpi / 72
+        if max_pixels:
+            pixels = page.rect.width * page.rect.height * zoom * zoom
+            if pixels > max_pixels:
+                zoom *= (max_pixels / pixels) ** 0.5
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        return Image.frombytes('RGB', (pix.width, pix.height), pix.samples)
+    
     def optimize_image(self, img):
         """Redimensionne et optimise l'image"""
         if img.width > MAX_IMAGE_WIDTH:
@@ -55,12 +72,55 @@ class PDFProcessor:
         
         return img
     
-    def convert_to_images(self, output_dir):
-        """Convertit toutes les pages en images"""
+    def get_page_geometry(self, page_num):
+        """Dimensions PDF (points, rotation appliquée) et rotation d'une page"""
+        page = self.doc[page_num]
+        return {
+            "pdf_width": round(page.rect.width, 2),
+            "pdf_height": round(page.rect.height, 2),
+            "rotation": page.rotation
+        }
+    
+    def extract_links(self, page_num):
+        """Liens d'une page convertis en hotspots (coordonnées en % de la page affichée)"""
+        page = self.doc[page_num]
+        bounds = page.rect
+        hotspots = []
+        
+        # Rectangles déjà exprimés dans l'espace de la page tournée, comme le rendu
+        for link in page.get_links():
+            rect = fitz.Rect(link["from"]) & bounds
+            if rect.is_empty:
+                continue
+            
+            if link["kind"] == fitz.LINK_URI and link.get("uri"):
+                kind, target = 'url', link["uri"]
+            elif link["kind"] in (fitz.LINK_GOTO, fitz.LINK_NAMED) and 0 <= link.get("page", -1) < self.pages_count:
+                kind, target = 'page', link["page"] + 1
+            else:
+                continue
+            
+            hotspots.append({
+                'id': str(uuid.uuid4())[:8],
+                'page': page_num + 1,
+                'x': round((rect.x0 - bounds.x0) / bounds.width * 100, 2),
+                'y': round((rect.y0 - bounds.y0) / bounds.height * 100, 2),
+                'width': round(rect.width / bounds.width * 100, 2),
+                'height': round(rect.height / bounds.height * 100, 2),
+                'type': kind,
+                'target': target,
+                'label': ''
+            })
+        return hotspots
+    
+    def convert_to_images(self, output_dir, import_links=IMPORT_PDF_LINKS):
+        """Convertit toutes les pages en images (et leurs liens en hotspots)"""
         pages_dir = os.path.join(output_dir, 'pages')
         os.makedirs(pages_dir, exist_ok=True)
         
         images = []
+        pages = []
+        hotspots = []
         
         for page_num in range(self.pages_count):
             img = self.extract_page(page_num)
@@ -74,17 +134,28 @@ class PDFProcessor:
             img.save(output_path, format=IMAGE_FORMAT, quality=IMAGE_QUALITY, 
                      optimize=True, progressive=True)
             images.append(filename)
+            pages.append({
+                "number": page_num + 1,
+                "width": img.width,
+                "height": img.height,
+                **self.get_page_geometry(page_num),
+                "placeholder": make_placeholder(img)
+            })
+            if import_links:
+                hotspots.extend(self.extract_links(page_num))
         
         self.close()
         
         return {
             "success": len(images) == self.pages_count,
             "pages_count": len(images),
-            "images": images
+            "images": images,
+            "pages": pages,
+            "hotspots": hotspots
         }
 
 
-def convert_pdf_to_images(pdf_path, output_dir):
+def convert_pdf_to_images(pdf_path, output_dir, import_links=IMPORT_PDF_LINKS):
     """Fonction principale de conversion"""
     processor = PDFProcessor(pdf_path)
     
@@ -92,7 +163,37 @@ def convert_pdf_to_images(pdf_path, output_dir):
     if not result["success"]:
         return result
     
-    return processor.convert_to_images(output_dir)
+    return processor.convert_to_images(output_dir, import_links)
+
+
+def make_placeholder(img):
+    """Aperçu flou de quelques centaines d'octets, en data URI"""
+    thumb = img.copy()
+    # Réduction par blocs (BOX) en une passe, sur l'image déjà redimensionnée
+    thumb.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH * 4), Image.Resampling.BOX)
+    if thumb.mode != 'RGB':
+        thumb = thumb.convert('RGB')
+    
+    buffer = io.BytesIO()
+    thumb.save(buffer, format=PLACEHOLDER_FORMAT, quality=PLACEHOLDER_QUALITY, optimize=True)
+    encoded = base64.b64encode(buffer.getvalue()).decode('ascii')
+    return f"data:image/{PLACEHOLDER_FORMAT.lower()};base64,{encoded}"
+
+
+def read_pages_dimensions(pages_dir, pages_count):
+    """Relit dimensions et aperçus des pages déjà rendues (anciens flipbooks)"""
+    pages = []
+    for i in range(1, pages_count + 1):
+        try:
+            with Image.open(os.path.join(pages_dir, f"page_{i}.jpg")) as img:
+                width, height = img.size
+                # Décodage JPEG réduit (échelle DCT) : suffisant pour l'aperçu
+                img.draft('RGB', (PLACEHOLDER_WIDTH * 4, PLACEHOLDER_WIDTH * 8))
+                pages.append({"number": i, "width": width, "height": height, "rotation": 0,
+                              "placeholder": make_placeholder(img)})
+        except Exception:
+            return []
+    return pages
 
 
 def get_pdf_info(pdf_path):
@@ -0,0 +1,199 @@
+"""Service de profilage des requêtes : échantillonneur de piles, profils des requêtes lentes ou tirées au sort"""
+
+import os
+import sys
+import json
+import time
+import random
+import threading
+from collections import Counter
+from datetime import datetime
+from config import (BASE_DIR, PROFILE_FOLDER, PROFILER_ENABLED, PROFILER_SAMPLE_RATE, PROFILER_SLOW_THRESHOLD,
+                    PROFILER_INTERVAL, PROFILER_MAX_FILES)
+from services.atomic_writer import write_atomic
+
+# Fonctions les plus coûteuses (temps propre) reprises dans le résumé JSON
+TOP_FUNCTIONS = 15
+
+
+def _frame_label(code):
+    """fonction (chemin:ligne), chemin relatif au projet quand c'est possible"""
+    path = code.co_filename
+    if path.startswith(BASE_DIR):
+        path = os.path.relpath(path, BASE_DIR).replace('\\', '/')
+    else:
+        path = '/'.join(path.replace('\\', '/').split('/')[-2:])
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({path}:{code.co_firstlineno})"
+
+
+def _layer(stack):
+    """Module du projet le plus profond de la pile (routes/…, services/…), sinon 'framework'"""
+    for label in reversed(stack):
+        path = label.rsplit('(', 1)[1]
+        if path.startswith(('routes/', 'services/')):
+            return path.split(':', 1)[0]
+    return 'framework'
+
+
+class RequestProfile:
+    """Piles échantillonnées d'une requête"""
+    
+    def __init__(self):
+        self.stacks = Counter()
+        self.samples = 0
+    
+    def add(self, frame):
+        stack = []
+        while frame is not None:
+            stack.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        self.stacks[tuple(stack)] += 1
+        self.samples += 1
+
+
+class StackSampler:
+    """Relève périodiquement la pile des threads de requête suivis ; inactif tant qu'aucune requête n'est suivie"""
+    
+    def __init__(self, interval=PROFILER_INTERVAL):
+        self.interval = interval
+        self._active = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker = None
+    
+    def start(self, ident):
+        profile = RequestProfile()
+        with self._lock:
+            self._active[ident] = profile
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+                self._worker.start()
+        self._wake.set()
+        return profile
+    
+    def stop(self, ident):
+        with self._lock:
+            profile = self._active.pop(ident, None)
+            if not self._active:
+                self._wake.clear()
+        return profile
+    
+    def _run(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, profile in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        profile.add(frame)
+
+
+class RequestProfiler:
+    """Conserve le profil des requêtes lentes et d'un échantillon aléatoire, dans un dossier tournant"""
+    
+    def __init__(self, output_dir=PROFILE_FOLDER, sample_rate=PROFILER_SAMPLE_RATE,
+                 slow_threshold=PROFILER_SLOW_THRESHOLD, interval=PROFILER_INTERVAL, max_files=PROFILER_MAX_FILES):
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.max_files = max_files
+        self.sampler = StackSampler(interval)
+    
+    def init_app(self, app):
+        """Ajoute les hooks à l'application ; rien n'est ajouté si le profilage est désactivé"""
+        if not app.config.get('PROFILER_ENABLED', PROFILER_ENABLED):
+            return
+        
+        from flask import request, g
+        
+        @app.before_request
+        def _start_profile():
+            g.profile = {
+                "ident": threading.get_ident(),
+                "start": time.perf_counter(),
+                "cpu_start": time.thread_time(),
+                "sampled": random.random() < self.sample_rate,
+                "status": None
+            }
+            self.sampler.start(g.profile["ident"])
+        
+        @app.after_request
+        def _record_status(response):
+            if 'profile' in g:
+                g.profile["status"] = response.status_code
+            return response
+        
+        @app.teardown_request
+        def _finish_profile(exc):
+            state = g.pop('profile', None)
+            if state is None:
+                return
+            profile = self.sampler.stop(state["ident"])
+            wall = time.perf_counter() - state["start"]
+            
+            reason = 'slow' if wall >= self.slow_threshold else 'sampled' if state["sampled"] else None
+            if reason is None or profile is None:
+                return
+            try:
+                self.save(profile, reason, {
+                    "method": request.method,
+                    "path": request.path,
+                    "endpoint": request.endpoint,
+                    "flipbook_id": (request.view_args or {}).get('flipbook_id'),
+                    "status": state["status"] or (500 if exc else None),
+                    "wall_ms": round(wall * 1000, 2),
+                    "cpu_ms": round((time.thread_time() - state["cpu_start"]) * 1000, 2)
+                })
+            except OSError:
+                pass  # Le profilage ne doit jamais faire échouer la requête
+    
+    def save(self, profile, reason, info):
+        """Écrit <nom>.folded (format des piles repliées : flamegraph.pl, speedscope) et <nom>.json (résumé)"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        endpoint = (info["endpoint"] or 'none').replace('.', '-')
+        name = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}_{endpoint}_{int(info['wall_ms'])}ms"
+        # Temps estimé d'après la part des échantillons dans la durée de la requête
+        ms_per_sample = info["wall_ms"] / profile.samples if profile.samples else 0
+        
+        layers = Counter()
+        self_time = Counter()
+        for stack, count in profile.stacks.items():
+            layers[_layer(stack)] += count
+            self_time[stack[-1]] += count
+        
+        write_atomic(os.path.join(self.output_dir, name + '.folded'),
+                     (f"{';'.join(stack)} {count}\n" for stack, count in profile.stacks.most_common()))
+        write_atomic(os.path.join(self.output_dir, name + '.json'), [json.dumps({
+            **info,
+            "reason": reason,
+            "recorded_at": datetime.now().isoformat(),
+            "interval_ms": self.sampler.interval * 1000,
+            "samples": profile.samples,
+            # Temps par module du projet (le plus profond de chaque pile)
+            "breakdown_ms": {layer: round(count * ms_per_sample, 1) for layer, count in layers.most_common()},
+            "top_functions_ms": {label: round(count * ms_per_sample, 1)
+                                 for label, count in self_time.most_common(TOP_FUNCTIONS)}
+        }, indent=2, ensure_ascii=False)])
+        self._rotate()
+        return name
+    
+    def _rotate(self):
+        """Ne garde que les max_files profils les plus récents"""
+        names = sorted({os.path.splitext(f)[0] for f in os.listdir(self.output_dir) if f.endswith(('.folded', '.json'))})
+        for name in names[:max(0, len(names) - self.max_files)]:
+            for ext in ('.folded', '.json'):
+                path = os.path.join(self.output_dir, name + ext)
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+# Instance globale
+request_profiler = RequestProfiler()
+
+
+def init_profiler(app):
+    """Fonction principale : active le profilage des requêtes sur l'application si configuré"""
+    request_profiler.init_app(app)
@@ -0,0 +1,129 @@
+"""Service de régénération différée des viewers (file par flipbook, demandes fusionnées)"""
+
+import time
+import threading
+from config import REGENERATION_DEBOUNCE, REGENERATION_MAX_DELAY
+from services.metrics import REGENERATION_QUEUE_DEPTH, REGENERATION_DURATION
+
+
+class RegenerationQueue:
+    """Fusionne les demandes de régénération d'un flipbook et les exécute une fois, après un délai de calme"""
+    
+    def __init__(self, job, debounce=REGENERATION_DEBOUNCE, max_delay=REGENERATION_MAX_DELAY):
+        self._job = job
+        self._debounce = debounce
+        self._max_delay = max_delay
+        # flipbook_id -> {"version": n, "due": échéance, "deadline": échéance au plus tard}
+        self._pending = {}
+        # flipbook_id -> version en cours de génération
+        self._running = {}
+        self._errors = {}
+        self._condition = threading.Condition()
+        self._worker = None
+    
+    def request(self, flipbook_id, generation):
+        """Planifie une régénération ; renvoie la version de génération qui l'inclura"""
+        with self._condition:
+            now = time.monotonic()
+            version = generation + 1
+            deadline = now + self._max_delay
+            if flipbook_id in self._pending:
+                version = max(version, self._pending[flipbook_id]["version"])
+                deadline = self._pending[flipbook_id]["deadline"]
+            if flipbook_id in self._running:
+                # La génération en cours a lu l'état avant cette demande
+                version = max(version, self._running[flipbook_id] + 1)
+            
+            # Chaque nouvelle demande repousse l'échéance : une rafale ne produit qu'une génération
+            self._pending[flipbook_id] = {
+                "version": version,
+                "due": min(now + self._debounce, deadline),
+                "deadline": deadline
+            }
+            REGENERATION_QUEUE_DEPTH.set(len(self._pending))
+            self._ensure_worker()
+            self._condition.notify()
+            return version
+    
+    def status(self, flipbook_id, generation):
+        """Version demandée, version générée et état de la file pour un flipbook"""
+        with self._condition:
+            version = generation
+            if flipbook_id in self._running:
+                version = max(version, self._running[flipbook_id])
+            if flipbook_id in self._pending:
+                version = max(version, self._pending[flipbook_id]["version"])
+            return {
+                "version": version,
+                "generation": generation,
+                "pending": version > generation,
+                "error": self._errors.get(flipbook_id)
+            }
+    
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name='viewer-regeneration', daemon=True)
+            self._worker.start()
+    
+    def _next_due(self):
+        """Attend la prochaine demande arrivée à échéance (sous verrou)"""
+        while True:
+            ready = [(entry["due"], flipbook_id) for flipbook_id, entry in self._pending.items()
+                     if flipbook_id not in self._running]
+            if not ready:
+                self._condition.wait()
+                continue
+            
+            due, flipbook_id = min(ready)
+            delay = due - time.monotonic()
+            if delay <= 0:
+                return flipbook_id
+            self._condition.wait(delay)
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                flipbook_id = self._next_due()
+                version = self._pending.pop(flipbook_id)["version"]
+                self._running[flipbook_id] = version
+                REGENERATION_QUEUE_DEPTH.set(len(self._pending))
+            
+            start = time.perf_counter()
+            try:
+                result = self._job(flipbook_id, version)
+                error = None if result.get("success") else "Régénération impossible"
+            except Exception as e:
+                error = str(e)
+            REGENERATION_DURATION.labels(status='error' if error else 'ok').observe(time.perf_counter() - start)
+            
+            with self._condition:
+                del self._running[flipbook_id]
+                if error:
+                    self._errors[flipbook_id] = error
+                else:
+                    self._errors.pop(flipbook_id, None)
+
+
+def _regenerate(flipbook_id, version):
+    from services.flipbook_generator import rebuild_viewer
+    return rebuild_viewer(flipbook_id, generation=version)
+
+
+# Instance globale
+regeneration_queue = RegenerationQueue(_regenerate)
+
+
+def _current_generation(flipbook_id):
+    from services.storage_manager import storage
+    return (storage.get_flipbook_metadata(flipbook_id) or {}).get('generation', 0)
+
+
+def schedule_regeneration(flipbook_id):
+    """Fonction principale : planifie la régénération du viewer et répond immédiatement"""
+    version = regeneration_queue.request(flipbook_id, _current_generation(flipbook_id))
+    return {"success": True, "version": version, "pending": True}
+
+
+def get_regeneration_status(flipbook_id):
+    """État de génération du viewer d'un flipbook"""
+    return {"success": True, **regeneration_queue.status(flipbook_id, _current_generation(flipbook_id))}
@@ -0,0 +1,164 @@
+"""Service d'export statique des flipbooks (CDN / hébergement hors ligne)"""
+
+import os
+import json
+import shutil
+import hashlib
+import zipfile
+import tempfile
+from datetime import datetime
+from config import BASE_DIR
+from services.storage_manager import storage
+from services.flipbook_generator import FlipbookGenerator
+from services.vendor_assets import vendor_assets
+
+# Extensions déjà compressées : stockées telles quelles dans le zip
+STORED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.avif', '.gz', '.br'}
+
+# Runtime partagé du viewer, copié dans chaque bundle
+VIEWER_ASSETS_DIR = os.path.join(BASE_DIR, 'static', 'viewer')
+
+
+class StaticExporter:
+    """Exporte un flipbook en bundle statique autonome (aucun Python requis pour le servir)"""
+    
+    def __init__(self, flipbook_id):
+        self.flipbook_id = flipbook_id
+        self.metadata = storage.get_flipbook_metadata(flipbook_id) or {}
+        self.flipbook_path = storage.get_flipbook_path(flipbook_id)
+    
+    def export(self, output_path, as_zip=False, allow_cdn=False):
+        """Écrit le bundle dans un dossier, ou dans une archive zip si as_zip
+        
+        Sans copies locales des dépendances tierces, le bundle dépendrait du CDN (pas de lecture hors ligne) :
+        l'export est refusé, sauf allow_cdn.
+        """
+        if not storage.flipbook_exists(self.flipbook_id):
+            return {"success": False, "error": "Flipbook introuvable"}
+        
+        missing = vendor_assets.missing()
+        if missing and not allow_cdn:
+            return {"success": False, "error": f"Dépendances non vendorisées ({', '.join(missing)}) : "
+                                               "lancer 'flask vendor' avant l'export, ou exporter avec --allow-cdn"}
+        
+        try:
+            if not as_zip:
+                files = self._write_bundle(output_path)
+                return {"success": True, "path": output_path, "files_count": len(files)}
+            
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                files = self._write_bundle(tmp_dir)
+                self._write_zip(tmp_dir, output_path)
+            return {"success": True, "path": output_path, "files_count": len(files)}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    def _write_bundle(self, bundle_dir):
+        """Construit le bundle : viewer, pages (et variantes), données, manifeste"""
+        os.makedirs(bundle_dir, exist_ok=True)
+        
+        # Pages et toutes leurs variantes
+        pages_src = os.path.join(self.flipbook_path, 'pages')
+        pages_dst = os.path.join(bundle_dir, 'pages')
+        if os.path.isdir(pages_dst):
+            shutil.rmtree(pages_dst)
+        shutil.copytree(pages_src, pages_dst)
+        
+        # Runtime du viewer
+        assets_dst = os.path.join(bundle_dir, 'assets')
+        if os.path.isdir(assets_dst):
+            shutil.rmtree(assets_dst)
+        shutil.copytree(VIEWER_ASSETS_DIR, assets_dst)
+        
+        # Dépendances tierces vendorisées (sinon, avec allow_cdn, le viewer les charge depuis leur CDN d'origine)
+        vendor_dst = os.path.join(bundle_dir, 'vendor')
+        if os.path.isdir(vendor_dst):
+            shutil.rmtree(vendor_dst)
+        published = vendor_assets.published_files()
+        if published:
+            os.makedirs(vendor_dst)
+            for filename in sorted(published):
+                shutil.copy2(os.path.join(vendor_assets.vendor_dir, filename), vendor_dst)
+        
+        # Viewer avec chemins relatifs
+        pages_count = self.metadata.get('pages_count', 0)
+        generator = FlipbookGenerator(
+            self.flipbook_id,
+            pages_count,
+            mode=self.metadata.get('mode', 'default'),
+            background_color=self.metadata.get('background_color', '#0f0f0f'),
+            hotspots=self.metadata.get('hotspots', []),
+            base_url='.',
+            pages=storage.ensure_pages_info(self.flipbook_id, pages_count),
+            assets_url='./assets',
+            vendor_url='./vendor',
+            hires_zoom=False,
+            telemetry=False,
+            home_url=None
+        )
+        if not generator.generate(os.path.join(bundle_dir, 'index.html'), use_cache=False, precompress=False)["success"]:
+            raise RuntimeError("Génération du viewer impossible")
+        
+        # Manifeste figé et données annexes
+        self._write_json(os.path.join(bundle_dir, 'manifest.json'), generator.build_manifest())
+        self._write_json(os.path.join(bundle_dir, 'hotspots.json'), self.metadata.get('hotspots', []))
+        
+        files = self._hash_files(bundle_dir)
+        self._write_json(os.path.join(bundle_dir, 'bundle.json'), {
+            "id": self.flipbook_id,
+            "title": self.metadata.get('title', 'Sans titre'),
+            "pages_count": self.metadata.get('pages_count', 0),
+            "exported_at": datetime.now().isoformat(),
+            "entry": "index.html",
+            "files": files
+        })
+        return files
+    
+    def _hash_files(self, bundle_dir):
+        """Calcule taille et SHA-256 de chaque fichier du bundle"""
+        files = {}
+        for root, _, names in os.walk(bundle_dir):
+            for name in sorted(names):
+                path = os.path.join(root, name)
+                rel_path = os.path.relpath(path, bundle_dir).replace(os.sep, '/')
+                if rel_path == 'bundle.json':
+                    continue
+                
+                digest = hashlib.sha256()
+                with open(path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(65536), b''):
+                        digest.update(chunk)
+                files[rel_path] = {"sha256": digest.hexdigest(), "size": os.path.getsize(path)}
+        return dict(sorted(files.items()))
+    
+    def _write_zip(self, bundle_dir, zip_path):
+        """Archive le bundle (images stockées sans recompression)"""
+        os.makedirs(os.path.dirname(os.path.abspath(zip_path)), exist_ok=True)
+        with zipfile.ZipFile(zip_path, 'w') as zf:
+            for root, _, names in os.walk(bundle_dir):
+                for name in sorted(names):
+                    path = os.path.join(root, name)
+                    arcname = os.path.relpath(path, bundle_dir).replace(os.sep, '/')
+                    ext = os.path.splitext(name)[1].lower()
+                    compression = zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+                    zf.write(path, arcname, compress_type=compression)
+    
+    @staticmethod
+    def _write_json(path, data):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def export_flipbook(flipbook_id, output_path, as_zip=False, allow_cdn=False):
+    """Fonction principale d'export statique"""
+    return StaticExporter(flipbook_id).export(output_path, as_zip, allow_cdn)
+
+
+def export_library(output_dir, as_zip=False, allow_cdn=False):
+    """Exporte tous les flipbooks de la bibliothèque dans output_dir"""
+    results = {}
+    for flipbook in storage.get_all_flipbooks():
+        flipbook_id = flipbook["id"]
+        target = os.path.join(output_dir, f"{flipbook_id}.zip" if as_zip else flipbook_id)
+        results[flipbook_id] = export_flipbook(flipbook_id, target, as_zip, allow_cdn)
+    return results
@@ -4,14 +4,19 @@ import os
 import json
 import uuid
 import shutil
+import threading
 from datetime import datetime
 from config import UPLOAD_FOLDER, FLIPBOOK_FOLDER, METADATA_FILE
+from services.atomic_writer import write_atomic
+from services.metrics import METADATA_DURATION, timed
 
 
 class StorageManager:
     """Gestionnaire centralisé du stockage"""
     
     def __init__(self):
+        # Lecture-modification-écriture du fichier de métadonnées, aussi depuis la file de régénération
+        self._lock = threading.RLock()
         self._ensure_metadata_file()
     
     def _ensure_metadata_file(self):
@@ -21,15 +26,17 @@ class StorageManager:
     
     def _load_metadata(self):
         try:
-            with open(METADATA_FILE, 'r', encoding='utf-8') as f:
+            with timed(METADATA_DURATION, operation='load'), open(METADATA_FILE, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception:
             return {"flipbooks": {}}
     
     def _save_metadata(self, data):
         try:
-            with open(METADATA_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            # Fichier remplacé d'un bloc : une lecture concurrente ne voit jamais de JSON tronqué
+            encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+            with timed(METADATA_DURATION, operation='save'):
+                write_atomic(METADATA_FILE, encoder.iterencode(data))
             return True
         except Exception:
             return False
@@ -49,17 +56,55 @@ class StorageManager:
         os.makedirs(pages_path, exist_ok=True)
         return {"base_path": base_path, "pages_path": pages_path}
     
+    def get_pages_info_path(self, flipbook_id):
+        return os.path.join(self.get_flipbook_path(flipbook_id), 'pages.json')
+    
+    def save_pages_info(self, flipbook_id, pages):
+        """Enregistre les dimensions par page (fichier propre au flipbook)"""
+        try:
+            encoder = json.JSONEncoder(separators=(',', ':'))
+            write_atomic(self.get_pages_info_path(flipbook_id), encoder.iterencode(pages))
+            return True
+        except Exception:
+            return False
+    
+    def get_pages_info(self, flipbook_id):
+        """Dimensions par page, ou None si elles n'ont pas été enregistrées"""
+        try:
+            with open(self.get_pages_info_path(flipbook_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return None
+    
+    def ensure_pages_info(self, flipbook_id, pages_count):
+        """Dimensions et aperçus par page, recalculés depuis les images pour les anciens flipbooks"""
+        pages = self.get_pages_info(flipbook_id)
+        if pages is None or any("placeholder" not in p for p in pages):
+            from services.pdf_processor import read_pages_dimensions
+            pages_dir = os.path.join(self.get_flipbook_path(flipbook_id), 'pages')
+            rendered = read_pages_dimensions(pages_dir, pages_count)
+            if rendered:
+                # Les informations issues de la conversion (format PDF, rotation) priment
+                known = {p["number"]: p for p in pages or []}
+                pages = [{**r, **known.get(r["number"], {}), "placeholder": r["placeholder"]} for r in rendered]
+                self.save_pages_info(flipbook_id, pages)
+        return pages or []
+    
     def save_flipbook_metadata(self, flipbook_id, metadata):
-        data = self._load_metadata()
-        data["flipbooks"][flipbook_id] = {
-            "id": flipbook_id,
-            "title": metadata.get("title", "Sans titre"),
-            "pages_count": metadata.get("pages_count", 0),
-            "created_at": datetime.now().isoformat(),
-            "url": f"/view/{flipbook_id}",
-            "pdf_size_bytes": metadata.get("pdf_size_bytes", 0)
-        }
-        return self._save_metadata(data)
+        with self._lock:
+            data = self._load_metadata()
+            data["flipbooks"][flipbook_id] = {
+                "id": flipbook_id,
+                "title": metadata.get("title", "Sans titre"),
+                "pages_count": metadata.get("pages_count", 0),
+                "created_at": datetime.now().isoformat(),
+                "url": f"/view/{flipbook_id}",
+                "pdf_size_bytes": metadata.get("pdf_size_bytes", 0),
+                "viewer_version": metadata.get("viewer_version"),
+                "hotspots": metadata.get("hotspots", []),
+                "upload_trace": metadata.get("upload_trace")
+            }
+            return self._save_metadata(data)
     
     def get_flipbook_metadata(self, flipbook_id):
         return self._load_metadata()["flipbooks"].get(flipbook_id)
@@ -75,10 +120,11 @@ class StorageManager:
     
     def delete_flipbook(self, flipbook_id):
         try:
-            data = self._load_metadata()
-            if flipbook_id in data["flipbooks"]:
-                del data["flipbooks"][flipbook_id]
-                self._save_metadata(data)
+            with self._lock:
+                data = self._load_metadata()
+                if flipbook_id in data["flipbooks"]:
+                    del data["flipbooks"][flipbook_id]
+                    self._save_metadata(data)
             
             flipbook_path = self.get_flipbook_path(flipbook_id)
             if os.path.exists(flipbook_path):
@@ -102,18 +148,30 @@ class StorageManager:
             "total_size_mb": round(total_size / (1024 * 1024), 2)
         }
     
+    def modify_flipbook_metadata(self, flipbook_id, modify):
+        """Applique modify(flipbook) en une seule écriture ; rien n'est écrit s'il lève une exception"""
+        with self._lock:
+            data = self._load_metadata()
+            
+            if flipbook_id not in data["flipbooks"]:
+                return False
+            
+            modify(data["flipbooks"][flipbook_id])
+            return self._save_metadata(data)
+    
     def update_flipbook_metadata(self, flipbook_id, updates, allowed_fields=None):
         """Met à jour les métadonnées d'un flipbook"""
-        data = self._load_metadata()
-        
-        if flipbook_id not in data["flipbooks"]:
-            return False
-        
-        for key, value in updates.items():
-            if allowed_fields is None or key in allowed_fields:
-                data["flipbooks"][flipbook_id][key] = value
-        
-        return self._save_metadata(data)
+        with self._lock:
+            data = self._load_metadata()
+            
+            if flipbook_id not in data["flipbooks"]:
+                return False
+            
+            for key, value in updates.items():
+                if allowed_fields is None or key in allowed_fields:
+                    data["flipbooks"][flipbook_id][key] = value
+            
+            return self._save_metadata(data)
 
 
 # Instance globale
@@ -0,0 +1,228 @@
+"""Service de télémétrie du viewer : lots envoyés par les lecteurs, journal tamponné et percentiles par flipbook et mode"""
+
+import os
+import glob
+import json
+import time
+import atexit
+import threading
+from collections import deque
+from config import (TELEMETRY_FOLDER, TELEMETRY_LOG_MAX_BYTES, TELEMETRY_FLUSH_EVENTS, TELEMETRY_FLUSH_INTERVAL,
+                    TELEMETRY_MAX_EVENTS, TELEMETRY_WINDOW, TELEMETRY_MAX_SERIES)
+from services.flipbook_generator import FlipbookGenerator
+
+# Code compact envoyé par le viewer -> nom de la mesure
+METRICS = {
+    't': 'first_page_ms',      # Première page disponible, depuis le début de la navigation
+    'l': 'lcp_ms',             # Largest Contentful Paint
+    'i': 'image_ms',           # Chargement d'une image de page (ou de zoom)
+    'f': 'turn_fps',           # Images par seconde pendant un tour de page
+    'd': 'dwell_ms'            # Temps passé sur une page
+}
+METRIC_CODES = {name: code for code, name in METRICS.items()}
+# Bornes des valeurs acceptées : au-delà, la mesure est aberrante (onglet en arrière-plan, horloge...)
+LIMITS = {'first_page_ms': 120_000, 'lcp_ms': 120_000, 'image_ms': 120_000, 'turn_fps': 240, 'dwell_ms': 3_600_000}
+PERCENTILES = (50, 75, 95)
+# Au-delà, le numéro de page envoyé n'est pas plausible
+MAX_PAGE = 10_000
+
+
+class TelemetryCollector:
+    """Agrège les mesures en mémoire ; le journal est écrit par lots, hors des requêtes
+    
+    Chaque processus (worker gunicorn) a ses propres agrégats et son propre journal : pas d'écritures
+    entremêlées ni de rotation concurrente. Les journaux de tous les processus donnent la vue d'ensemble.
+    """
+    
+    def __init__(self, log_folder=TELEMETRY_FOLDER, flush_events=TELEMETRY_FLUSH_EVENTS,
+                 flush_interval=TELEMETRY_FLUSH_INTERVAL, window=TELEMETRY_WINDOW, max_series=TELEMETRY_MAX_SERIES):
+        self.log_folder = log_folder
+        self.flush_events = flush_events
+        self.flush_interval = flush_interval
+        self.window = window
+        self.max_series = max_series
+        # (flipbook_id, mode, mesure) -> dernières valeurs, dans l'ordre de création
+        self._values = {}
+        # flipbook_id -> page -> [temps cumulé, lectures]
+        self._dwell_by_page = {}
+        self._buffer = []
+        self._buffered_events = 0
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._worker = None
+    
+    def ingest(self, flipbook_id, batch):
+        """Ajoute un lot {"s": session, "e": [[code, valeur, page, mode], ...]} ; renvoie le nombre de mesures retenues"""
+        if not isinstance(batch, dict) or not isinstance(batch.get("e"), list):
+            return 0
+        
+        events = []
+        for event in batch["e"][:TELEMETRY_MAX_EVENTS]:
+            parsed = self._parse(event)
+            if parsed:
+                events.append(parsed)
+        if not events:
+            return 0
+        
+        with self._condition:
+            self._aggregate(flipbook_id, events)
+            
+            # Une ligne de journal par lot, écrite plus tard par le thread d'écriture
+            self._buffer.append(json.dumps({
+                "ts": round(time.time(), 3),
+                "flipbook_id": flipbook_id,
+                "session": str(batch.get("s", ""))[:32],
+                "events": [[METRIC_CODES[name], value, page, mode] for name, value, page, mode in events]
+            }, separators=(',', ':')))
+            self._buffered_events += len(events)
+            self._ensure_worker()
+            if self._buffered_events >= self.flush_events:
+                self._condition.notify()
+        return len(events)
+    
+    def _aggregate(self, flipbook_id, events):
+        """Ajoute des mesures validées aux séries (appelant : verrou pris ou collecteur local)"""
+        for name, value, page, mode in events:
+            values = self._values.get((flipbook_id, mode, name))
+            if values is None:
+                # Nombre de séries borné : la plus ancienne est abandonnée
+                if len(self._values) >= self.max_series:
+                    self._evict()
+                values = self._values[(flipbook_id, mode, name)] = deque(maxlen=self.window)
+            values.append(value)
+            if name == 'dwell_ms' and page:
+                entry = self._dwell_by_page.setdefault(flipbook_id, {}).setdefault(page, [0, 0])
+                entry[0] += value
+                entry[1] += 1
+    
+    def _evict(self):
+        """Supprime la série la plus ancienne (et le temps par page d'un flipbook qui n'a plus de mesures)"""
+        oldest = next(iter(self._values))
+        del self._values[oldest]
+        flipbook_id = oldest[0]
+        if not any(key[0] == flipbook_id for key in self._values):
+            self._dwell_by_page.pop(flipbook_id, None)
+    
+    @staticmethod
+    def _parse(event):
+        """[code, valeur, page, mode] validé, ou None"""
+        if not isinstance(event, list) or len(event) < 2:
+            return None
+        name = METRICS.get(event[0])
+        value = event[1]
+        if name is None or not isinstance(value, (int, float)) or isinstance(value, bool):
+            return None
+        if not 0 <= value <= LIMITS[name]:
+            return None
+        page = event[2] if len(event) > 2 and isinstance(event[2], int) and 0 < event[2] <= MAX_PAGE else None
+        # Seuls les modes du viewer sont conservés : une valeur arbitraire créerait une nouvelle série
+        mode = event[3] if len(event) > 3 and isinstance(event[3], str) and event[3] in FlipbookGenerator.MODES else 'unknown'
+        return name, round(float(value), 1), page, mode
+    
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name='telemetry-writer', daemon=True)
+            self._worker.start()
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait(self.flush_interval)
+            self.flush()
+    
+    def log_file(self):
+        """Journal du processus courant (pid lu à l'écriture : les workers sont créés après l'import)"""
+        return os.path.join(self.log_folder, f"viewer-{os.getpid()}.jsonl")
+    
+    def flush(self):
+        """Écrit les lignes en attente en un seul ajout au journal du processus"""
+        with self._condition:
+            lines, self._buffer = self._buffer, []
+            self._buffered_events = 0
+        if not lines:
+            return 0
+        # Thread d'écriture et atexit : une seule écriture à la fois dans ce processus
+        with self._write_lock:
+            try:
+                os.makedirs(self.log_folder, exist_ok=True)
+                log_file = self.log_file()
+                # Une seule sauvegarde (.1) : le journal ne grossit pas sans limite
+                if os.path.exists(log_file) and os.path.getsize(log_file) > TELEMETRY_LOG_MAX_BYTES:
+                    os.replace(log_file, log_file + '.1')
+                with open(log_file, 'a', encoding='utf-8') as f:
+                    f.write('\n'.join(lines) + '\n')
+            except OSError:
+                pass  # Télémétrie perdue plutôt qu'une requête en erreur
+        return len(lines)
+    
+    def summary_from_logs(self, flipbook_id=None):
+        """Percentiles calculés sur les journaux de tous les processus (mesures déjà écrites)"""
+        self.flush()
+        merged = TelemetryCollector(self.log_folder, window=self.window, max_series=self.max_series)
+        for path in sorted(glob.glob(os.path.join(self.log_folder, 'viewer-*.jsonl*')), key=os.path.getmtime):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # Ligne tronquée (arrêt brutal)
+                        if flipbook_id and record.get("flipbook_id") != flipbook_id:
+                            continue
+                        events = [parsed for parsed in map(self._parse, record.get("events", [])) if parsed]
+                        merged._aggregate(record.get("flipbook_id"), events)
+            except OSError:
+                continue
+        result = merged.summary(flipbook_id)
+        del result["pid"]
+        result["scope"] = "all"
+        return result
+    
+    def summary(self, flipbook_id=None):
+        """Percentiles par mesure, par mode, et par flipbook (ou pour un seul flipbook), pour ce processus"""
+        with self._condition:
+            items = [(key, list(values)) for key, values in self._values.items()
+                     if flipbook_id is None or key[0] == flipbook_id]
+            dwell = {page: list(entry) for page, entry in self._dwell_by_page.get(flipbook_id, {}).items()} \
+                if flipbook_id else None
+        
+        by_mode, by_flipbook = {}, {}
+        for (fid, mode, name), values in items:
+            by_mode.setdefault(mode, {}).setdefault(name, []).extend(values)
+            by_flipbook.setdefault(fid, {}).setdefault(mode, {})[name] = _percentiles(values)
+        
+        result = {"modes": {mode: {name: _percentiles(values) for name, values in metrics.items()}
+                            for mode, metrics in by_mode.items()}}
+        if flipbook_id:
+            result["by_mode"] = by_flipbook.get(flipbook_id, {})
+            # Temps moyen passé sur chaque page
+            result["dwell_by_page"] = {page: round(total / count) for page, (total, count) in sorted(dwell.items())}
+        else:
+            result["flipbooks"] = by_flipbook
+        # Vue d'un seul worker : voir summary_from_logs pour l'ensemble des processus
+        result.update(scope="process", pid=os.getpid())
+        return result
+
+
+def _percentiles(values):
+    ordered = sorted(values)
+    return {"count": len(ordered),
+            **{f"p{p}": ordered[max(0, -(-p * len(ordered) // 100) - 1)] for p in PERCENTILES}}
+
+
+# Instance globale
+telemetry = TelemetryCollector()
+# Les mesures encore en mémoire sont écrites à l'arrêt du processus
+atexit.register(telemetry.flush)
+
+
+def record_telemetry(flipbook_id, batch):
+    """Fonction principale d'ingestion d'un lot envoyé par le viewer"""
+    return telemetry.ingest(flipbook_id, batch)
+
+
+def get_telemetry_summary(flipbook_id=None, scope='process'):
+    """Synthèse du processus (mémoire), ou de tous les processus (scope='all', depuis les journaux)"""
+    if scope == 'all':
+        return telemetry.summary_from_logs(flipbook_id)
+    return telemetry.summary(flipbook_id)
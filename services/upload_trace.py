@@ -0,0 +1,253 @@
+"""Service de trace des uploads : durée, CPU, octets écrits et mémoire par étape, agrégés sur les derniers uploads"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from config import UPLOAD_TRACE_HISTORY, UPLOAD_TRACE_LOG, UPLOAD_TRACE_RSS_INTERVAL
+from services.storage_manager import storage
+from services.metrics import UPLOAD_STAGE_DURATION, UPLOAD_STAGES_IN_PROGRESS, in_progress
+
+try:
+    import resource  # Absent sous Windows : pas de pic mémoire
+except ImportError:
+    resource = None
+
+PERCENTILES = (50, 90, 99)
+
+# Une ligne JSON par upload, indépendante du niveau de log de Flask
+logger = logging.getLogger('flipbook.upload')
+if UPLOAD_TRACE_LOG and not logger.handlers:
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def process_peak_rss_mb():
+    """Pic de mémoire résidente du processus depuis son démarrage (Mo), toutes requêtes confondues"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Octets sous macOS, kilo-octets ailleurs
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def current_rss_mb():
+    """Mémoire résidente actuelle du processus (Mo), None hors Linux"""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024), 1)
+
+
+class RssSampler:
+    """Relève la mémoire résidente dans un thread pendant une étape : pic propre à l'étape, pas au processus"""
+    
+    def __init__(self, interval=UPLOAD_TRACE_RSS_INTERVAL):
+        self.interval = interval
+        self.peak = current_rss_mb()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        if self.peak is not None:
+            self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+            self._thread.start()
+        return self
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+    
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is not None and rss > self.peak:
+            self.peak = rss
+    
+    def stop(self):
+        """Pic relevé pendant l'étape (Mo), None si la mémoire n'est pas lisible"""
+        if self._thread is None:
+            return None
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        return self.peak
+
+
+def disk_usage(*paths):
+    """Taille totale (octets) des fichiers et dossiers donnés"""
+    total = 0
+    for path in paths:
+        if os.path.isfile(path):
+            total += os.path.getsize(path)
+        elif os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+class UploadTrace:
+    """Chronologie d'un upload : une mesure par étape du pipeline"""
+    
+    def __init__(self):
+        self.flipbook_id = None
+        self.pages_count = 0
+        self.started_at = datetime.now().isoformat()
+        self.status = "running"
+        self.error = None
+        self.stages = []
+        self._start = time.perf_counter()
+        self._cpu_start = time.thread_time()
+        self._wall_ms = None
+        self._cpu_ms = None
+    
+    @contextmanager
+    def stage(self, name, *watched):
+        """Mesure le bloc ; les octets écrits sont la croissance de watched, sauf si le bloc renseigne bytes_written
+        
+        Le bloc peut aussi renseigner pages pour obtenir le débit de l'étape.
+        """
+        record = {"name": name}
+        size_before = disk_usage(*watched) if watched else 0
+        start = time.perf_counter()
+        # Temps CPU du thread de la requête : non faussé par les uploads concurrents
+        cpu_start = time.thread_time()
+        # Mémoire : pic pendant l'étape (relevés), ou à défaut croissance du pic du processus
+        rss = RssSampler().start()
+        process_peak_before = process_peak_rss_mb()
+        try:
+            with in_progress(UPLOAD_STAGES_IN_PROGRESS, stage=name):
+                yield record
+        except Exception as e:
+            record["error"] = str(e)
+            raise
+        finally:
+            record["wall_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            record["cpu_ms"] = round((time.thread_time() - cpu_start) * 1000, 2)
+            if "bytes_written" not in record:
+                record["bytes_written"] = max(0, disk_usage(*watched) - size_before) if watched else 0
+            if record.get("pages") and record["wall_ms"]:
+                record["pages_per_second"] = round(record["pages"] / (record["wall_ms"] / 1000), 2)
+            peak = rss.stop()
+            if peak is not None:
+                record["peak_rss_mb"] = peak
+            elif process_peak_before is not None:
+                record["process_peak_growth_mb"] = round(process_peak_rss_mb() - process_peak_before, 1)
+            self.stages.append(record)
+            UPLOAD_STAGE_DURATION.labels(stage=name, status='error' if "error" in record else 'ok').observe(
+                record["wall_ms"] / 1000)
+    
+    def finish(self, status="completed", error=None):
+        """Clôt la trace, l'écrit dans le log et l'ajoute aux statistiques"""
+        self.status = status
+        self.error = error
+        self._wall_ms = round((time.perf_counter() - self._start) * 1000, 2)
+        self._cpu_ms = round((time.thread_time() - self._cpu_start) * 1000, 2)
+        trace = self.to_dict()
+        upload_stats.add(trace)
+        if UPLOAD_TRACE_LOG:
+            logger.info(json.dumps({"event": "upload_trace", **trace}))
+        return trace
+    
+    def to_dict(self):
+        wall_ms = self._wall_ms if self._wall_ms is not None else round((time.perf_counter() - self._start) * 1000, 2)
+        trace = {
+            "flipbook_id": self.flipbook_id,
+            "started_at": self.started_at,
+            "status": self.status,
+            "pages_count": self.pages_count,
+            "wall_ms": wall_ms,
+            "cpu_ms": self._cpu_ms,
+            "pages_per_second": round(self.pages_count / (wall_ms / 1000), 2) if wall_ms else None,
+            "bytes_written": sum(s["bytes_written"] for s in self.stages),
+            "peak_rss_mb": max((s["peak_rss_mb"] for s in self.stages if "peak_rss_mb" in s), default=None),
+            "process_peak_rss_mb": process_peak_rss_mb(),
+            "stages": self.stages
+        }
+        if self.error:
+            trace["error"] = self.error
+        return trace
+
+
+class UploadStats:
+    """Traces des derniers uploads du processus et percentiles par étape"""
+    
+    def __init__(self, history=UPLOAD_TRACE_HISTORY):
+        self._traces = deque(maxlen=history)
+        self._lock = threading.Lock()
+    
+    def add(self, trace):
+        with self._lock:
+            self._traces.append(trace)
+    
+    def get(self, flipbook_id):
+        """Trace complète d'un upload récent (None si sortie de l'historique)"""
+        with self._lock:
+            for trace in reversed(self._traces):
+                if trace["flipbook_id"] == flipbook_id:
+                    return trace
+        return None
+    
+    def summary(self):
+        """p50 / p90 / p99 de la durée, du CPU, des octets écrits et du pic mémoire de chaque étape, et du débit en pages"""
+        with self._lock:
+            traces = list(self._traces)
+        
+        stages = {}
+        for trace in traces:
+            for stage in trace["stages"]:
+                entry = stages.setdefault(stage["name"], {"wall_ms": [], "cpu_ms": [], "bytes_written": [],
+                                                          "peak_rss_mb": []})
+                for key in entry:
+                    if key in stage:
+                        entry[key].append(stage[key])
+        
+        completed = [t for t in traces if t["status"] == "completed"]
+        return {
+            "uploads": len(traces),
+            "failed": len(traces) - len(completed),
+            "total": {
+                "wall_ms": _percentiles([t["wall_ms"] for t in completed]),
+                "cpu_ms": _percentiles([t["cpu_ms"] for t in completed]),
+                "pages_per_second": _percentiles([t["pages_per_second"] for t in completed if t["pages_per_second"]])
+            },
+            "stages": {
+                name: {"count": len(values["wall_ms"]), **{key: _percentiles(v) for key, v in values.items()}}
+                for name, values in stages.items()
+            },
+            "process_peak_rss_mb": process_peak_rss_mb()
+        }
+
+
+def _percentiles(values):
+    """Percentiles au rang le plus proche"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {f"p{p}": ordered[max(0, -(-p * len(ordered) // 100) - 1)] for p in PERCENTILES}
+
+
+# Instance globale
+upload_stats = UploadStats()
+
+
+def get_upload_trace(flipbook_id):
+    """Trace d'un upload : historique du processus, sinon celle enregistrée avec le flipbook"""
+    trace = upload_stats.get(flipbook_id)
+    if trace is None:
+        trace = (storage.get_flipbook_metadata(flipbook_id) or {}).get("upload_trace")
+    return trace
+
+
+def get_upload_stats():
+    """Fonction principale de synthèse des derniers uploads"""
+    return upload_stats.summary()
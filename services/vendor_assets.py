@@ -0,0 +1,131 @@
+"""Service des dépendances tierces du viewer : copies locales empreintées (cache immuable, SRI)"""
+
+import os
+import json
+import base64
+import hashlib
+import logging
+import urllib.request
+from config import VENDOR_FOLDER
+
+# Dépendances du viewer : nom logique -> source d'origine (version figée)
+VENDOR_ASSETS = {
+    "swiper.css": "https://cdn.jsdelivr.net/npm/swiper@11.1.15/swiper-bundle.min.css",
+    "swiper.js": "https://cdn.jsdelivr.net/npm/swiper@11.1.15/swiper-bundle.min.js"
+}
+
+# Empreintes SRI (sha384-...) des fichiers d'origine ci-dessus, à mettre à jour avec la version :
+# vérifiées à la vendorisation et appliquées au chargement depuis le CDN tant que les copies locales manquent
+VENDOR_INTEGRITY = {
+    "swiper.css": None,
+    "swiper.js": None
+}
+
+MANIFEST_FILENAME = 'manifest.json'
+
+logger = logging.getLogger('flipbook.vendor')
+
+
+class VendorAssets:
+    """Manifeste des dépendances vendorisées : nom logique -> fichier empreinté et intégrité"""
+    
+    def __init__(self, vendor_dir=VENDOR_FOLDER):
+        self.vendor_dir = vendor_dir
+        self.manifest_file = os.path.join(vendor_dir, MANIFEST_FILENAME)
+        self._manifest = {}
+        self._mtime = None
+        self._warned = set()
+    
+    def get_manifest(self):
+        """Manifeste courant, relu seulement si le fichier a changé"""
+        try:
+            mtime = os.path.getmtime(self.manifest_file)
+        except OSError:
+            return {}
+        
+        if mtime != self._mtime:
+            try:
+                with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                    self._manifest = json.load(f)
+            except (OSError, ValueError):
+                self._manifest = {}
+            self._mtime = mtime
+        return self._manifest
+    
+    def resolve(self, name, base_url):
+        """URL et intégrité d'une dépendance ; source d'origine et empreinte figée si elle n'est pas vendorisée"""
+        entry = self.get_manifest().get(name)
+        if not entry or not os.path.exists(os.path.join(self.vendor_dir, entry["file"])):
+            integrity = VENDOR_INTEGRITY.get(name)
+            if integrity is None and name not in self._warned:
+                self._warned.add(name)
+                logger.warning("%s chargé depuis %s sans contrôle d'intégrité : lancer 'flask vendor'",
+                               name, VENDOR_ASSETS[name])
+            return VENDOR_ASSETS[name], integrity
+        return f"{base_url}/{entry['file']}", entry["integrity"]
+    
+    def missing(self):
+        """Dépendances sans copie locale (chargées depuis leur CDN d'origine)"""
+        manifest = self.get_manifest()
+        return [name for name in VENDOR_ASSETS
+                if name not in manifest or not os.path.exists(os.path.join(self.vendor_dir, manifest[name]["file"]))]
+    
+    def published_files(self):
+        """Fichiers empreintés référencés par le manifeste"""
+        return {entry["file"] for entry in self.get_manifest().values()}
+    
+    def vendor(self, source_dir=None):
+        """Récupère chaque dépendance (téléchargement, ou copie depuis source_dir) et réécrit le manifeste"""
+        try:
+            os.makedirs(self.vendor_dir, exist_ok=True)
+            manifest = {}
+            for name, url in VENDOR_ASSETS.items():
+                data = self._read_source(url, source_dir)
+                integrity = "sha384-" + base64.b64encode(hashlib.sha384(data).digest()).decode('ascii')
+                # Copie altérée (CDN compromis, fichier hors ligne erroné) : rien n'est publié
+                if VENDOR_INTEGRITY.get(name) and integrity != VENDOR_INTEGRITY[name]:
+                    raise ValueError(f"Empreinte inattendue pour {url} : {integrity}")
+                filename = self._fingerprint(url.rsplit('/', 1)[1], data)
+                with open(os.path.join(self.vendor_dir, filename), 'wb') as f:
+                    f.write(data)
+                manifest[name] = {
+                    "file": filename,
+                    "source": url,
+                    "integrity": integrity,
+                    "size": len(data)
+                }
+            
+            # Anciennes empreintes devenues inutiles
+            published = {entry["file"] for entry in manifest.values()}
+            for filename in os.listdir(self.vendor_dir):
+                if filename != MANIFEST_FILENAME and filename not in published:
+                    os.remove(os.path.join(self.vendor_dir, filename))
+            
+            with open(self.manifest_file, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+            return {"success": True, "files": manifest}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    @staticmethod
+    def _read_source(url, source_dir):
+        if source_dir:
+            with open(os.path.join(source_dir, url.rsplit('/', 1)[1]), 'rb') as f:
+                return f.read()
+        with urllib.request.urlopen(url, timeout=30) as response:
+            return response.read()
+    
+    @staticmethod
+    def _fingerprint(filename, data):
+        """swiper-bundle.min.js -> swiper-bundle.min.<empreinte>.js"""
+        stem, ext = os.path.splitext(filename)
+        return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+
+
+# Instance globale
+vendor_assets = VendorAssets()
+
+
+def vendor_dependencies(source_dir=None):
+    """Fonction principale de vendorisation des dépendances du viewer"""
+    return vendor_assets.vendor(source_dir)
@@ -0,0 +1,93 @@
+"""Service de rendu haute définition des pages pour le zoom (à la demande, mis en cache)"""
+
+import io
+import os
+import threading
+from config import (ZOOM_DPI_BUCKETS, ZOOM_MAX_PIXELS, ZOOM_RENDER_CONCURRENCY, ZOOM_RENDER_TIMEOUT,
+                    IMAGE_FORMAT, IMAGE_QUALITY)
+from services.storage_manager import storage
+from services.pdf_processor import PDFProcessor
+from services.metrics import record_cache
+from services.atomic_writer import write_atomic
+
+
+class ZoomRenderer:
+    """Rend une page du PDF d'origine à une résolution autorisée, une seule fois par page et résolution"""
+    
+    def __init__(self, concurrency=ZOOM_RENDER_CONCURRENCY, timeout=ZOOM_RENDER_TIMEOUT):
+        # Borne le CPU consacré aux rendus, quel que soit le nombre de requêtes
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._timeout = timeout
+        # Un verrou par rendu en cours : les demandes simultanées de la même page attendent le premier
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+    
+    def get_cache_path(self, flipbook_id, page_num, dpi):
+        return os.path.join(storage.get_flipbook_path(flipbook_id), 'zoom', str(dpi), f"page_{page_num}.jpg")
+    
+    def render(self, flipbook_id, page_num, dpi):
+        """Chemin du rendu de la page (depuis le cache, ou calculé)"""
+        if dpi not in ZOOM_DPI_BUCKETS:
+            return {"success": False, "error": "Résolution non autorisée"}
+        
+        metadata = storage.get_flipbook_metadata(flipbook_id) or {}
+        if not 1 <= page_num <= metadata.get('pages_count', 0):
+            return {"success": False, "error": "Page introuvable"}
+        
+        cache_path = self.get_cache_path(flipbook_id, page_num, dpi)
+        if os.path.exists(cache_path):
+            record_cache('zoom', True)
+            return {"success": True, "path": cache_path, "cached": True}
+        
+        pdf_path = storage.get_upload_path(flipbook_id)
+        if not os.path.exists(pdf_path):
+            return {"success": False, "error": "PDF d'origine indisponible"}
+        
+        with self._pending_lock:
+            lock = self._pending.setdefault(cache_path, threading.Lock())
+        try:
+            with lock:
+                if os.path.exists(cache_path):
+                    record_cache('zoom', True)
+                    return {"success": True, "path": cache_path, "cached": True}
+                
+                record_cache('zoom', False)
+                if not self._slots.acquire(timeout=self._timeout):
+                    return {"success": False, "error": "Rendu indisponible, réessayez", "busy": True}
+                try:
+                    self._render_to(pdf_path, page_num, dpi, cache_path)
+                finally:
+                    self._slots.release()
+            return {"success": True, "path": cache_path, "cached": False}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        finally:
+            with self._pending_lock:
+                self._pending.pop(cache_path, None)
+    
+    @staticmethod
+    def _render_to(pdf_path, page_num, dpi, cache_path):
+        processor = PDFProcessor(pdf_path)
+        result = processor.open()
+        if not result["success"]:
+            raise RuntimeError(result["error"])
+        try:
+            img = processor.render_page(page_num - 1, dpi, ZOOM_MAX_PIXELS)
+        finally:
+            processor.close()
+        
+        buffer = io.BytesIO()
+        img.save(buffer, format=IMAGE_FORMAT, quality=IMAGE_QUALITY, optimize=True, progressive=True)
+        
+        # Écriture atomique, temporaire unique même entre workers : une requête concurrente ne lit jamais un fichier partiel
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        write_atomic(cache_path, [buffer.getvalue()])
+
+
+# Instance globale
+zoom_renderer = ZoomRenderer()
+
+
+def render_zoom_page(flipbook_id, page_num, dpi):
+    """Fonction principale de rendu haute définition d'une page"""
+    return zoom_renderer.render(flipbook_id, page_num, dpi)
@@ -0,0 +1,834 @@
+/**
+ * FlipBook - Mode magazine (chargé à la demande par le runtime)
+ * Tour de page sur canvas : rendu (pageturn.js), préchargement fenêtré, son, glisser-déposer
+ */
+(function(modes) {
+    'use strict';
+    
+    // Le worker de rendu est servi à côté de ce module
+    const MODULE_URL = document.currentScript ? document.currentScript.src : location.href;
+    
+    modes.magazine = function(viewer) {
+        const { CONFIG, PARAMS, state, elements, getPageSrc, loadImage, updateUI, Offline, Telemetry } = viewer;
+        
+        const mag = {
+            isLandscape: false,
+            pageWidth: 0,
+            pageHeight: 0,
+            
+            // Animation
+            isAnimating: false,
+            isDragging: false,
+            dragStartX: 0,
+            dragStartY: 0,
+            dragProgress: 0,
+            dragCorner: null,
+            dragDirection: null
+        };
+        
+        let ready = null;
+        
+        // ========================================
+        // RENDU DU PLI - Canvas 2D ou worker OffscreenCanvas
+        // ========================================
+        // Les pages sont fournies décodées (ImageBitmap à la taille du canvas) ; le canvas est
+        // dimensionné pour devicePixelRatio (plafonné par CONFIG.MAX_DPR)
+        const Renderer = {
+            ctx: null,
+            worker: null,
+            pages: new Map(),
+            width: 0,
+            height: 0,
+            currentDpr: 0,
+            
+            init() {
+                const wanted = PARAMS.has('offscreen') ? PARAMS.get('offscreen') !== '0' : CONFIG.OFFSCREEN;
+                const supported = 'OffscreenCanvas' in window && 'createImageBitmap' in window &&
+                    'transferControlToOffscreen' in elements.canvas;
+                
+                if (wanted && supported) {
+                    try {
+                        this.worker = new Worker(new URL('pageturn-worker.js', MODULE_URL));
+                        const offscreen = elements.canvas.transferControlToOffscreen();
+                        this.worker.postMessage({ type: 'init', canvas: offscreen }, [offscreen]);
+                        return;
+                    } catch (e) {
+                        this.worker = null;
+                    }
+                }
+                this.ctx = elements.canvas.getContext('2d');
+            },
+            
+            dpr() {
+                return Math.min(window.devicePixelRatio || 1, CONFIG.MAX_DPR);
+            },
+            
+            resize(width, height) {
+                const dpr = this.dpr();
+                if (width === this.width && height === this.height && dpr === this.currentDpr) return;
+                this.width = width;
+                this.height = height;
+                this.currentDpr = dpr;
+                elements.canvas.style.width = width + 'px';
+                elements.canvas.style.height = height + 'px';
+                
+                if (this.worker) {
+                    this.worker.postMessage({ type: 'resize', width, height, dpr });
+                } else {
+                    elements.canvas.width = Math.round(width * dpr);
+                    elements.canvas.height = Math.round(height * dpr);
+                    this.ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+                }
+            },
+            
+            // Le worker reçoit l'image (transférée, sans copie) ; sinon elle reste ici
+            setPage(num, image) {
+                if (this.worker && image instanceof ImageBitmap) {
+                    this.worker.postMessage({ type: 'page', num, bitmap: image }, [image]);
+                } else {
+                    this.evict(num);
+                    this.pages.set(num, image);
+                }
+            },
+            
+            evict(num) {
+                const image = this.pages.get(num);
+                if (image && image.close) image.close();
+                this.pages.delete(num);
+                if (this.worker) this.worker.postMessage({ type: 'evict', nums: [num] });
+            },
+            
+            draw(direction, progress, pages) {
+                const frame = {
+                    w: mag.pageWidth,
+                    h: mag.pageHeight,
+                    isDouble: !mag.isLandscape,
+                    direction,
+                    progress
+                };
+                
+                if (this.worker) {
+                    this.worker.postMessage({ type: 'draw', frame: { ...frame, ...pages } });
+                    return;
+                }
+                
+                const start = performance.now();
+                FlipbookPageTurn.draw(this.ctx, {
+                    ...frame,
+                    turningImage: this.pages.get(pages.turning) || null,
+                    nextImage: this.pages.get(pages.next) || null,
+                    underImage: this.pages.get(pages.under) || null
+                });
+                Bench.draw(performance.now() - start);
+            },
+            
+            clear() {
+                if (this.worker) {
+                    this.worker.postMessage({ type: 'clear' });
+                } else {
+                    this.ctx.clearRect(0, 0, this.width, this.height);
+                }
+            },
+            
+            // Temps de dessin mesurés dans le worker (benchmark)
+            workerStats() {
+                if (!this.worker) return Promise.resolve([]);
+                return new Promise(resolve => {
+                    const onMessage = e => {
+                        if (e.data.type !== 'stats') return;
+                        this.worker.removeEventListener('message', onMessage);
+                        resolve(e.data.drawTimes);
+                    };
+                    this.worker.addEventListener('message', onMessage);
+                    this.worker.postMessage({ type: 'stats' });
+                });
+            }
+        };
+        
+        // ========================================
+        // AUDIO - Son de page qui tourne
+        // ========================================
+        const AudioManager = {
+            context: null,
+            buffer: null,
+            filter: null,
+            gainNode: null,
+            duration: 0.4,
+            
+            init() {
+                if (this.context) return;
+                try {
+                    this.context = new (window.AudioContext || window.webkitAudioContext)();
+                } catch(e) {
+                    console.log('Audio not supported');
+                    return;
+                }
+                
+                // Bruit blanc filtré pour simuler le froissement du papier, calculé une seule fois
+                const bufferSize = Math.floor(this.context.sampleRate * this.duration);
+                this.buffer = this.context.createBuffer(1, bufferSize, this.context.sampleRate);
+                const data = this.buffer.getChannelData(0);
+                
+                for (let i = 0; i < bufferSize; i++) {
+                    const t = i / bufferSize;
+                    // Enveloppe qui monte puis descend
+                    const envelope = Math.sin(t * Math.PI) * 0.3;
+                    data[i] = (Math.random() * 2 - 1) * envelope;
+                }
+                
+                // Filtre passe-bas (son plus doux) et gain, réutilisés à chaque tour de page
+                this.filter = this.context.createBiquadFilter();
+                this.filter.type = 'lowpass';
+                this.gainNode = this.context.createGain();
+                this.filter.connect(this.gainNode);
+                this.gainNode.connect(this.context.destination);
+            },
+            
+            playPageTurn() {
+                if (!this.context || !state.soundEnabled) return;
+                // Contexte créé sans geste utilisateur : repris au premier tour de page
+                if (this.context.state === 'suspended') this.context.resume();
+                
+                const now = this.context.currentTime;
+                const end = now + this.duration;
+                
+                this.filter.frequency.cancelScheduledValues(now);
+                this.filter.frequency.setValueAtTime(2000, now);
+                this.filter.frequency.linearRampToValueAtTime(800, end);
+                
+                this.gainNode.gain.cancelScheduledValues(now);
+                this.gainNode.gain.setValueAtTime(0.15, now);
+                this.gainNode.gain.linearRampToValueAtTime(0, end);
+                
+                // Seule la source est à usage unique
+                const source = this.context.createBufferSource();
+                source.buffer = this.buffer;
+                source.connect(this.filter);
+                source.start(now);
+            }
+        };
+        
+        // ========================================
+        // MAGAZINE - Format des pages
+        // ========================================
+        async function detectPageFormat() {
+            if (CONFIG.PAGES.length) {
+                // Format dominant (ratio médian) calculé sans télécharger d'image
+                const ratios = CONFIG.PAGES.map(([w, h]) => w / h).sort((a, b) => a - b);
+                const ratio = ratios[Math.floor(ratios.length / 2)];
+                const [width, height] = CONFIG.PAGES.find(([w, h]) => w / h === ratio);
+                mag.isLandscape = ratio > 1.2;
+                return { width, height, ratio };
+            }
+            
+            try {
+                const img = await loadImage(getPageSrc(1));
+                const ratio = img.naturalWidth / img.naturalHeight;
+                mag.isLandscape = ratio > 1.2;
+                return { width: img.naturalWidth, height: img.naturalHeight, ratio };
+            } catch(e) {
+                mag.isLandscape = false;
+                return { width: 800, height: 1000, ratio: 0.8 };
+            }
+        }
+        
+        function calculatePageSize(pageInfo) {
+            const container = elements.magazineContainer;
+            const maxHeight = container.clientHeight - 60;
+            const maxWidth = container.clientWidth - 60;
+            
+            if (mag.isLandscape) {
+                // Mode single page
+                if (maxWidth * 0.9 / pageInfo.ratio <= maxHeight) {
+                    mag.pageWidth = Math.floor(maxWidth * 0.85);
+                    mag.pageHeight = Math.floor(mag.pageWidth / pageInfo.ratio);
+                } else {
+                    mag.pageHeight = Math.floor(maxHeight * 0.95);
+                    mag.pageWidth = Math.floor(mag.pageHeight * pageInfo.ratio);
+                }
+            } else {
+                // Mode double page
+                const availableWidth = maxWidth * 0.95;
+                const singleWidth = availableWidth / 2;
+                
+                if (singleWidth / pageInfo.ratio <= maxHeight) {
+                    mag.pageWidth = Math.floor(singleWidth);
+                    mag.pageHeight = Math.floor(mag.pageWidth / pageInfo.ratio);
+                } else {
+                    mag.pageHeight = Math.floor(maxHeight * 0.95);
+                    mag.pageWidth = Math.floor(mag.pageHeight * pageInfo.ratio);
+                }
+            }
+        }
+        
+        // ========================================
+        // MAGAZINE - Préchargement fenêtré des images
+        // ========================================
+        // Seules les pages autour de la double page courante sont décodées en mémoire :
+        // CONFIG.PREFETCH vues dans le sens de lecture, une vue en arrière, CONFIG.CONCURRENCY
+        // téléchargements simultanés au plus. Les images sorties de la fenêtre sont libérées.
+        // Chaque page est pré-décodée en ImageBitmap à la taille du canvas, remis au Renderer.
+        const PageCache = {
+            ready: new Set(),
+            loading: new Map(),
+            queue: [],
+            wanted: new Set(),
+            lastPage: 1,
+            sizeKey: '',
+            
+            // Taille de décodage en pixels physiques
+            bitmapSize() {
+                const dpr = Renderer.dpr();
+                return { width: Math.round(mag.pageWidth * dpr), height: Math.round(mag.pageHeight * dpr) };
+            },
+            
+            async decode(img) {
+                const { width, height } = this.bitmapSize();
+                if ('createImageBitmap' in window && width > 0 && height > 0) {
+                    return createImageBitmap(img, { resizeWidth: width, resizeHeight: height, resizeQuality: 'high' });
+                }
+                if (img.decode) await img.decode().catch(() => {});
+                return img;
+            },
+            
+            pagesPerView() {
+                return mag.isLandscape ? 1 : 2;
+            },
+            
+            // Pages à garder, par ordre de priorité : vue courante, vue suivante dans le sens
+            // de lecture, vue précédente, puis le reste de la fenêtre (avant, puis arrière)
+            window(page, direction) {
+                const view = this.pagesPerView();
+                const ahead = (Offline.saveData() ? 1 : CONFIG.PREFETCH) * view;
+                const behind = view * 2;
+                const forward = k => direction > 0 ? page + view - 1 + k : page - k;
+                const backward = k => direction > 0 ? page - k : page + view - 1 + k;
+                
+                const order = [];
+                for (let k = 0; k < view; k++) order.push(page + k);
+                for (let k = 1; k <= view; k++) order.push(forward(k));
+                for (let k = 1; k <= view; k++) order.push(backward(k));
+                for (let k = view + 1; k <= ahead; k++) order.push(forward(k));
+                for (let k = view + 1; k <= behind; k++) order.push(backward(k));
+                return order.filter(num => num >= 1 && num <= CONFIG.TOTAL);
+            },
+            
+            // Recalcule la fenêtre ; la promesse se résout quand la vue courante est prête
+            update(page) {
+                const direction = page >= this.lastPage ? 1 : -1;
+                this.lastPage = page;
+                
+                // Taille de page changée (redimensionnement) : les bitmaps sont à refaire
+                const size = this.bitmapSize();
+                const sizeKey = `${size.width}x${size.height}`;
+                if (sizeKey !== this.sizeKey) {
+                    this.sizeKey = sizeKey;
+                    this.clear();
+                }
+                
+                const wanted = this.window(page, direction);
+                this.wanted = new Set(wanted);
+                
+                for (const num of this.ready) {
+                    if (!this.wanted.has(num)) this.release(num);
+                }
+                this.queue = wanted.filter(num => !this.ready.has(num) && !this.loading.has(num));
+                this.pump();
+                
+                const current = wanted.slice(0, this.pagesPerView());
+                return Promise.all(current.map(num => this.loading.get(num)));
+            },
+            
+            pump() {
+                while (this.loading.size < CONFIG.CONCURRENCY && this.queue.length) {
+                    const num = this.queue.shift();
+                    const priority = Math.abs(num - state.currentPage) < this.pagesPerView() ? 'high' : 'low';
+                    const sizeKey = this.sizeKey;
+                    const promise = loadImage(getPageSrc(num), priority)
+                        .then(img => this.decode(img))
+                        .then(image => {
+                            // Page sortie de la fenêtre (ou taille changée) pendant le chargement
+                            if (!this.wanted.has(num) || sizeKey !== this.sizeKey) {
+                                if (image.close) image.close();
+                                return;
+                            }
+                            Renderer.setPage(num, image);
+                            this.ready.add(num);
+                        })
+                        .catch(() => {})
+                        .finally(() => {
+                            this.loading.delete(num);
+                            this.pump();
+                        });
+                    this.loading.set(num, promise);
+                }
+            },
+            
+            // Attend la fin des chargements en cours (benchmark)
+            idle() {
+                return Promise.all([...this.loading.values()]);
+            },
+            
+            release(num) {
+                Renderer.evict(num);
+                this.ready.delete(num);
+            },
+            
+            clear() {
+                [...this.ready].forEach(num => this.release(num));
+                this.wanted.clear();
+                this.queue = [];
+            }
+        };
+        
+        // ========================================
+        // MAGAZINE - Rendering
+        // ========================================
+        // Pages d'un tour de page dans ce sens (null si impossible)
+        function turnPages(direction) {
+            const spread = getCurrentSpread();
+            
+            if (mag.isLandscape) {
+                if (direction === 'next' && state.currentPage < CONFIG.TOTAL) {
+                    return { turning: state.currentPage, next: state.currentPage + 1, under: null };
+                }
+                if (direction === 'prev' && state.currentPage > 1) {
+                    return { turning: state.currentPage, next: state.currentPage - 1, under: null };
+                }
+            } else {
+                if (direction === 'next' && spread.right && spread.right < CONFIG.TOTAL) {
+                    return { turning: spread.right, next: spread.right + 1, under: spread.right + 2 };
+                }
+                if (direction === 'prev' && spread.left > 1) {
+                    return { turning: spread.left, next: spread.left - 1, under: spread.left - 2 };
+                }
+            }
+            return null;
+        }
+        
+        function getCurrentSpread() {
+            if (mag.isLandscape) {
+                return { left: state.currentPage, right: null };
+            } else {
+                const leftPage = state.currentPage % 2 === 1 ? state.currentPage : state.currentPage - 1;
+                return {
+                    left: leftPage,
+                    right: leftPage + 1 <= CONFIG.TOTAL ? leftPage + 1 : null
+                };
+            }
+        }
+        
+        function placeholderStyle(num) {
+            const uri = num && CONFIG.PLACEHOLDERS[num];
+            return uri ? `background-image:url(${uri});` : '';
+        }
+        
+        function renderBook() {
+            const spread = getCurrentSpread();
+            const book = elements.book;
+            
+            if (mag.isLandscape) {
+                // Single page mode
+                book.innerHTML = `
+                    <div class="book-page single" style="width:${mag.pageWidth}px;height:${mag.pageHeight}px;${placeholderStyle(spread.left)}">
+                        <img src="${getPageSrc(spread.left)}" alt="Page ${spread.left}" data-page="${spread.left}" fetchpriority="high">
+                        <div class="page-corner bottom-right"></div>
+                        <div class="page-corner bottom-left"></div>
+                        <div class="drag-corner bottom-right" data-corner="br" data-direction="next"></div>
+                        <div class="drag-corner bottom-left" data-corner="bl" data-direction="prev"></div>
+                        <div class="drag-corner top-right" data-corner="tr" data-direction="next"></div>
+                        <div class="drag-corner top-left" data-corner="tl" data-direction="prev"></div>
+                        <div class="flip-zone right" data-direction="next"></div>
+                        <div class="flip-zone left" data-direction="prev"></div>
+                    </div>
+                `;
+            } else {
+                // Double page mode
+                book.innerHTML = `
+                    <div class="book-page left" style="width:${mag.pageWidth}px;height:${mag.pageHeight}px;${placeholderStyle(spread.left)}">
+                        ${spread.left ? `<img src="${getPageSrc(spread.left)}" alt="Page ${spread.left}" data-page="${spread.left}" fetchpriority="high">` : ''}
+                        <div class="page-corner bottom-left"></div>
+                        <div class="drag-corner bottom-left" data-corner="bl" data-direction="prev"></div>
+                        <div class="drag-corner top-left" data-corner="tl" data-direction="prev"></div>
+                        <div class="flip-zone left" data-direction="prev"></div>
+                    </div>
+                    <div class="book-page right" style="width:${mag.pageWidth}px;height:${mag.pageHeight}px;${placeholderStyle(spread.right)}">
+                        ${spread.right ? `<img src="${getPageSrc(spread.right)}" alt="Page ${spread.right}" data-page="${spread.right}" fetchpriority="high">` : ''}
+                        <div class="page-corner bottom-right"></div>
+                        <div class="drag-corner bottom-right" data-corner="br" data-direction="next"></div>
+                        <div class="drag-corner top-right" data-corner="tr" data-direction="next"></div>
+                        <div class="flip-zone right" data-direction="next"></div>
+                    </div>
+                `;
+            }
+            
+            // Setup canvas
+            const totalWidth = mag.isLandscape ? mag.pageWidth : mag.pageWidth * 2;
+            Renderer.resize(totalWidth, mag.pageHeight);
+            
+            // Bind interactions
+            bindDragEvents();
+            bindClickEvents();
+            
+            updateUI();
+        }
+        
+        // ========================================
+        // MAGAZINE - Page Turn Animation
+        // ========================================
+        function animatePageTurn(direction, fromDrag = false, startProgress = 0) {
+            if (mag.isAnimating && !fromDrag) return;
+            
+            const pages = turnPages(direction);
+            if (!pages) return;
+            
+            mag.isAnimating = true;
+            AudioManager.playPageTurn();
+            Telemetry.startTurn();
+            
+            let progress = startProgress;
+            const duration = fromDrag ? 400 * (1 - startProgress) : 600;
+            const startTime = performance.now();
+            
+            function animate(currentTime) {
+                const elapsed = currentTime - startTime;
+                
+                if (fromDrag) {
+                    progress = startProgress + (1 - startProgress) * Math.min(elapsed / duration, 1);
+                } else {
+                    progress = easeInOutCubic(Math.min(elapsed / duration, 1));
+                }
+                
+                drawPageTurn(direction, progress, pages);
+                Bench.frame(currentTime);
+                
+                if (progress < 1) {
+                    requestAnimationFrame(animate);
+                } else {
+                    finishPageTurn(direction);
+                }
+            }
+            
+            requestAnimationFrame(animate);
+        }
+        
+        function drawPageTurn(direction, progress, pages) {
+            Renderer.draw(direction, progress, pages);
+        }
+        
+        function finishPageTurn(direction) {
+            Renderer.clear();
+            Bench.endTurn();
+            Telemetry.endTurn();
+            
+            if (mag.isLandscape) {
+                state.currentPage += direction === 'next' ? 1 : -1;
+            } else {
+                state.currentPage += direction === 'next' ? 2 : -2;
+                // Ajuster pour rester sur une page impaire
+                if (state.currentPage < 1) state.currentPage = 1;
+                if (state.currentPage > CONFIG.TOTAL) state.currentPage = CONFIG.TOTAL;
+                if (state.currentPage % 2 === 0) state.currentPage--;
+            }
+            
+            mag.isAnimating = false;
+            renderBook();
+        }
+        
+        function easeInOutCubic(t) {
+            return t < 0.5 ? 4 * t * t * t : 1 - Math.pow(-2 * t + 2, 3) / 2;
+        }
+        
+        // ========================================
+        // MAGAZINE - Drag Interaction
+        // ========================================
+        function bindDragEvents() {
+            const dragCorners = elements.book.querySelectorAll('.drag-corner');
+            
+            dragCorners.forEach(corner => {
+                corner.addEventListener('mousedown', startDrag);
+                corner.addEventListener('touchstart', startDrag, { passive: false });
+            });
+        }
+        
+        function startDrag(e) {
+            if (mag.isAnimating) return;
+            e.preventDefault();
+            
+            const touch = e.touches ? e.touches[0] : e;
+            mag.isDragging = true;
+            mag.dragStartX = touch.clientX;
+            mag.dragStartY = touch.clientY;
+            mag.dragCorner = e.currentTarget.dataset.corner;
+            mag.dragDirection = e.currentTarget.dataset.direction;
+            mag.dragProgress = 0;
+            
+            document.addEventListener('mousemove', onDrag);
+            document.addEventListener('mouseup', endDrag);
+            document.addEventListener('touchmove', onDrag, { passive: false });
+            document.addEventListener('touchend', endDrag);
+        }
+        
+        function onDrag(e) {
+            if (!mag.isDragging) return;
+            e.preventDefault();
+            
+            const touch = e.touches ? e.touches[0] : e;
+            const deltaX = touch.clientX - mag.dragStartX;
+            const maxDrag = mag.pageWidth;
+            
+            let progress;
+            if (mag.dragDirection === 'next') {
+                progress = Math.max(0, Math.min(1, -deltaX / maxDrag));
+            } else {
+                progress = Math.max(0, Math.min(1, deltaX / maxDrag));
+            }
+            
+            mag.dragProgress = progress;
+            
+            // Dessiner l'aperçu du pli
+            drawDragPreview(mag.dragDirection, progress);
+        }
+        
+        function drawDragPreview(direction, progress) {
+            if (progress < 0.02) {
+                Renderer.clear();
+                return;
+            }
+            
+            const pages = turnPages(direction);
+            if (pages) drawPageTurn(direction, progress * 0.5, pages);
+        }
+        
+        function endDrag(e) {
+            if (!mag.isDragging) return;
+            
+            document.removeEventListener('mousemove', onDrag);
+            document.removeEventListener('mouseup', endDrag);
+            document.removeEventListener('touchmove', onDrag);
+            document.removeEventListener('touchend', endDrag);
+            
+            const progress = mag.dragProgress;
+            mag.isDragging = false;
+            
+            if (progress > 0.3) {
+                // Compléter l'animation
+                animatePageTurn(mag.dragDirection, true, progress * 0.5);
+            } else {
+                // Annuler - retourner à la position initiale
+                cancelDrag(mag.dragDirection, progress * 0.5);
+            }
+        }
+        
+        function cancelDrag(direction, startProgress) {
+            const duration = 300 * startProgress;
+            const startTime = performance.now();
+            
+            const pages = turnPages(direction);
+            
+            function animate(currentTime) {
+                const elapsed = currentTime - startTime;
+                const t = Math.min(elapsed / duration, 1);
+                const progress = startProgress * (1 - easeInOutCubic(t));
+                
+                if (progress > 0.01) {
+                    if (pages) drawPageTurn(direction, progress, pages);
+                    requestAnimationFrame(animate);
+                } else {
+                    Renderer.clear();
+                }
+            }
+            
+            requestAnimationFrame(animate);
+        }
+        
+        // ========================================
+        // MAGAZINE - Click Events
+        // ========================================
+        function bindClickEvents() {
+            const flipZones = elements.book.querySelectorAll('.flip-zone');
+            
+            flipZones.forEach(zone => {
+                zone.addEventListener('click', (e) => {
+                    if (mag.isDragging) return;
+                    const direction = zone.dataset.direction;
+                    animatePageTurn(direction);
+                });
+            });
+        }
+        
+        // ========================================
+        // MAGAZINE - Init
+        // ========================================
+        async function initMagazine() {
+            elements.book.innerHTML = '<div style="color:#888;padding:20px;">Chargement...</div>';
+            
+            const pageInfo = await detectPageFormat();
+            calculatePageSize(pageInfo);
+            
+            // Ajuster pour démarrer sur une page impaire en mode double
+            if (!mag.isLandscape && state.currentPage % 2 === 0) {
+                state.currentPage--;
+            }
+            
+            await PageCache.update(getCurrentSpread().left);
+            
+            renderBook();
+        }
+        
+        // ========================================
+        // BENCHMARK - Temps de frame du tour de page (?bench=<tours>)
+        // ========================================
+        const Bench = {
+            enabled: PARAMS.has('bench'),
+            budget: parseFloat(PARAMS.get('budget')) || 1000 / 60,
+            frames: [],
+            draws: [],
+            lastFrame: 0,
+            
+            frame(time) {
+                if (!this.enabled) return;
+                if (this.lastFrame) this.frames.push(time - this.lastFrame);
+                this.lastFrame = time;
+            },
+            
+            draw(duration) {
+                if (this.enabled) this.draws.push(duration);
+            },
+            
+            endTurn() {
+                this.lastFrame = 0;
+            },
+            
+            untilIdle() {
+                return new Promise(resolve => {
+                    const check = () => mag.isAnimating ? requestAnimationFrame(check) : resolve();
+                    requestAnimationFrame(check);
+                });
+            },
+            
+            // Tours de page automatiques en mode magazine, pages déjà décodées
+            async run() {
+                const turns = parseInt(PARAMS.get('bench'), 10) || 20;
+                state.soundEnabled = false;
+                await ready;
+                
+                let direction = 'next';
+                for (let i = 0; i < turns; i++) {
+                    if (!turnPages(direction)) direction = direction === 'next' ? 'prev' : 'next';
+                    if (!turnPages(direction)) break;
+                    await PageCache.idle();
+                    animatePageTurn(direction);
+                    await this.untilIdle();
+                }
+                
+                this.report(await Renderer.workerStats());
+            },
+            
+            summary(values) {
+                const sorted = values.slice().sort((a, b) => a - b);
+                const at = p => sorted.length ? +sorted[Math.min(sorted.length - 1, Math.floor(p * sorted.length))].toFixed(2) : null;
+                return { count: sorted.length, p50: at(0.5), p95: at(0.95), p99: at(0.99), max: at(1) };
+            },
+            
+            report(workerDraws) {
+                const result = {
+                    renderer: Renderer.worker ? 'offscreen' : 'canvas2d',
+                    dpr: Renderer.dpr(),
+                    budget_ms: +this.budget.toFixed(2),
+                    frames: this.summary(this.frames),
+                    // Intervalle > 1,5 budget : au moins une frame manquée
+                    dropped: this.frames.filter(t => t > this.budget * 1.5).length,
+                    draw: this.summary(this.draws.length ? this.draws : workerDraws)
+                };
+                
+                window.FLIPBOOK_BENCH = result;
+                console.table({ frames: result.frames, draw: result.draw });
+                
+                const panel = document.createElement('pre');
+                panel.className = 'bench-report';
+                panel.textContent = JSON.stringify(result, null, 2);
+                document.body.appendChild(panel);
+            }
+        };
+        
+        
+        // ========================================
+        // INTERFACE DU MODE
+        // ========================================
+        Renderer.init();
+        AudioManager.init();
+        
+        return {
+            enter() {
+                elements.swiperContainer.style.display = 'none';
+                elements.magazineContainer.classList.add('active');
+                ready = initMagazine();
+                return ready;
+            },
+            
+            leave() {
+                elements.magazineContainer.classList.remove('active');
+                PageCache.clear();
+                Renderer.clear();
+            },
+            
+            next() {
+                animatePageTurn('next');
+            },
+            
+            prev() {
+                animatePageTurn('prev');
+            },
+            
+            goTo(page) {
+                if (!mag.isLandscape && page % 2 === 0) page--;
+                state.currentPage = page;
+                renderBook();
+            },
+            
+            status() {
+                if (mag.isLandscape) {
+                    return {
+                        display: state.currentPage,
+                        atStart: state.currentPage <= 1,
+                        atEnd: state.currentPage >= CONFIG.TOTAL
+                    };
+                }
+                const spread = getCurrentSpread();
+                return {
+                    display: spread.right ? `${spread.left}-${spread.right}` : spread.left,
+                    atStart: spread.left <= 1,
+                    atEnd: !spread.right || spread.right >= CONFIG.TOTAL
+                };
+            },
+            
+            pageChanged() {
+                PageCache.update(getCurrentSpread().left);
+            },
+            
+            visibleImages() {
+                return Array.from(elements.book.querySelectorAll('img[data-page]'))
+                    .map(img => ({ page: Number(img.dataset.page), img }));
+            },
+            
+            zoom(z) {
+                elements.bookWrapper.style.transform = `scale(${z})`;
+            },
+            
+            async resize() {
+                const pageInfo = await detectPageFormat();
+                calculatePageSize(pageInfo);
+                renderBook();
+            },
+            
+            busy() {
+                return mag.isAnimating;
+            },
+            
+            bench() {
+                return Bench.run();
+            }
+        };
+    };
+})(window.FlipbookModes = window.FlipbookModes || {});
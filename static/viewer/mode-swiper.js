@@ -0,0 +1,194 @@
+/**
+ * FlipBook - Modes Swiper (standard, coverflow, cartes, cube, flip, fondu), chargés à la demande
+ * Slides virtuelles rendues depuis le manifeste
+ */
+(function(modes) {
+    'use strict';
+    
+    modes.swiper = function(viewer) {
+        const { CONFIG, state, elements, $, getPageSrc, updateUI, goToPage, Telemetry } = viewer;
+        
+        let swiper = null;
+        
+        // ========================================
+        // SLIDES - Rendu à la demande depuis le manifeste
+        // ========================================
+        function escapeHtml(value) {
+            return String(value ?? '').replace(/[&<>"']/g, c => ({
+                '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+            })[c]);
+        }
+        
+        function hotspotsHTML(num) {
+            // Hotspots déjà regroupés par page dans le manifeste
+            return (CONFIG.HOTSPOTS[num] || []).map(h => {
+                const style = `left:${h.x || 0}%;top:${h.y || 0}%;width:${h.width || 10}%;height:${h.height || 10}%`;
+                const title = escapeHtml(h.label);
+                if (h.type === 'url') {
+                    return `<a href="${escapeHtml(h.target || '#')}" target="_blank" rel="noopener" class="hotspot" style="${style}" title="${title}"></a>`;
+                }
+                if (h.type === 'page') {
+                    return `<div class="hotspot hotspot-page" data-target-page="${escapeHtml(h.target || 1)}" style="${style}" title="${title}"></div>`;
+                }
+                return '';
+            }).join('');
+        }
+        
+        function slideHTML(num) {
+            const size = CONFIG.PAGES[num - 1];
+            const placeholder = CONFIG.PLACEHOLDERS[num];
+            let box = 'class="page"';
+            let dims = '';
+            
+            // Dimensions connues : la place est réservée avant le téléchargement
+            if (size) {
+                const style = [`--ratio:${(size[0] / size[1]).toFixed(4)}`];
+                if (placeholder) style.push(`background-image:url(${placeholder})`);
+                box = `class="page sized" style="${style.join(';')}"`;
+                dims = `width="${size[0]}" height="${size[1]}"`;
+            }
+            
+            // Seule une fenêtre de slides existe dans le DOM : chargement immédiat, page courante en tête
+            const priority = num === state.currentPage ? 'fetchpriority="high"' : 'fetchpriority="low"';
+            return `<div class="swiper-slide" data-page="${num}">
+                <div ${box}>
+                    <img src="${getPageSrc(num)}" alt="Page ${num}" ${dims} ${priority}>
+                    ${hotspotsHTML(num)}
+                </div>
+            </div>`;
+        }
+        
+        // Slides virtuelles : Swiper ne garde que les pages autour de la page courante
+        const VIRTUAL_SLIDES = Array.from({ length: CONFIG.TOTAL }, (_, i) => i + 1);
+        const VIRTUAL_WINDOW = { default: 1, coverflow: 3, cards: 2, cube: 1, flip: 1, fade: 1 };
+        
+        // ========================================
+        // SWIPER
+        // ========================================
+        const swiperConfigs = {
+            default: {
+                slidesPerView: 1,
+                spaceBetween: 30,
+                keyboard: { enabled: true },
+                mousewheel: { forceToAxis: true }
+            },
+            coverflow: {
+                effect: 'coverflow',
+                grabCursor: true,
+                centeredSlides: true,
+                slidesPerView: 'auto',
+                coverflowEffect: { rotate: 50, stretch: 0, depth: 100, modifier: 1, slideShadows: true },
+                keyboard: { enabled: true }
+            },
+            cards: {
+                effect: 'cards',
+                grabCursor: true,
+                keyboard: { enabled: true }
+            },
+            cube: {
+                effect: 'cube',
+                grabCursor: true,
+                cubeEffect: { shadow: true, slideShadows: true, shadowOffset: 20, shadowScale: 0.94 },
+                keyboard: { enabled: true }
+            },
+            flip: {
+                effect: 'flip',
+                grabCursor: true,
+                keyboard: { enabled: true }
+            },
+            fade: {
+                effect: 'fade',
+                fadeEffect: { crossFade: true },
+                keyboard: { enabled: true }
+            }
+        };
+        
+        function initSwiper(mode) {
+            const idx = swiper ? swiper.activeIndex : (state.currentPage - 1);
+            if (swiper) swiper.destroy(true, true);
+            
+            $('viewer').className = 'swiper mode-' + mode;
+            
+            swiper = new Swiper('#viewer', {
+                ...swiperConfigs[mode],
+                initialSlide: idx,
+                virtual: {
+                    slides: VIRTUAL_SLIDES,
+                    renderSlide: num => slideHTML(num),
+                    addSlidesBefore: VIRTUAL_WINDOW[mode],
+                    addSlidesAfter: VIRTUAL_WINDOW[mode],
+                    cache: false
+                },
+                on: { 
+                    slideChange: () => { 
+                        state.currentPage = swiper.activeIndex + 1; 
+                        updateUI(); 
+                    },
+                    // Débit d'images pendant la transition
+                    slideChangeTransitionStart: () => Telemetry.startTurn(),
+                    slideChangeTransitionEnd: () => Telemetry.endTurn()
+                }
+            });
+        }
+        
+        
+        // Hotspots (délégation : les slides sont rendues dynamiquement)
+        elements.swiperContainer.addEventListener('click', e => {
+            const hotspot = e.target.closest('.hotspot-page');
+            if (hotspot) goToPage(parseInt(hotspot.dataset.targetPage));
+        });
+        
+        // ========================================
+        // INTERFACE DU MODE
+        // ========================================
+        return {
+            enter(mode) {
+                elements.swiperContainer.style.display = '';
+                initSwiper(mode);
+            },
+            
+            leave() {
+                if (swiper) {
+                    swiper.destroy(true, true);
+                    swiper = null;
+                }
+                elements.swiperContainer.style.display = 'none';
+            },
+            
+            next() {
+                swiper.slideNext();
+            },
+            
+            prev() {
+                swiper.slidePrev();
+            },
+            
+            goTo(page) {
+                swiper.slideTo(page - 1);
+            },
+            
+            status() {
+                return {
+                    display: swiper.activeIndex + 1,
+                    atStart: swiper.activeIndex === 0,
+                    atEnd: swiper.activeIndex >= CONFIG.TOTAL - 1
+                };
+            },
+            
+            visibleImages() {
+                const slide = elements.swiperContainer.querySelector('.swiper-slide-active');
+                const img = slide && slide.querySelector('img');
+                return img ? [{ page: Number(slide.dataset.page), img }] : [];
+            },
+            
+            zoom(z) {
+                // Variable CSS : s'applique aussi aux slides rendues plus tard
+                $('viewer').style.setProperty('--zoom', z);
+            },
+            
+            busy() {
+                return false;
+            }
+        };
+    };
+})(window.FlipbookModes = window.FlipbookModes || {});
@@ -0,0 +1,67 @@
+/**
+ * FlipBook - Worker de rendu du pli de page (OffscreenCanvas)
+ * Reçoit le canvas transféré, les pages décodées (ImageBitmap) et une commande par frame
+ */
+'use strict';
+
+importScripts('pageturn.js');
+
+let canvas = null;
+let ctx = null;
+let size = { width: 0, height: 0 };
+const pages = new Map();
+const drawTimes = [];
+
+function release(num) {
+    const bitmap = pages.get(num);
+    if (bitmap && bitmap.close) bitmap.close();
+    pages.delete(num);
+}
+
+self.onmessage = e => {
+    const message = e.data;
+    
+    switch (message.type) {
+        case 'init':
+            canvas = message.canvas;
+            ctx = canvas.getContext('2d');
+            break;
+        
+        case 'resize':
+            size = { width: message.width, height: message.height };
+            canvas.width = Math.round(message.width * message.dpr);
+            canvas.height = Math.round(message.height * message.dpr);
+            ctx.setTransform(message.dpr, 0, 0, message.dpr, 0, 0);
+            break;
+        
+        case 'page':
+            release(message.num);
+            pages.set(message.num, message.bitmap);
+            break;
+        
+        case 'evict':
+            message.nums.forEach(release);
+            break;
+        
+        case 'draw': {
+            const start = performance.now();
+            const frame = message.frame;
+            FlipbookPageTurn.draw(ctx, {
+                ...frame,
+                turningImage: pages.get(frame.turning) || null,
+                nextImage: pages.get(frame.next) || null,
+                underImage: pages.get(frame.under) || null
+            });
+            drawTimes.push(performance.now() - start);
+            break;
+        }
+        
+        case 'clear':
+            ctx.clearRect(0, 0, size.width, size.height);
+            break;
+        
+        case 'stats':
+            self.postMessage({ type: 'stats', drawTimes: drawTimes.splice(0) });
+            break;
+    }
+};
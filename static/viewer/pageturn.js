@@ -0,0 +1,247 @@
+/**
+ * FlipBook - Rendu du pli de page (mode magazine)
+ * Partagé entre le thread principal et le worker OffscreenCanvas (pageturn-worker.js)
+ */
+(function(scope) {
+    'use strict';
+    
+    // frame : { w, h, isDouble, direction, progress, turningImage, nextImage, underImage }
+    // Les dimensions sont en pixels CSS : le contexte porte déjà l'échelle devicePixelRatio
+    function draw(ctx, frame) {
+        const { w, h, isDouble, direction, progress, turningImage, nextImage, underImage } = frame;
+        
+        ctx.clearRect(0, 0, isDouble ? w * 2 : w, h);
+        
+        if (isDouble) {
+            // Double page mode
+            if (direction === 'next') {
+                // Page de droite qui tourne vers la gauche
+                const foldX = w + w * (1 - progress);
+                
+                // Page du dessous (nouvelle page droite)
+                if (underImage) {
+                    ctx.save();
+                    ctx.beginPath();
+                    ctx.rect(w, 0, w, h);
+                    ctx.clip();
+                    ctx.drawImage(underImage, w, 0, w, h);
+                    
+                    // Ombre sur la page du dessous
+                    const shadowIntensity = Math.sin(progress * Math.PI) * 0.4;
+                    ctx.fillStyle = `rgba(0,0,0,${shadowIntensity})`;
+                    ctx.fillRect(w, 0, w * (1 - progress) + 20, h);
+                    ctx.restore();
+                }
+                
+                // Page qui tourne - face avant
+                if (progress < 0.5 && turningImage) {
+                    ctx.save();
+                    ctx.beginPath();
+                    ctx.moveTo(foldX, 0);
+                    ctx.lineTo(w * 2, 0);
+                    ctx.lineTo(w * 2, h);
+                    ctx.lineTo(foldX, h);
+                    ctx.closePath();
+                    ctx.clip();
+                    
+                    ctx.translate(foldX, 0);
+                    ctx.scale((1 - progress * 2) || 0.01, 1);
+                    ctx.translate(-foldX, 0);
+                    ctx.drawImage(turningImage, w, 0, w, h);
+                    
+                    // Ombre sur la page qui tourne
+                    const gradient = ctx.createLinearGradient(foldX - 50, 0, foldX, 0);
+                    gradient.addColorStop(0, 'rgba(0,0,0,0)');
+                    gradient.addColorStop(1, `rgba(0,0,0,${0.3 * (1 - progress * 2)})`);
+                    ctx.fillStyle = gradient;
+                    ctx.fillRect(w, 0, w, h);
+                    
+                    ctx.restore();
+                }
+                
+                // Page qui tourne - face arrière
+                if (progress >= 0.5 && nextImage) {
+                    ctx.save();
+                    const backFoldX = w - (w * (progress - 0.5) * 2);
+                    
+                    ctx.beginPath();
+                    ctx.moveTo(0, 0);
+                    ctx.lineTo(backFoldX, 0);
+                    ctx.lineTo(backFoldX, h);
+                    ctx.lineTo(0, h);
+                    ctx.closePath();
+                    ctx.clip();
+                    
+                    ctx.translate(backFoldX, 0);
+                    ctx.scale(-((progress - 0.5) * 2) || 0.01, 1);
+                    ctx.translate(-backFoldX, 0);
+                    ctx.drawImage(nextImage, 0, 0, w, h);
+                    
+                    // Ombre
+                    const gradient = ctx.createLinearGradient(backFoldX, 0, backFoldX + 50, 0);
+                    gradient.addColorStop(0, `rgba(0,0,0,${0.3 * ((progress - 0.5) * 2)})`);
+                    gradient.addColorStop(1, 'rgba(0,0,0,0)');
+                    ctx.fillStyle = gradient;
+                    ctx.fillRect(0, 0, w, h);
+                    
+                    ctx.restore();
+                }
+                
+                // Pli central (ombre de reliure)
+                ctx.save();
+                const spineGradient = ctx.createLinearGradient(w - 20, 0, w + 20, 0);
+                spineGradient.addColorStop(0, 'rgba(0,0,0,0)');
+                spineGradient.addColorStop(0.5, 'rgba(0,0,0,0.2)');
+                spineGradient.addColorStop(1, 'rgba(0,0,0,0)');
+                ctx.fillStyle = spineGradient;
+                ctx.fillRect(w - 20, 0, 40, h);
+                ctx.restore();
+            
+            } else {
+                // Page de gauche qui tourne vers la droite (direction === 'prev')
+                const foldX = w * progress;
+                
+                // Page du dessous (nouvelle page gauche)
+                if (underImage) {
+                    ctx.save();
+                    ctx.beginPath();
+                    ctx.rect(0, 0, w, h);
+                    ctx.clip();
+                    ctx.drawImage(underImage, 0, 0, w, h);
+                    
+                    const shadowIntensity = Math.sin(progress * Math.PI) * 0.4;
+                    ctx.fillStyle = `rgba(0,0,0,${shadowIntensity})`;
+                    ctx.fillRect(w * progress - 20, 0, w * (1 - progress) + 20, h);
+                    ctx.restore();
+                }
+                
+                // Page qui tourne - face avant
+                if (progress < 0.5 && turningImage) {
+                    ctx.save();
+                    ctx.beginPath();
+                    ctx.moveTo(0, 0);
+                    ctx.lineTo(foldX, 0);
+                    ctx.lineTo(foldX, h);
+                    ctx.lineTo(0, h);
+                    ctx.closePath();
+                    ctx.clip();
+                    
+                    ctx.translate(foldX, 0);
+                    ctx.scale((1 - progress * 2) || 0.01, 1);
+                    ctx.translate(-foldX, 0);
+                    ctx.drawImage(turningImage, 0, 0, w, h);
+                    
+                    const gradient = ctx.createLinearGradient(foldX, 0, foldX + 50, 0);
+                    gradient.addColorStop(0, `rgba(0,0,0,${0.3 * (1 - progress * 2)})`);
+                    gradient.addColorStop(1, 'rgba(0,0,0,0)');
+                    ctx.fillStyle = gradient;
+                    ctx.fillRect(0, 0, w, h);
+                    
+                    ctx.restore();
+                }
+                
+                // Face arrière
+                if (progress >= 0.5 && nextImage) {
+                    ctx.save();
+                    const backFoldX = w + (w * (progress - 0.5) * 2);
+                    
+                    ctx.beginPath();
+                    ctx.moveTo(w, 0);
+                    ctx.lineTo(backFoldX, 0);
+                    ctx.lineTo(backFoldX, h);
+                    ctx.lineTo(w, h);
+                    ctx.closePath();
+                    ctx.clip();
+                    
+                    ctx.translate(backFoldX, 0);
+                    ctx.scale(-((progress - 0.5) * 2) || 0.01, 1);
+                    ctx.translate(-backFoldX, 0);
+                    ctx.drawImage(nextImage, w, 0, w, h);
+                    
+                    const gradient = ctx.createLinearGradient(backFoldX - 50, 0, backFoldX, 0);
+                    gradient.addColorStop(0, 'rgba(0,0,0,0)');
+                    gradient.addColorStop(1, `rgba(0,0,0,${0.3 * ((progress - 0.5) * 2)})`);
+                    ctx.fillStyle = gradient;
+                    ctx.fillRect(w, 0, w, h);
+                    
+                    ctx.restore();
+                }
+                
+                // Pli central
+                ctx.save();
+                const spineGradient = ctx.createLinearGradient(w - 20, 0, w + 20, 0);
+                spineGradient.addColorStop(0, 'rgba(0,0,0,0)');
+                spineGradient.addColorStop(0.5, 'rgba(0,0,0,0.2)');
+                spineGradient.addColorStop(1, 'rgba(0,0,0,0)');
+                ctx.fillStyle = spineGradient;
+                ctx.fillRect(w - 20, 0, 40, h);
+                ctx.restore();
+            }
+        } else {
+            // Single page mode (landscape)
+            if (direction === 'next') {
+                const foldX = w * (1 - progress);
+                
+                // Page du dessous
+                if (nextImage) {
+                    ctx.drawImage(nextImage, 0, 0, w, h);
+                    const shadowIntensity = Math.sin(progress * Math.PI) * 0.5;
+                    ctx.fillStyle = `rgba(0,0,0,${shadowIntensity})`;
+                    ctx.fillRect(0, 0, foldX + 20, h);
+                }
+                
+                // Page qui tourne
+                if (progress < 0.5 && turningImage) {
+                    ctx.save();
+                    ctx.beginPath();
+                    ctx.moveTo(foldX, 0);
+                    ctx.lineTo(w, 0);
+                    ctx.lineTo(w, h);
+                    ctx.lineTo(foldX, h);
+                    ctx.closePath();
+                    ctx.clip();
+                    
+                    const scaleX = Math.max(0.01, 1 - progress * 2);
+                    ctx.translate(foldX, 0);
+                    ctx.scale(scaleX, 1);
+                    ctx.translate(-foldX, 0);
+                    ctx.drawImage(turningImage, 0, 0, w, h);
+                    
+                    ctx.restore();
+                }
+            } else {
+                const foldX = w * progress;
+                
+                // Page du dessous
+                if (nextImage) {
+                    ctx.drawImage(nextImage, 0, 0, w, h);
+                    const shadowIntensity = Math.sin(progress * Math.PI) * 0.5;
+                    ctx.fillStyle = `rgba(0,0,0,${shadowIntensity})`;
+                    ctx.fillRect(foldX - 20, 0, w - foldX + 20, h);
+                }
+                
+                // Page qui tourne
+                if (progress < 0.5 && turningImage) {
+                    ctx.save();
+                    ctx.beginPath();
+                    ctx.moveTo(0, 0);
+                    ctx.lineTo(foldX, 0);
+                    ctx.lineTo(foldX, h);
+                    ctx.lineTo(0, h);
+                    ctx.closePath();
+                    ctx.clip();
+                    
+                    const scaleX = Math.max(0.01, 1 - progress * 2);
+                    ctx.translate(foldX, 0);
+                    ctx.scale(scaleX, 1);
+                    ctx.translate(-foldX, 0);
+                    ctx.drawImage(turningImage, 0, 0, w, h);
+                    
+                    ctx.restore();
+                }
+            }
+        }
+    }
+    
+    scope.FlipbookPageTurn = { draw };
+})(self);
@@ -0,0 +1,519 @@
+/**
+ * FlipBook - Viewer (runtime partagé)
+ * Le shell de chaque flipbook indique son manifeste via <body data-manifest="...">.
+ * Ce fichier ne contient que le cœur : les modes (Swiper, magazine) sont chargés à la demande.
+ */
+(function() {
+    'use strict';
+    
+    const PARAMS = new URLSearchParams(location.search);
+    
+    fetch(document.body.dataset.manifest, { credentials: 'same-origin' })
+        .then(r => r.json())
+        .then(start)
+        .catch(() => {
+            document.querySelector('.viewer').innerHTML =
+                '<div style="color:#888;padding:20px;">Impossible de charger le flipbook.</div>';
+        });
+    
+    function start(CONFIG) {
+        
+        // ========================================
+        // STATE
+        // ========================================
+        const state = {
+            currentMode: null,
+            currentPage: 1,
+            zoom: 1,
+            
+            // Sound
+            soundEnabled: true
+        };
+        
+        // ========================================
+        // DOM ELEMENTS
+        // ========================================
+        const $ = id => document.getElementById(id);
+        const $$ = sel => document.querySelectorAll(sel);
+        
+        const elements = {
+            swiperContainer: $('swiperContainer'),
+            magazineContainer: $('magazineContainer'),
+            bookWrapper: $('bookWrapper'),
+            book: $('book'),
+            canvas: $('pageFlipCanvas'),
+            currentDisplay: $('current'),
+            soundToggle: $('soundToggle')
+        };
+        
+        // ========================================
+        // OFFLINE - Service worker & préchargement
+        // ========================================
+        const Offline = {
+            lastPage: 1,
+            requested: new Set(),
+            button: $('offlineBtn'),
+            
+            init() {
+                if (!('serviceWorker' in navigator)) return;
+                
+                navigator.serviceWorker.register(CONFIG.SW_URL, { scope: CONFIG.SW_SCOPE })
+                    .then(() => { this.button.hidden = false; })
+                    .catch(() => {});
+                
+                navigator.serviceWorker.addEventListener('message', e => {
+                    if (!e.data || e.data.type !== 'cache-progress') return;
+                    const { done, total } = e.data;
+                    this.button.title = `Hors ligne : ${done} / ${total}`;
+                    if (done >= total) {
+                        this.button.classList.remove('saving');
+                        this.button.classList.add('ready');
+                        this.button.title = 'Disponible hors ligne';
+                    }
+                });
+                
+                this.button.onclick = () => this.saveAll();
+            },
+            
+            saveData() {
+                return !!(navigator.connection && navigator.connection.saveData);
+            },
+            
+            // Précharge les K pages suivantes dans le sens de lecture (+1 en arrière)
+            prefetchAround(page) {
+                const direction = page >= this.lastPage ? 1 : -1;
+                this.lastPage = page;
+                if (this.saveData()) return;
+                
+                const targets = [];
+                for (let k = 1; k <= CONFIG.PREFETCH; k++) targets.push(page + direction * k);
+                targets.push(page - direction);
+                
+                const urls = targets
+                    .map(getPageSrc)
+                    .filter(src => src && !this.requested.has(src));
+                if (!urls.length) return;
+                urls.forEach(src => this.requested.add(src));
+                
+                const controller = navigator.serviceWorker && navigator.serviceWorker.controller;
+                if (controller) {
+                    controller.postMessage({ type: 'prefetch', urls });
+                } else {
+                    // Pas encore de service worker : on remplit le cache HTTP
+                    urls.forEach(src => fetch(src, { priority: 'low' }).catch(() => {}));
+                }
+            },
+            
+            saveAll() {
+                this.button.classList.add('saving');
+                navigator.serviceWorker.ready.then(reg => {
+                    reg.active.postMessage({ type: 'cache-all' });
+                });
+            }
+        };
+        
+        // ========================================
+        // PAGES
+        // ========================================
+        function getPageSrc(num) {
+            if (num < 1 || num > CONFIG.TOTAL) return null;
+            return `${CONFIG.BASE_URL}/pages/page_${num}.jpg`;
+        }
+        
+        async function loadImage(src, priority = 'auto') {
+            return new Promise((resolve, reject) => {
+                const img = new Image();
+                img.fetchPriority = priority;
+                img.onload = () => resolve(img);
+                img.onerror = reject;
+                img.src = src;
+            });
+        }
+        
+        // ========================================
+        // ZOOM HAUTE DÉFINITION - Rendu serveur de la page visible
+        // ========================================
+        const HiRes = {
+            timer: null,
+            
+            // Plus petite résolution suffisante pour l'affichage, ou null si l'image standard suffit
+            bucketFor(page, img) {
+                const baseDpi = CONFIG.HIRES.DPI[page - 1];
+                if (!img.dataset.baseWidth) img.dataset.baseWidth = img.naturalWidth;
+                const baseWidth = Number(img.dataset.baseWidth);
+                if (!baseDpi || !baseWidth) return null;
+                
+                const dpr = Math.min(window.devicePixelRatio || 1, CONFIG.MAX_DPR);
+                const neededDpi = baseDpi * img.clientWidth * state.zoom * dpr / baseWidth;
+                if (neededDpi <= baseDpi * 1.1) return null;
+                
+                const buckets = CONFIG.HIRES.BUCKETS;
+                const bucket = buckets.find(b => b >= neededDpi) || buckets[buckets.length - 1];
+                return bucket > baseDpi ? bucket : null;
+            },
+            
+            update() {
+                if (!CONFIG.HIRES || !active || !active.visibleImages) return;
+                clearTimeout(this.timer);
+                // Attend la fin d'une rafale de zooms ou de pages
+                this.timer = setTimeout(() => {
+                    if (state.zoom < CONFIG.HIRES.THRESHOLD) return;
+                    active.visibleImages().forEach(({ page, img }) => this.swap(page, img));
+                }, 200);
+            },
+            
+            async swap(page, img) {
+                if (!img.complete || !img.naturalWidth) return;
+                const bucket = this.bucketFor(page, img);
+                if (!bucket || Number(img.dataset.hires || 0) >= bucket) return;
+                
+                img.dataset.hires = bucket;
+                const src = `${CONFIG.HIRES.URL}/${bucket}/page_${page}.jpg`;
+                try {
+                    // Décodée hors écran : le remplacement ne provoque ni flash ni saccade
+                    const hires = new Image();
+                    hires.src = src;
+                    await hires.decode();
+                    if (img.isConnected) img.src = src;
+                } catch (e) {
+                    delete img.dataset.hires;
+                }
+            }
+        };
+        
+        // ========================================
+        // TÉLÉMÉTRIE - Mesures réelles des lecteurs, envoyées par lots
+        // ========================================
+        const Telemetry = {
+            // Une session sur SAMPLE est mesurée (jamais pendant un benchmark)
+            enabled: !!CONFIG.TELEMETRY && !PARAMS.has('bench') && Math.random() < CONFIG.TELEMETRY.SAMPLE,
+            session: Math.random().toString(36).slice(2, 10),
+            events: [],
+            firstPage: false,
+            lcp: undefined,
+            turn: null,
+            dwell: { page: null, since: 0 },
+            
+            init() {
+                if (!this.enabled) return;
+                
+                const pagesUrl = `${CONFIG.BASE_URL}/pages/`;
+                const zoomUrl = CONFIG.HIRES ? CONFIG.HIRES.URL + '/' : null;
+                this.observe('resource', entry => {
+                    const path = new URL(entry.name, location.href).pathname;
+                    const isPage = path.includes(pagesUrl);
+                    if (!isPage && !(zoomUrl && path.includes(zoomUrl))) return;
+                    // Latence de chargement d'image ; la première page reçue donne le temps d'accès au contenu
+                    this.push('i', entry.duration, this.pageOf(path));
+                    if (isPage && !this.firstPage) {
+                        this.firstPage = true;
+                        this.push('t', entry.responseEnd, this.pageOf(path));
+                    }
+                });
+                this.observe('largest-contentful-paint', entry => this.lcp = entry.startTime);
+                
+                setInterval(() => this.flush(), CONFIG.TELEMETRY.INTERVAL * 1000);
+                document.addEventListener('visibilitychange', () => {
+                    if (document.visibilityState === 'hidden') {
+                        this.leavePage();
+                        this.flush();
+                    } else {
+                        this.enterPage(state.currentPage);
+                    }
+                });
+                window.addEventListener('pagehide', () => {
+                    this.leavePage();
+                    this.flush();
+                });
+            },
+            
+            observe(type, callback) {
+                try {
+                    new PerformanceObserver(list => list.getEntries().forEach(callback))
+                        .observe({ type, buffered: true });
+                } catch (e) {}  // Type non pris en charge par le navigateur
+            },
+            
+            pageOf(path) {
+                const match = /page_(\d+)\./.exec(path);
+                return match ? Number(match[1]) : 0;
+            },
+            
+            // Mesure compacte : [code, valeur, page, mode]
+            push(code, value, page) {
+                if (!this.enabled || !(value >= 0)) return;
+                this.events.push([code, Math.round(value * 10) / 10, page || 0, state.currentMode || '']);
+                if (this.events.length >= CONFIG.TELEMETRY.BATCH) this.flush();
+            },
+            
+            // Temps passé sur chaque page (onglet visible uniquement)
+            pageChanged(page) {
+                if (page === this.dwell.page) return;
+                this.leavePage();
+                this.enterPage(page);
+            },
+            
+            enterPage(page) {
+                this.dwell = { page, since: performance.now() };
+            },
+            
+            leavePage() {
+                const { page, since } = this.dwell;
+                if (page !== null) this.push('d', performance.now() - since, page);
+                this.dwell = { page: null, since: 0 };
+            },
+            
+            // Images par seconde réellement affichées pendant un tour de page
+            startTurn() {
+                if (!this.enabled || this.turn) return;
+                const turn = this.turn = { frames: 0, start: performance.now() };
+                const count = () => {
+                    if (this.turn !== turn) return;
+                    turn.frames++;
+                    requestAnimationFrame(count);
+                };
+                requestAnimationFrame(count);
+            },
+            
+            endTurn() {
+                const turn = this.turn;
+                if (!turn) return;
+                this.turn = null;
+                const elapsed = performance.now() - turn.start;
+                // Tours trop courts : pas assez d'images pour un débit significatif
+                if (elapsed >= 100) this.push('f', turn.frames * 1000 / elapsed, state.currentPage);
+            },
+            
+            flush() {
+                if (this.lcp !== undefined) {
+                    this.push('l', this.lcp, 0);
+                    this.lcp = undefined;
+                }
+                if (!this.events.length) return;
+                const body = JSON.stringify({ s: this.session, e: this.events.splice(0) });
+                // Texte brut : pas de requête préalable, envoi garanti même à la fermeture de la page
+                if (!(navigator.sendBeacon && navigator.sendBeacon(CONFIG.TELEMETRY.URL, body))) {
+                    fetch(CONFIG.TELEMETRY.URL, { method: 'POST', body, keepalive: true }).catch(() => {});
+                }
+            }
+        };
+        
+        // ========================================
+        // MODULES DE MODE - Chargement à la demande
+        // ========================================
+        const modeNames = {
+            default: 'Standard',
+            magazine: 'Magazine',
+            coverflow: 'Coverflow',
+            cards: 'Cartes',
+            cube: 'Cube',
+            flip: 'Flip',
+            fade: 'Fondu'
+        };
+        
+        // Module qui implémente chaque mode
+        const modeModules = {
+            magazine: 'magazine',
+            default: 'swiper',
+            coverflow: 'swiper',
+            cards: 'swiper',
+            cube: 'swiper',
+            flip: 'swiper',
+            fade: 'swiper'
+        };
+        
+        function loadAsset(url) {
+            return new Promise((resolve, reject) => {
+                let el;
+                if (/\.css(\?|$)/.test(url)) {
+                    el = document.createElement('link');
+                    el.rel = 'stylesheet';
+                    el.href = url;
+                } else {
+                    el = document.createElement('script');
+                    // Téléchargements en parallèle, exécution dans l'ordre du manifeste
+                    el.async = false;
+                    el.src = url;
+                }
+                // Dépendance tierce : intégrité vérifiée (SRI, requête CORS nécessaire pour une autre origine)
+                const integrity = CONFIG.INTEGRITY && CONFIG.INTEGRITY[url];
+                if (integrity) {
+                    el.integrity = integrity;
+                    el.crossOrigin = 'anonymous';
+                }
+                el.onload = resolve;
+                el.onerror = () => reject(new Error(url));
+                document.head.appendChild(el);
+            });
+        }
+        
+        const Modes = {
+            loaded: {},
+            
+            load(name) {
+                if (!this.loaded[name]) {
+                    const assets = CONFIG.MODULES[name] || [];
+                    this.loaded[name] = Promise.all(assets.map(loadAsset))
+                        .then(() => window.FlipbookModes[name](viewer))
+                        .catch(e => {
+                            delete this.loaded[name];
+                            throw e;
+                        });
+                }
+                return this.loaded[name];
+            }
+        };
+        
+        // API partagée avec les modules
+        const viewer = { CONFIG, PARAMS, state, elements, $, $$, getPageSrc, loadImage, updateUI, goToPage, Offline, Telemetry };
+        
+        let active = null;
+        let switching = 0;
+        
+        async function changeMode(mode) {
+            if (state.currentMode === mode) return active;
+            
+            const previous = state.currentMode;
+            state.currentMode = mode;
+            
+            // Mettre à jour l'UI
+            $('currentMode').textContent = modeNames[mode];
+            $$('.mode-option').forEach(opt => {
+                opt.classList.toggle('active', opt.dataset.mode === mode);
+            });
+            $('modeDropdown').classList.remove('open');
+            
+            const id = ++switching;
+            let module;
+            try {
+                module = await Modes.load(modeModules[mode]);
+            } catch (e) {
+                if (id === switching) state.currentMode = previous;
+                return active;
+            }
+            // Un autre mode a été choisi pendant le chargement
+            if (id !== switching) return active;
+            
+            if (active) active.leave();
+            active = module;
+            await module.enter(mode);
+            module.zoom(state.zoom);
+            
+            updateUI();
+            return module;
+        }
+        
+        // ========================================
+        // UI & NAVIGATION
+        // ========================================
+        function updateUI() {
+            if (!active) return;
+            
+            const { display, atStart, atEnd } = active.status();
+            
+            elements.currentDisplay.textContent = display;
+            if (active.pageChanged) active.pageChanged();
+            Offline.prefetchAround(state.currentPage);
+            HiRes.update();
+            Telemetry.pageChanged(state.currentPage);
+            $('firstBtn').disabled = $('prevBtn').disabled = atStart;
+            $('nextBtn').disabled = $('lastBtn').disabled = atEnd;
+        }
+        
+        function goToPage(page) {
+            if (!active) return;
+            
+            page = Math.max(1, Math.min(CONFIG.TOTAL, page));
+            active.goTo(page);
+            
+            updateUI();
+        }
+        
+        function nextPage() {
+            if (active) active.next();
+        }
+        
+        function prevPage() {
+            if (active) active.prev();
+        }
+        
+        function setZoom(z) {
+            state.zoom = Math.max(0.5, Math.min(2, z));
+            if (active) active.zoom(state.zoom);
+            HiRes.update();
+        }
+        
+        // ========================================
+        // EVENT LISTENERS
+        // ========================================
+        $('firstBtn').onclick = () => goToPage(1);
+        $('prevBtn').onclick = prevPage;
+        $('nextBtn').onclick = nextPage;
+        $('lastBtn').onclick = () => goToPage(CONFIG.TOTAL);
+        $('zoomInBtn').onclick = () => setZoom(state.zoom + 0.25);
+        $('zoomOutBtn').onclick = () => setZoom(state.zoom - 0.25);
+        
+        $('fullscreenBtn').onclick = () => {
+            if (!document.fullscreenElement) document.documentElement.requestFullscreen();
+            else document.exitFullscreen();
+        };
+        
+        $('modeBtn').onclick = e => {
+            e.stopPropagation();
+            $('modeDropdown').classList.toggle('open');
+        };
+        
+        document.addEventListener('click', () => $('modeDropdown').classList.remove('open'));
+        
+        $$('.mode-option').forEach(opt => {
+            opt.onclick = e => {
+                e.stopPropagation();
+                changeMode(opt.dataset.mode);
+            };
+        });
+        
+        // Sound toggle
+        elements.soundToggle.onclick = () => {
+            state.soundEnabled = !state.soundEnabled;
+            elements.soundToggle.classList.toggle('muted', !state.soundEnabled);
+        };
+        
+        // Keyboard
+        document.addEventListener('keydown', e => {
+            if (active && active.busy()) return;
+            if (e.key === 'ArrowLeft') prevPage();
+            if (e.key === 'ArrowRight') nextPage();
+            if (e.key === '+' || e.key === '=') setZoom(state.zoom + 0.25);
+            if (e.key === '-') setZoom(state.zoom - 0.25);
+            if (e.key === '0') setZoom(1);
+            if (e.key === 'Home') goToPage(1);
+            if (e.key === 'End') goToPage(CONFIG.TOTAL);
+        });
+        
+        // Resize
+        let resizeTimeout;
+        window.addEventListener('resize', () => {
+            clearTimeout(resizeTimeout);
+            resizeTimeout = setTimeout(() => {
+                if (active && active.resize) active.resize();
+            }, 250);
+        });
+        
+        // ========================================
+        // INIT
+        // ========================================
+        document.documentElement.style.setProperty('--bg', CONFIG.BACKGROUND);
+        $('total').textContent = CONFIG.TOTAL;
+        
+        Offline.init();
+        Telemetry.init();
+        
+        // ?bench=<tours> : benchmark du tour de page (mode magazine)
+        if (PARAMS.has('bench')) {
+            changeMode('magazine').then(module => module && module.bench());
+        } else {
+            changeMode(CONFIG.DEFAULT_MODE);
+        }
+    
+    }
+})();